@@ -14,6 +14,7 @@ from typing import (
 from job import nora_keyword as _nora_keyword
 from job.nora_article import TutorialAssistant
 from job.nora_travel import Traveler
+from job.utils.amap import close_session
 
 
 # from job.oss_action_node import memory
@@ -25,6 +26,12 @@ app.qrcode = None
 from fastapi import FastAPI
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    # 关闭高德接口共用的aiohttp会话
+    await close_session()
+
+
 @app.get("/nora_article")
 async def generate_document(msg: str = "", mail: str = ""):
     # msg = "给我写一份mongodb教程"
@@ -79,11 +79,12 @@ class WriteContent(Action):
         self.language = language
         self.directory = directory
 
-    async def run(self, topic: str, *args, **kwargs) -> str:
+    async def run(self, topic: str, *args, stream: bool = True, **kwargs) -> str:
         """Execute the action to write document content according to the directory and topic.
 
         Args:
             topic: The tutorial topic.
+            stream: Whether to stream the LLM output to stdout.
 
         Returns:
             The written tutorial content.
@@ -110,7 +111,7 @@ class WriteContent(Action):
         """
         prompt = CONTENT_PROMPT.format(
             topic=topic, language=self.language, directory=self.directory)
-        return await self._aask(prompt=prompt)
+        return await self.llm.aask(prompt, stream=stream)
 
 class TutorialAssistant(Role):
     """Tutorial assistant, input one sentence to generate a tutorial document in markup format.
@@ -121,11 +122,15 @@ class TutorialAssistant(Role):
         goal: The goal of the role.
         constraints: Constraints or requirements for the role.
         language: The language in which the tutorial documents will be generated.
+        parallel: Write the chapters concurrently, streaming them in order.
+        max_concurrency: The maximum number of chapters written at the same time, 0 means unlimited.
     """
     topic: str = ""
     main_title: str = ""
     total_content: str = ""
     language: str = ""
+    parallel: bool = True
+    max_concurrency: int = 5
 
     def __init__(
         self,
@@ -134,6 +139,8 @@ class TutorialAssistant(Role):
         goal: str = "Generate tutorial documents",
         constraints: str = "Strictly follow Markdown's syntax, with neat and standardized layout",
         language: str = "Chinese",
+        parallel: bool = True,
+        max_concurrency: int = 5,
     ):
         data = {
             "name": name,
@@ -141,6 +148,8 @@ class TutorialAssistant(Role):
             "goal": goal,
             "constraints": constraints,
             "language": language,
+            "parallel": parallel,
+            "max_concurrency": max_concurrency,
         }  
         super().__init__(**data)
         self._init_actions([WriteDirectory(language=language)])
@@ -210,6 +219,37 @@ class TutorialAssistant(Role):
             self.total_content += resp
             return Message(content=resp, role=self.profile)
 
+    async def _act_parallel(self):
+        """Run the remaining WriteContent actions concurrently and yield each chapter as soon as all the chapters
+        before it are written.
+
+        Yields:
+            The content of each chapter, in directory order.
+        """
+        todos = self.actions[self.rc.state:]
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency > 0 else None
+
+        # Concurrent streams would interleave their chunks on stdout
+        async def _write(todo):
+            if not semaphore:
+                return await todo.run(topic=self.topic, stream=False)
+            async with semaphore:
+                return await todo.run(topic=self.topic, stream=False)
+
+        tasks = [asyncio.create_task(_write(todo)) for todo in todos]
+        contents = [self.total_content] if self.total_content else []
+        try:
+            for task in tasks:
+                resp = await task
+                contents.append(resp)
+                yield resp
+        finally:
+            # The consumer stopped early or a chapter failed: cancel the chapters still being written
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.total_content = "\n\n\n".join(contents)
+
     async def _react(self) -> Message:
         """Execute the assistant's think and actions.
 
@@ -221,6 +261,11 @@ class TutorialAssistant(Role):
             if self.rc.todo is None:
                 break
 
+            if self.parallel and isinstance(self.rc.todo, WriteContent):
+                async for content in self._act_parallel():
+                    yield content
+                break
+
             msg = await self._act()
             if msg:
                 yield msg.content
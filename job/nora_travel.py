@@ -200,17 +200,24 @@ class GetTransInfo(Action):
             return Message(content="解析失败,目标城市不存在")
         
         try:
-            resp_weather = ""
-            resp_keywords = ""
-            if content["has_weather"] == 1:
-                weather = AmapWeather()
-                resp_weather = weather.get_weather(dest_city)
+            # 天气、所有关键字的POI、火车票并发请求
+            weather_task = AmapWeather().aget_weather(dest_city) if content["has_weather"] == 1 else self._empty()
+            poi_search = AmapPOISearch()
+            poi_tasks = [poi_search.asearch(keyword, dest_city) for keyword in keywords]
+            if source_city and dest_city:
+                dates = generate_dates(datetime.now().date(), 10)
+                ticket_task = self.request_resp_ticket_api(source_city, dest_city, dates)
+            else:
+                ticket_task = self._empty()
+            resp_weather, resp_pois, resp_ticket = await asyncio.gather(
+                weather_task, asyncio.gather(*poi_tasks), ticket_task
+            )
+            resp_weather = resp_weather or ""
 
+            resp_keywords = ""
             if keywords:
-                poi_search = AmapPOISearch()
                 resp_keywords = []
-                for keyword in keywords:
-                    result = poi_search.search(keyword, dest_city)
+                for result in resp_pois:
                     if result:
                         result = [{
                             "address": item["address"],
@@ -227,12 +234,6 @@ class GetTransInfo(Action):
                         """
                         resp_keywords.append(tmpl)
 
-            resp_ticket = ""
-            dates = ""
-            if source_city and dest_city:
-                dates = generate_dates(datetime.now().date(), 10)
-                resp_ticket = await self.request_resp_ticket_api(source_city, dest_city, dates)
-        
             prompt = PROMPT_SUMMARY.replace("{{resp_weather}}", str(resp_weather))\
                 .replace("{{resp_keywords}}", str(resp_keywords))\
                 .replace("{{resp_ticket}}", str(resp_ticket))\
@@ -244,13 +245,24 @@ class GetTransInfo(Action):
             res = "get weather fail"
 
         return Message(content=res)
+
+    @staticmethod
+    async def _empty():
+        return ""
     
     async def request_resp_ticket_api(self, source_city: str, dest_city: str, dates: List):
         service = TrainTicketService()
+        # 并发查找10天内的火车票，取最早有票的日期
+        # 单个日期请求失败不影响其他日期的结果
+        results = await asyncio.gather(
+            *[service.aget_tickets(dest_city, source_city, _date) for _date in dates], return_exceptions=True
+        )
         tickets_info = ""
-        # 查找10天内的火车票
-        for _date in dates:
-            tickets_info = service.get_tickets(dest_city, source_city, _date)
+        for _date, result in zip(dates, results):
+            if isinstance(result, Exception):
+                logger.warning(f"获取{_date}的火车票失败: {result}")
+                continue
+            tickets_info = result
             if tickets_info and tickets_info["data"]["count"] > 0:
                 break
         return str(tickets_info["data"]["list"]) if tickets_info else ""
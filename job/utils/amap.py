@@ -1,5 +1,10 @@
 from datetime import datetime
+from collections import OrderedDict
+import asyncio
+import time
 import urllib
+import weakref
+import aiohttp
 import requests
 import json
 import os
@@ -8,6 +13,167 @@ root = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__)
 sys.path.insert(0, root)
 
 from metagpt.config import CONFIG
+from metagpt.logs import logger
+
+AMAP_TIMEOUT = 10  # 单次请求的超时时间（秒）
+
+# 每个事件循环共用一个aiohttp会话，复用连接池
+_sessions = weakref.WeakKeyDictionary()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    获取当前事件循环共用的aiohttp会话
+
+    :return: aiohttp.ClientSession
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+        session = aiohttp.ClientSession(connector=connector)
+        _sessions[loop] = session
+    return session
+
+
+async def close_session():
+    """关闭当前事件循环共用的aiohttp会话"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session:
+        await session.close()
+
+
+# 各接口缓存时间（秒）：火车票几分钟，天气一小时，POI与地理编码一天
+AMAP_CACHE_TTL = {
+    "geocode": 24 * 3600,
+    "weather": 3600,
+    "poi": 24 * 3600,
+    "tickets": 5 * 60,
+}
+
+
+def is_cacheable(endpoint, value):
+    """
+    判断上游结果是否可以缓存：高德接口status为"1"才是成功，失败时（如key无效、超出配额）返回的是业务错误
+
+    :param endpoint: 接口名称
+    :param value: 上游结果
+    :return: 是否缓存
+    """
+    if not isinstance(value, dict):
+        return False
+    if endpoint == "tickets":
+        return value.get("data") is not None
+    return value.get("status") == "1"
+
+
+class AmapCache:
+    """
+    高德与火车票查询结果的缓存：进程内LRU，配置了Redis时再加一层Redis，
+    并发的相同请求合并为一次上游调用。失败的结果（None或业务错误）不缓存。
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._local = OrderedDict()  # key -> (过期时间, 结果)
+        self._pending = {}  # key -> 进行中的请求
+        self._redis = None
+
+    @staticmethod
+    def make_key(endpoint, params):
+        params = {k: v for k, v in params.items() if k != "key" and v is not None}
+        return f"amap:{endpoint}:{json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+
+    async def get_or_fetch(self, endpoint, params, fetch):
+        """
+        返回缓存的结果，没有则调用fetch获取并缓存
+
+        :param endpoint: 接口名称，决定缓存时间，见AMAP_CACHE_TTL
+        :param params: 请求参数，与endpoint一起作为缓存键
+        :param fetch: 无参数的协程函数，返回上游结果
+        :return: 查询结果
+        """
+        key = self.make_key(endpoint, params)
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, endpoint, fetch))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        # 某个调用方被取消时不影响其他等待同一请求的调用方
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, endpoint, fetch):
+        ttl = AMAP_CACHE_TTL[endpoint]
+        redis = self._get_redis()
+        if redis:
+            data = await redis.get(key)
+            if data:
+                value = json.loads(data)
+                self._set_local(key, value, ttl)
+                return value
+
+        value = await fetch()
+        if is_cacheable(endpoint, value):
+            self._set_local(key, value, ttl)
+            if redis:
+                await redis.set(key, json.dumps(value, ensure_ascii=False), timeout_sec=ttl)
+        return value
+
+    def _get_local(self, key):
+        item = self._local.get(key)
+        if item is None:
+            return None
+        expire_at, value = item
+        if expire_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _set_local(self, key, value, ttl):
+        self._local[key] = (time.monotonic() + ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def _get_redis(self):
+        if self._redis is None:
+            self._redis = False
+            if CONFIG.REDIS_HOST:
+                from metagpt.utils.redis import Redis  # 仅在配置了Redis时依赖aioredis
+
+                redis = Redis()
+                self._redis = redis if redis.is_configured else False
+        return self._redis
+
+    def clear(self):
+        self._local.clear()
+
+
+AMAP_CACHE = AmapCache()
+
+
+async def aget_json(url, params, timeout=AMAP_TIMEOUT):
+    """
+    异步GET请求并返回JSON，失败返回None
+
+    :param url: 请求地址
+    :param params: 请求参数，值为None的参数不发送
+    :param timeout: 超时时间（秒）
+    :return: JSON格式的结果
+    """
+    # 与requests保持一致：忽略None，布尔值转为字符串
+    params = {k: str(v) if isinstance(v, bool) else v for k, v in params.items() if v is not None}
+    try:
+        async with get_session().get(url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.warning(f"请求失败: {url} {e!r}")
+        return None
 
 
 class AmapGeocoding:
@@ -38,6 +204,24 @@ class AmapGeocoding:
         else:
             return None
 
+    async def ageocode(self, address, city=None, batch=False, output="json", timeout=AMAP_TIMEOUT):
+        """
+        异步地理编码，参数同geocode，结果会被缓存
+
+        :param timeout: 超时时间（秒）
+        :return: 高德地图地理编码结果
+        """
+        params = {
+            "key": self.api_key,
+            "address": address,
+            "city": city,
+            "batch": batch,
+            "output": output
+        }
+        return await AMAP_CACHE.get_or_fetch(
+            "geocode", params, lambda: aget_json(self.base_url, params, timeout=timeout)
+        )
+
     def reverse_geocode(self, location, radius=200, extensions=None, output="json"):
         """
         逆地理编码（将经纬度转换为地址）
@@ -88,6 +272,23 @@ class AmapWeather:
         else:
             return None
 
+    async def aget_weather(self, city, extensions=None, output="json", timeout=AMAP_TIMEOUT):
+        """
+        异步查询天气信息，参数同get_weather，结果会被缓存
+
+        :param timeout: 超时时间（秒）
+        :return: 高德地图天气查询结果
+        """
+        params = {
+            "key": self.api_key,
+            "city": city,
+            "extensions": extensions,
+            "output": output
+        }
+        return await AMAP_CACHE.get_or_fetch(
+            "weather", params, lambda: aget_json(self.base_url, params, timeout=timeout)
+        )
+
         
 class AmapPOISearch:
     def __init__(self):
@@ -122,6 +323,27 @@ class AmapPOISearch:
         else:
             return None
 
+    async def asearch(self, keywords, city=None, page=1, offset=10, extensions=None, output="json", timeout=AMAP_TIMEOUT):
+        """
+        异步POI搜索，参数同search，结果会被缓存
+
+        :param timeout: 超时时间（秒）
+        :return: 高德地图POI搜索结果
+        """
+        params = {
+            "key": self.api_key,
+            "keywords": keywords,
+            "city": city,
+            "page": page,
+            "offset": offset,
+            "extensions": extensions,
+            "output": output,
+            "show_fields": "children,business"
+        }
+        return await AMAP_CACHE.get_or_fetch(
+            "poi", params, lambda: aget_json(self.base_url, params, timeout=timeout)
+        )
+
 
 # class AmapTraffic:
 #     def __init__(self):
@@ -287,6 +509,23 @@ class TrainTicketService:
         except requests.exceptions.RequestException as e:
             print(f"请求异常: {e}")
             return None
+
+    async def aget_tickets(self, arrival_city, departure_city="广州", departure_date=None, timeout=AMAP_TIMEOUT):
+        """
+        异步获取火车票信息，参数同get_tickets，结果会被缓存
+
+        :param timeout: 超时时间（秒）
+        :return: JSON格式的火车票信息
+        """
+        params = {
+            'r': 'train/trainTicket/getTickets',
+            'primary[departureDate]': departure_date,
+            'primary[departureCityName]': departure_city,
+            'primary[arrivalCityName]': arrival_city
+        }
+        return await AMAP_CACHE.get_or_fetch(
+            "tickets", params, lambda: aget_json(self.base_url, params, timeout=timeout)
+        )
         
 
 if __name__ == "__main__":
@@ -8,17 +8,20 @@
 NOTE: You should use typing.List instead of list to do type annotation. Because in the markdown extraction process,
   we can use typing to extract the type of the node, but we cannot use built-in list to extract.
 """
+import asyncio
+import contextlib
 import json
-from typing import Any, Dict, List, Optional, Tuple, Type
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
 
 from pydantic import BaseModel, create_model, model_validator
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
 from metagpt.config import CONFIG
 from metagpt.llm import BaseLLM
-from metagpt.logs import logger
+from metagpt.logs import llm_stream_listener, logger
 from metagpt.provider.postprocess.llm_output_postprocess import llm_output_postprocess
 from metagpt.utils.common import OutputParser, general_after_log
+from metagpt.utils.stream_output_parser import StreamOutputParser
 
 TAG = "CONTENT"
 
@@ -69,11 +72,16 @@ class ActionNode:
     # context: str  # everything in the history.
     instruction: str  # the instructions should be followed.
     example: Any  # example for In Context-Learning.
+    depends_on: List[str]  # keys of the sibling nodes to fill before this one in the complex strategy
 
     # Action Output
     content: str
     instruct_content: BaseModel
 
+    # Output classes and their json schemas, shared by all nodes, keyed by (class_name, mapping)
+    _model_classes: Dict[Tuple, Type[BaseModel]] = {}
+    _model_json_schemas: Dict[Type[BaseModel], Dict] = {}
+
     def __init__(
         self,
         key: str,
@@ -83,6 +91,7 @@ class ActionNode:
         content: str = "",
         children: dict[str, "ActionNode"] = None,
         schema: str = "",
+        depends_on: List[str] = None,
     ):
         self.key = key
         self.expected_type = expected_type
@@ -91,6 +100,8 @@ class ActionNode:
         self.content = content
         self.children = children if children is not None else {}
         self.schema = schema
+        self.depends_on = depends_on or []
+        self._compiled = {}  # (schema, mode, exclude) -> (instruction, example), reset when children are added
 
     def __str__(self):
         return (
@@ -104,6 +115,7 @@ class ActionNode:
     def add_child(self, node: "ActionNode"):
         """增加子ActionNode"""
         self.children[node.key] = node
+        self._compiled = {}
 
     def add_children(self, nodes: List["ActionNode"]):
         """批量增加子ActionNode"""
@@ -134,8 +146,24 @@ class ActionNode:
 
     @classmethod
     def create_model_class(cls, class_name: str, mapping: Dict[str, Tuple[Type, Any]]):
-        """基于pydantic v1的模型动态生成，用来检验结果类型正确性"""
+        """基于pydantic v1的模型动态生成，用来检验结果类型正确性，相同的(class_name, mapping)只生成一次"""
+        try:
+            key = (class_name, tuple(mapping.items()))
+            model_class = cls._model_classes.get(key)
+        except TypeError:  # unhashable type in the mapping
+            return cls._create_model_class(class_name, mapping)
+        if not model_class:
+            model_class = cls._model_classes[key] = cls._create_model_class(class_name, mapping)
+        return model_class
+
+    @classmethod
+    def get_model_json_schema(cls, model_class: Type[BaseModel]) -> Dict:
+        if model_class not in cls._model_json_schemas:
+            cls._model_json_schemas[model_class] = model_class.model_json_schema()
+        return cls._model_json_schemas[model_class]
 
+    @staticmethod
+    def _create_model_class(class_name: str, mapping: Dict[str, Tuple[Type, Any]]):
         def check_fields(cls, values):
             required_fields = set(mapping.keys())
             missing_fields = required_fields - set(values.keys())
@@ -236,8 +264,13 @@ class ActionNode:
 
         # FIXME: json instruction会带来格式问题，如："Project name": "web_2048  # 项目名称使用下划线",
         # compile example暂时不支持markdown
-        instruction = self.compile_instruction(schema="markdown", mode=mode, exclude=exclude)
-        example = self.compile_example(schema=schema, tag=TAG, mode=mode, exclude=exclude)
+        key = (schema, mode, tuple(exclude or []))
+        if key not in self._compiled:
+            self._compiled[key] = (
+                self.compile_instruction(schema="markdown", mode=mode, exclude=exclude),
+                self.compile_example(schema=schema, tag=TAG, mode=mode, exclude=exclude),
+            )
+        instruction, example = self._compiled[key]
         # nodes = ", ".join(self.to_dict(mode=mode).keys())
         constraints = [LANGUAGE_CONSTRAINT, FORMAT_CONSTRAINT]
         constraint = "\n".join(constraints)
@@ -263,21 +296,26 @@ class ActionNode:
         system_msgs: Optional[list[str]] = None,
         schema="markdown",  # compatible to original format
         timeout=CONFIG.timeout,
+        on_field: Optional[Callable[[str, Any], None]] = None,
     ) -> (str, BaseModel):
-        """Use ActionOutput to wrap the output of aask"""
-        content = await self.llm.aask(prompt, system_msgs, timeout=timeout)
+        """Use ActionOutput to wrap the output of aask.
+        The stream is parsed while generated, `on_field(key, value)` gets each field as soon as it is complete."""
+        parser = StreamOutputParser(output_data_mapping, schema=schema, on_field=on_field)
+        with llm_stream_listener(parser.feed):
+            content = await self.llm.aask(prompt, system_msgs, timeout=timeout)
         logger.debug(f"llm raw output:\n{content}")
         output_class = self.create_model_class(output_class_name, output_data_mapping)
 
         if schema == "json":
             parsed_data = llm_output_postprocess(
-                output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
+                output=content, schema=self.get_model_json_schema(output_class), req_key=f"[/{TAG}]"
             )
         else:  # using markdown parser
             parsed_data = OutputParser.parse_data_with_mapping(content, output_data_mapping)
 
         logger.debug(f"parsed_data:\n{parsed_data}")
         instruct_content = output_class(**parsed_data)
+        parser.finish(instruct_content.model_dump())
         return content, instruct_content
 
     def get(self, key):
@@ -294,13 +332,15 @@ class ActionNode:
     def set_context(self, context):
         self.set_recursive("context", context)
 
-    async def simple_fill(self, schema, mode, timeout=CONFIG.timeout, exclude=None):
+    async def simple_fill(self, schema, mode, timeout=CONFIG.timeout, exclude=None, on_field=None):
         prompt = self.compile(context=self.context, schema=schema, mode=mode, exclude=exclude)
 
         if schema != "raw":
             mapping = self.get_mapping(mode, exclude=exclude)
             class_name = f"{self.key}_AN"
-            content, scontent = await self._aask_v1(prompt, class_name, mapping, schema=schema, timeout=timeout)
+            content, scontent = await self._aask_v1(
+                prompt, class_name, mapping, schema=schema, timeout=timeout, on_field=on_field
+            )
             self.content = content
             self.instruct_content = scontent
         else:
@@ -309,7 +349,71 @@ class ActionNode:
 
         return self
 
-    async def fill(self, context, llm, schema="json", mode="auto", strgy="simple", timeout=CONFIG.timeout, exclude=[]):
+    async def complex_fill(self, schema, mode, timeout=CONFIG.timeout, exclude=None, on_field=None):
+        """Fill the children concurrently, at most `ACTION_NODE_MAX_CONCURRENCY` at the same time.
+        A child waits for the siblings in its `depends_on`, whose outputs are appended to its context."""
+        children = {k: v for k, v in self.children.items() if not (exclude and k in exclude)}
+        self._check_dependencies(children)
+        max_concurrency = CONFIG.action_node_max_concurrency
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else contextlib.nullcontext()
+        tasks = {}
+
+        async def _fill(child: ActionNode):
+            depends_on = [children[k] for k in child.depends_on if k in children]
+            if depends_on:
+                await asyncio.gather(*[tasks[i.key] for i in depends_on])
+                outputs = [f"## {k}\n{v}" for i in depends_on for k, v in i.instruct_content.model_dump().items()]
+                child.set_context("\n\n".join([self.context] + outputs))
+            async with semaphore:
+                return await child.simple_fill(
+                    schema=schema, mode=mode, timeout=timeout, exclude=exclude, on_field=on_field
+                )
+
+        for key, child in children.items():
+            tasks[key] = asyncio.create_task(_fill(child))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        tmp = {}
+        for child in children.values():
+            tmp.update(child.instruct_content.model_dump())
+        cls = self.create_children_class(exclude=exclude)
+        self.instruct_content = cls(**tmp)
+        return self
+
+    @staticmethod
+    def _check_dependencies(children: Dict[str, "ActionNode"]):
+        """Raise ValueError if the dependencies of the children form a cycle"""
+        visited = {}  # key -> True when done, False while visiting
+
+        def _visit(key):
+            if visited.get(key) is False:
+                raise ValueError(f"Circular dependency of ActionNode: {key}")
+            if key in visited:
+                return
+            visited[key] = False
+            for dependency in children[key].depends_on:
+                if dependency in children:
+                    _visit(dependency)
+            visited[key] = True
+
+        for key in children:
+            _visit(key)
+
+    async def fill(
+        self,
+        context,
+        llm,
+        schema="json",
+        mode="auto",
+        strgy="simple",
+        timeout=CONFIG.timeout,
+        exclude=[],
+        on_field: Optional[Callable[[str, Any], None]] = None,
+    ):
         """Fill the node(s) with mode.
 
         :param context: Everything we should know when filling node.
@@ -324,9 +428,10 @@ class ActionNode:
          - root: fill root's node and gather output
         :param strgy: simple/complex
          - simple: run only once
-         - complex: run each node
+         - complex: run each node, concurrently unless they depend on each other
         :param timeout: Timeout for llm invocation.
         :param exclude: The keys of ActionNode to exclude.
+        :param on_field: Called with (key, value) of each output field as soon as it is streamed.
         :return: self
         """
         self.set_llm(llm)
@@ -335,15 +440,9 @@ class ActionNode:
             schema = self.schema
 
         if strgy == "simple":
-            return await self.simple_fill(schema=schema, mode=mode, timeout=timeout, exclude=exclude)
+            return await self.simple_fill(schema=schema, mode=mode, timeout=timeout, exclude=exclude, on_field=on_field)
         elif strgy == "complex":
             # 这里隐式假设了拥有children
-            tmp = {}
-            for _, i in self.children.items():
-                if exclude and i.key in exclude:
-                    continue
-                child = await i.simple_fill(schema=schema, mode=mode, timeout=timeout, exclude=exclude)
-                tmp.update(child.instruct_content.dict())
-            cls = self.create_children_class()
-            self.instruct_content = cls(**tmp)
-            return self
+            return await self.complex_fill(
+                schema=schema, mode=mode, timeout=timeout, exclude=exclude, on_field=on_field
+            )
@@ -7,7 +7,6 @@
 @Desc: PrepareDocuments Action: initialize project folder and add new requirements to docs/requirements.txt.
         RFC 135 2.2.3.5.1.
 """
-import shutil
 from pathlib import Path
 from typing import Optional
 
@@ -17,6 +16,7 @@ from metagpt.const import DOCS_FILE_REPO, REQUIREMENT_FILENAME
 from metagpt.schema import Document
 from metagpt.utils.file_repository import FileRepository
 from metagpt.utils.git_repository import GitRepository
+from metagpt.utils.workspace_pool import WORKSPACE_POOL
 
 
 class PrepareDocuments(Action):
@@ -33,8 +33,12 @@ class PrepareDocuments(Action):
         else:
             path = Path(CONFIG.project_path)
         if path.exists() and not CONFIG.inc:
-            shutil.rmtree(path)
+            WORKSPACE_POOL.discard(path)
         CONFIG.project_path = path
+        if not path.exists():
+            WORKSPACE_POOL.claim(path)
+        else:
+            WORKSPACE_POOL.hold(path)
         CONFIG.git_repo = GitRepository(local_path=path, auto_init=True)
 
     async def run(self, with_messages, **kwargs):
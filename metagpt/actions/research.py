@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import asyncio
+import sys
 from typing import Callable, Optional, Union
 
-from pydantic import Field, parse_obj_as
+from pydantic import Field, PrivateAttr, parse_obj_as
 
 from metagpt.actions import Action
 from metagpt.config import CONFIG
@@ -86,6 +87,7 @@ class CollectLinks(Action):
 
     search_engine: SearchEngine = Field(default_factory=SearchEngine)
     rank_func: Optional[Callable[[list[str]], None]] = None
+    max_concurrency: int = 4  # queries searched and ranked at the same time, 0 means unlimited
 
     async def run(
         self,
@@ -139,10 +141,14 @@ class CollectLinks(Action):
         except Exception as e:
             logger.exception(f"fail to break down the research question due to {e}")
             queries = keywords
-        ret = {}
-        for query in queries:
-            ret[query] = await self._search_and_rank_urls(topic, query, url_per_query)
-        return ret
+        semaphore = asyncio.Semaphore(self.max_concurrency or len(queries) or 1)
+
+        async def search_and_rank(query):
+            async with semaphore:
+                return await self._search_and_rank_urls(topic, query, url_per_query)
+
+        rankings = await asyncio.gather(*(search_and_rank(i) for i in queries))
+        return dict(zip(queries, rankings))
 
     async def _search_and_rank_urls(self, topic: str, query: str, num_results: int = 4) -> list[str]:
         """Search and rank URLs based on a query.
@@ -182,6 +188,10 @@ class WebBrowseAndSummarize(Action):
     desc: str = "Explore the web and provide summaries of articles and webpages."
     browse_func: Union[Callable[[list[str]], None], None] = None
     web_browser_engine: Optional[WebBrowserEngine] = None
+    max_concurrency: int = 8  # LLM requests at the same time across the concurrent runs, 0 means unlimited
+    skip_irrelevant_pages: bool = False  # drop a page and cancel its other chunks once a chunk is "Not relevant."
+
+    _semaphore: Optional[tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = PrivateAttr(default=None)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -215,33 +225,41 @@ class WebBrowseAndSummarize(Action):
         if not urls:
             contents = [contents]
 
-        summaries = {}
+        pages = [self._summarize_page(i.inner_text, query, system_text) for i in contents]
+        summaries = await asyncio.gather(*pages)
+        return dict(zip([url, *urls], summaries))
+
+    async def _summarize_page(self, content: str, query: str, system_text: str) -> Optional[str]:
+        """Summarize the chunks of the page at the same time, then summarize the chunk summaries."""
         prompt_template = WEB_BROWSE_AND_SUMMARIZE_PROMPT.format(query=query, content="{}")
-        for u, content in zip([url, *urls], contents):
-            content = content.inner_text
-            chunk_summaries = []
-            for prompt in generate_prompt_chunk(
-                content, prompt_template, self.llm.model, system_text, CONFIG.max_tokens_rsp
-            ):
-                logger.debug(prompt)
-                summary = await self._aask(prompt, [system_text])
-                if summary == "Not relevant.":
-                    continue
-                chunk_summaries.append(summary)
-
-            if not chunk_summaries:
-                summaries[u] = None
-                continue
-
-            if len(chunk_summaries) == 1:
-                summaries[u] = chunk_summaries[0]
-                continue
-
-            content = "\n".join(chunk_summaries)
-            prompt = WEB_BROWSE_AND_SUMMARIZE_PROMPT.format(query=query, content=content)
-            summary = await self._aask(prompt, [system_text])
-            summaries[u] = summary
-        return summaries
+        chunks = generate_prompt_chunk(content, prompt_template, self.llm.model, system_text, CONFIG.max_tokens_rsp)
+        tasks = [asyncio.create_task(self._summarize(prompt, system_text)) for prompt in chunks]
+        try:
+            for task in asyncio.as_completed(tasks):
+                if await task == "Not relevant." and self.skip_irrelevant_pages:
+                    return None
+        finally:
+            for task in tasks:
+                task.cancel()
+        chunk_summaries = [i.result() for i in tasks if i.result() != "Not relevant."]
+
+        if not chunk_summaries:
+            return None
+
+        if len(chunk_summaries) == 1:
+            return chunk_summaries[0]
+
+        content = "\n".join(chunk_summaries)
+        prompt = WEB_BROWSE_AND_SUMMARIZE_PROMPT.format(query=query, content=content)
+        return await self._summarize(prompt, system_text)
+
+    async def _summarize(self, prompt: str, system_text: str) -> str:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self.max_concurrency or sys.maxsize))
+        async with self._semaphore[1]:
+            logger.debug(prompt)
+            return await self._aask(prompt, [system_text])
 
 
 class ConductResearch(Action):
@@ -107,8 +107,7 @@ class SummarizeCode(Action):
         task_doc = await FileRepository.get_file(filename=task_pathname.name, relative_path=TASK_FILE_REPO)
         src_file_repo = CONFIG.git_repo.new_file_repository(relative_path=CONFIG.src_workspace)
         code_blocks = []
-        for filename in self.context.codes_filenames:
-            code_doc = await src_file_repo.get(filename)
+        for code_doc in await src_file_repo.get_many(self.context.codes_filenames):
             code_block = f"```python\n{code_doc.content}\n```\n-----"
             code_blocks.append(code_block)
         format_example = FORMAT_EXAMPLE
@@ -16,6 +16,7 @@
 """
 
 import json
+from typing import Dict, Optional
 
 from pydantic import Field
 from tenacity import retry, stop_after_attempt, wait_random_exponential
@@ -88,6 +89,8 @@ ATTENTION: Use '##' to SPLIT SECTIONS, not '#'. Output format carefully referenc
 class WriteCode(Action):
     name: str = "WriteCode"
     context: Document = Field(default_factory=Document)
+    # filename: the code in the prompt instead of the saved one, None to leave the file out
+    code_overrides: Optional[Dict[str, Optional[str]]] = None
 
     @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
     async def write_code(self, prompt) -> str:
@@ -114,7 +117,9 @@ class WriteCode(Action):
         if bug_feedback:
             code_context = coding_context.code_doc.content
         else:
-            code_context = await self.get_codes(coding_context.task_doc, exclude=self.context.filename)
+            code_context = await self.get_codes(
+                coding_context.task_doc, exclude=self.context.filename, overrides=self.code_overrides
+            )
 
         prompt = PROMPT_TEMPLATE.format(
             design=coding_context.design_doc.content if coding_context.design_doc else "",
@@ -135,7 +140,9 @@ class WriteCode(Action):
         return coding_context
 
     @staticmethod
-    async def get_codes(task_doc, exclude) -> str:
+    async def get_codes(task_doc, exclude, overrides: Optional[Dict[str, Optional[str]]] = None) -> str:
+        """Return the saved code of the files in the task list except `exclude`; the code of a file in `overrides` is
+        replaced by its value, or left out if None."""
         if not task_doc:
             return ""
         if not task_doc.content:
@@ -144,11 +151,13 @@ class WriteCode(Action):
         code_filenames = m.get("Task list", [])
         codes = []
         src_file_repo = CONFIG.git_repo.new_file_repository(relative_path=CONFIG.src_workspace)
+        overrides = overrides or {}
+        code_filenames = [i for i in code_filenames if i != exclude]
+        saved_filenames = [i for i in code_filenames if i not in overrides]
+        saved = dict(zip(saved_filenames, await src_file_repo.get_many(saved_filenames)))
         for filename in code_filenames:
-            if filename == exclude:
-                continue
-            doc = await src_file_repo.get(filename=filename)
-            if not doc:
+            content = overrides[filename] if filename in overrides else saved[filename] and saved[filename].content
+            if content is None:
                 continue
-            codes.append(f"----- {filename}\n" + doc.content)
+            codes.append(f"----- {filename}\n" + content)
         return "\n".join(codes)
@@ -7,6 +7,7 @@
 @Modified By: mashenquan, 2023/11/27. Following the think-act principle, solidify the task parameters when creating the
         WriteCode object, rather than passing them in when calling the run function.
 """
+from typing import Dict, Optional
 
 from pydantic import Field
 from tenacity import retry, stop_after_attempt, wait_random_exponential
@@ -121,6 +122,7 @@ REWRITE_CODE_TEMPLATE = """
 class WriteCodeReview(Action):
     name: str = "WriteCodeReview"
     context: CodingContext = Field(default_factory=CodingContext)
+    code_overrides: Optional[Dict[str, Optional[str]]] = None  # see `WriteCode.code_overrides`
 
     @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
     async def write_code_review_and_rewrite(self, context_prompt, cr_prompt, filename):
@@ -141,7 +143,9 @@ class WriteCodeReview(Action):
         for i in range(k):
             format_example = FORMAT_EXAMPLE.format(filename=self.context.code_doc.filename)
             task_content = self.context.task_doc.content if self.context.task_doc else ""
-            code_context = await WriteCode.get_codes(self.context.task_doc, exclude=self.context.filename)
+            code_context = await WriteCode.get_codes(
+                self.context.task_doc, exclude=self.context.filename, overrides=self.code_overrides
+            )
             context = "\n".join(
                 [
                     "## System Design\n" + str(self.context.design_doc) + "\n",
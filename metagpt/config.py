@@ -163,6 +163,20 @@ class Config(metaclass=Singleton):
         self.openai_api_model = self._get("OPENAI_API_MODEL", "gpt-4-1106-preview")
         self.max_tokens_rsp = self._get("MAX_TOKENS", 2048)
         self.deployment_name = self._get("DEPLOYMENT_NAME", "gpt-4")
+        self.llm_max_connections = int(self._get("LLM_MAX_CONNECTIONS", 100))
+        self.llm_max_keepalive_connections = int(self._get("LLM_MAX_KEEPALIVE_CONNECTIONS", 20))
+        self.llm_keepalive_expiry = float(self._get("LLM_KEEPALIVE_EXPIRY", 5.0))
+        self.llm_rpm = float(self._get("LLM_RPM", 0))
+        self.llm_tpm = float(self._get("LLM_TPM", 0))
+        self.llm_cache = str(self._get("LLM_CACHE", False)).lower() == "true"
+        self.llm_cache_path = self._get("LLM_CACHE_PATH")
+        self.llm_cache_ttl = float(self._get("LLM_CACHE_TTL", 7 * 24 * 3600))
+        self.llm_cache_max_entries = int(self._get("LLM_CACHE_MAX_ENTRIES", 10000))
+        self.embedding_cache = str(self._get("EMBEDDING_CACHE", False)).lower() == "true"
+        self.embedding_cache_path = self._get("EMBEDDING_CACHE_PATH")
+        self.embedding_cache_max_entries = int(self._get("EMBEDDING_CACHE_MAX_ENTRIES", 100000))
+        self.repo_symbols_cache = str(self._get("REPO_SYMBOLS_CACHE", True)).lower() == "true"
+        self.repo_symbols_cache_path = self._get("REPO_SYMBOLS_CACHE_PATH")
 
         self.spark_appid = self._get("SPARK_APPID")
         self.spark_api_secret = self._get("SPARK_API_SECRET")
@@ -202,11 +216,15 @@ class Config(metaclass=Singleton):
         )
         self.repair_llm_output = self._get("REPAIR_LLM_OUTPUT", False)
         self.prompt_schema = self._get("PROMPT_FORMAT", "json")
+        self.action_node_max_concurrency = int(self._get("ACTION_NODE_MAX_CONCURRENCY", 0))
         self.workspace_path = Path(self._get("WORKSPACE_PATH", DEFAULT_WORKSPACE_ROOT))
         val = self._get("WORKSPACE_PATH_WITH_UID")
         if val and val.lower() == "true":  # for agent
             self.workspace_path = self.workspace_path / workspace_uid
         self._ensure_workspace_exists()
+        self.workspace_pool_size = int(self._get("WORKSPACE_POOL_SIZE", 0))
+        self.workspace_ttl = float(self._get("WORKSPACE_TTL", 0))
+        self.workspace_quota = float(self._get("WORKSPACE_QUOTA", 0))
         self.max_auto_summarize_code = self.max_auto_summarize_code or self._get("MAX_AUTO_SUMMARIZE_CODE", 1)
         self.timeout = int(self._get("TIMEOUT", 3))
 
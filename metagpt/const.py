@@ -67,6 +67,9 @@ SERDESER_PATH = DEFAULT_WORKSPACE_ROOT / "storage"  # TODO to store `storage` un
 
 TMP = METAGPT_ROOT / "tmp"
 
+# Default directory of the on-disk caches, outside the source tree
+CACHE_PATH = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "metagpt"
+
 SOURCE_ROOT = METAGPT_ROOT / "metagpt"
 PROMPT_PATH = SOURCE_ROOT / "prompts"
 SKILL_DIRECTORY = SOURCE_ROOT / "skills"
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : embedding_cache.py
+@Desc    : On-disk cache of embedding vectors, keyed by a hash of the model and the text. Enabled by `EMBEDDING_CACHE`.
+    Vectors are appended to one memory-mapped float32 file per dimension, a SQLite table maps keys to rows.
+    Writers take an exclusive `flock` on the cache directory and readers a shared one, so that processes can share the
+    cache; without `fcntl`, such as on Windows, only the threads of one process can.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from metagpt.config import CONFIG
+from metagpt.const import CACHE_PATH
+from metagpt.logs import logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SQLITE_MAX_VARIABLES = 500  # keys per `IN (...)` query
+COMPACT_MIN_ROWS = 1024  # a vector file is rewritten once it has this many rows and less than half of them are used
+
+
+class EmbeddingCache:
+    """Persistent embedding cache, counting hits and misses.
+
+    :param path: The cache directory.
+    :param max_entries: Number of vectors kept, the earliest added ones are evicted first. 0 means unlimited.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 0):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path / "index.db"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache "
+            "(key TEXT PRIMARY KEY, dim INTEGER NOT NULL, row INTEGER NOT NULL)"
+        )
+        # the current vector file of each dimension, a compacted file gets a new name
+        self._conn.execute("CREATE TABLE IF NOT EXISTS vector_files (dim INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._lock_file = open(self.path / "lock", "a+b")
+        self._mapped: dict[int, tuple[str, np.ndarray]] = {}  # dim: (file name, memory-mapped vectors)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        with self._lock:
+            if fcntl:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _vectors(self, name: str, dim: int, row: int = -1) -> np.ndarray:
+        """The whole rows of a vector file, mapped again if `row` was appended since it was mapped. The tail of an
+        interrupted write is not a whole row, and not mapped."""
+        mapped_name, vectors = self._mapped.get(dim, (None, None))
+        if mapped_name != name or row >= len(vectors):
+            try:
+                rows = os.stat(self.path / name).st_size // (dim * 4)
+            except FileNotFoundError:
+                rows = 0
+            if rows:
+                vectors = np.memmap(self.path / name, dtype=np.float32, mode="r", shape=(rows, dim))
+            else:
+                vectors = np.empty((0, dim), dtype=np.float32)
+            self._mapped[dim] = (name, vectors)
+        return vectors
+
+    def get(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Return the vector of each key, None for the missing ones"""
+        results = {}
+        with self._locked(exclusive=False):
+            for i in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                chunk = keys[i : i + SQLITE_MAX_VARIABLES]
+                sql = (
+                    "SELECT e.key, e.dim, e.row, f.name FROM embedding_cache e JOIN vector_files f ON e.dim = f.dim "
+                    f"WHERE e.key IN ({','.join('?' * len(chunk))})"
+                )
+                for key, dim, row, name in self._conn.execute(sql, chunk):
+                    vectors = self._vectors(name, dim, row)
+                    if row < len(vectors):
+                        results[key] = np.array(vectors[row])
+        results = [results.get(key) for key in keys]
+        hits = sum(i is not None for i in results)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return results
+
+    def set(self, keys: List[str], vectors: List[List[float]]):
+        """Append the vectors; the rows are recorded after the vectors are written so an interrupted write is never
+        read back."""
+        groups: dict[int, list] = {}
+        for key, vector in zip(keys, vectors):
+            groups.setdefault(len(vector), []).append((key, vector))
+        with self._locked(exclusive=True):
+            for dim, items in groups.items():
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO vector_files (dim, name) VALUES (?, ?)", (dim, f"vectors-{dim}.f32")
+                )
+                name = self._file_name(dim)
+                with open(self.path / name, "ab") as writer:
+                    size = writer.seek(0, os.SEEK_END)
+                    if size % (dim * 4):  # the tail of an interrupted write
+                        size -= size % (dim * 4)
+                        writer.truncate(size)
+                    start = size // (dim * 4)
+                    writer.write(np.asarray([i[1] for i in items], dtype=np.float32).tobytes())
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, dim, row) VALUES (?, ?, ?)",
+                    [(key, dim, start + n) for n, (key, _) in enumerate(items)],
+                )
+            if self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM embedding_cache WHERE rowid IN "
+                    "(SELECT rowid FROM embedding_cache ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+            for dim in groups:
+                self._compact(dim)
+
+    def _file_name(self, dim: int) -> str:
+        return self._conn.execute("SELECT name FROM vector_files WHERE dim = ?", (dim,)).fetchone()[0]
+
+    def _compact(self, dim: int):
+        """Copy the rows still used to a new vector file once most rows of the current one are replaced or evicted.
+        The rows and the file name are switched in one transaction, so a crash leaves either file in use."""
+        name = self._file_name(dim)
+        rows = os.stat(self.path / name).st_size // (dim * 4)
+        if rows < COMPACT_MIN_ROWS:
+            return
+        used = self._conn.execute(
+            "SELECT key, row FROM embedding_cache WHERE dim = ? AND row < ? ORDER BY row", (dim, rows)
+        ).fetchall()
+        if rows <= 2 * len(used):
+            return
+        vectors = self._vectors(name, dim, row=rows - 1)
+        new_name = f"vectors-{dim}-{uuid.uuid4().hex[:8]}.f32"
+        np.asarray(vectors[[row for _, row in used]], dtype=np.float32).tofile(self.path / new_name)
+        self._conn.execute("DELETE FROM embedding_cache WHERE dim = ? AND row >= ?", (dim, rows))
+        self._conn.executemany(
+            "UPDATE embedding_cache SET row = ? WHERE key = ?", [(n, key) for n, (key, _) in enumerate(used)]
+        )
+        self._conn.execute("UPDATE vector_files SET name = ? WHERE dim = ?", (new_name, dim))
+        self._conn.commit()
+        self._mapped.pop(dim, None)
+        for i in self.path.glob(f"vectors-{dim}*.f32"):  # the old file, and those of an interrupted compaction
+            if i.name != new_name:
+                i.unlink(missing_ok=True)
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def clear(self):
+        with self._locked(exclusive=True):
+            self._conn.execute("DELETE FROM embedding_cache")
+            self._conn.execute("DELETE FROM vector_files")
+            self._conn.commit()
+            self._mapped = {}
+            for i in self.path.glob("vectors-*.f32"):
+                i.unlink(missing_ok=True)
+        self.hits = self.misses = 0
+
+    def close(self):
+        self._mapped = {}
+        self._conn.close()
+        self._lock_file.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Wrap an `Embeddings`, only the texts missing from the cache are embedded, in one call.
+
+    :param embedding: The wrapped embeddings.
+    :param cache: The cache, the one configured by `EMBEDDING_CACHE` if None.
+    :param namespace: Part of the cache keys, the model name of `embedding` by default.
+    """
+
+    def __init__(self, embedding: Embeddings, cache: EmbeddingCache = None, namespace: str = None):
+        self.embedding = embedding
+        self.cache = cache
+        self.namespace = namespace or getattr(embedding, "model", None) or type(embedding).__name__
+
+    def _lookup(self, texts: List[str], namespace: str):
+        """Return the cache, the cached vector or None of each text, and the distinct texts to embed"""
+        cache = self.cache or get_embedding_cache()
+        if cache is None:
+            return None, [None] * len(texts), list(dict.fromkeys(texts))
+        vectors = cache.get([EmbeddingCache.make_key(namespace, i) for i in texts])
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        return cache, vectors, missing
+
+    @staticmethod
+    def _merge(cache, namespace, texts, vectors, missing, embedded) -> List[List[float]]:
+        embedded = dict(zip(missing, embedded))
+        if cache is not None and embedded:
+            cache.set([EmbeddingCache.make_key(namespace, i) for i in embedded], list(embedded.values()))
+        return [list(embedded[text]) if vector is None else vector.tolist() for text, vector in zip(texts, vectors)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        cache, vectors, missing = self._lookup(texts, self.namespace)
+        embedded = self.embedding.embed_documents(missing) if missing else []
+        return self._merge(cache, self.namespace, texts, vectors, missing, embedded)
+
+    def embed_query(self, text: str) -> List[float]:
+        namespace = f"{self.namespace}:query"
+        cache, vectors, missing = self._lookup([text], namespace)
+        embedded = [self.embedding.embed_query(text)] if missing else []
+        return self._merge(cache, namespace, [text], vectors, missing, embedded)[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        cache, vectors, missing = self._lookup(texts, self.namespace)
+        embedded = await self.embedding.aembed_documents(missing) if missing else []
+        return self._merge(cache, self.namespace, texts, vectors, missing, embedded)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        namespace = f"{self.namespace}:query"
+        cache, vectors, missing = self._lookup([text], namespace)
+        embedded = [await self.embedding.aembed_query(text)] if missing else []
+        return self._merge(cache, namespace, [text], vectors, missing, embedded)[0]
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the configured cache, or None if `EMBEDDING_CACHE` is disabled."""
+    global _embedding_cache
+    if not CONFIG.embedding_cache:
+        return None
+    path = Path(CONFIG.embedding_cache_path or CACHE_PATH / "embedding_cache").expanduser()
+    if _embedding_cache is None or _embedding_cache.path != path:
+        logger.info(f"Embedding cache: {path}")
+        _embedding_cache = EmbeddingCache(path, max_entries=CONFIG.embedding_cache_max_entries)
+    return _embedding_cache
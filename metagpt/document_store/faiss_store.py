@@ -6,6 +6,9 @@
 @File    : faiss_store.py
 """
 import asyncio
+import hashlib
+import json
+import os
 from pathlib import Path
 from typing import Optional
 
@@ -16,6 +19,7 @@ from langchain_core.embeddings import Embeddings
 from metagpt.config import CONFIG
 from metagpt.document import IndexableDocument
 from metagpt.document_store.base_store import LocalStore
+from metagpt.document_store.embedding_cache import CachedEmbeddings
 from metagpt.logs import logger
 
 
@@ -25,10 +29,13 @@ class FaissStore(LocalStore):
     ):
         self.meta_col = meta_col
         self.content_col = content_col
-        self.embedding = embedding or OpenAIEmbeddings(
-            openai_api_key=CONFIG.openai_api_key, openai_api_base=CONFIG.openai_base_url
+        self.embedding = embedding or CachedEmbeddings(
+            OpenAIEmbeddings(openai_api_key=CONFIG.openai_api_key, openai_api_base=CONFIG.openai_base_url)
         )
         super().__init__(raw_data, cache_dir)
+        index_file, _ = self._get_index_and_store_fname(index_ext=".faiss")
+        if index_file.exists() and self.raw_data_path.stat().st_mtime > index_file.stat().st_mtime:
+            self.write()  # the source changed since it was indexed
 
     def _load(self) -> Optional["FaissStore"]:
         index_file, store_file = self._get_index_and_store_fname(index_ext=".faiss")  # langchain FAISS using .faiss
@@ -37,14 +44,14 @@ class FaissStore(LocalStore):
             logger.info("Missing at least one of index_file/store_file, load failed and return None")
             return None
 
-        return FAISS.load_local(self.raw_data_path.parent, self.embedding, self.fname)
+        return FAISS.load_local(self.cache_dir, self.embedding, self.fname)
 
-    def _write(self, docs, metadatas):
-        store = FAISS.from_texts(docs, self.embedding, metadatas=metadatas)
+    def _write(self, docs, metadatas, ids=None):
+        store = FAISS.from_texts(docs, self.embedding, metadatas=metadatas, ids=ids)
         return store
 
     def persist(self):
-        self.store.save_local(self.raw_data_path.parent, self.fname)
+        save_local(self.store, self.cache_dir, self.fname)
 
     def search(self, query, expand_cols=False, sep="\n", *args, k=5, **kwargs):
         rsp = self.store.similarity_search(query, k=k, **kwargs)
@@ -58,20 +65,68 @@ class FaissStore(LocalStore):
         return await asyncio.to_thread(self.search, *args, **kwargs)
 
     def write(self):
-        """Initialize the index and library based on the Document (JSON / XLSX, etc.) file provided by the user."""
+        """Initialize or update the index and library based on the Document (JSON / XLSX, etc.) file provided by the
+        user, see `update`."""
+        self.update()
+        return self.store
+
+    def update(self) -> dict:
+        """Index the rows of the Document file by fingerprint: only the new or changed rows are embedded, and the rows
+        no longer in the file are removed from the index. Return the number of rows added, deleted and unchanged."""
         if not self.raw_data_path.exists():
             raise FileNotFoundError
         doc = IndexableDocument.from_path(self.raw_data_path, self.content_col, self.meta_col)
         docs, metadatas = doc.get_docs_and_metadatas()
+        ids = fingerprints(docs, metadatas)
 
-        self.store = self._write(docs, metadatas)
-        self.persist()
-        return self.store
+        indexed = set(self.store.index_to_docstore_id.values()) if self.store else set()
+        stale = list(indexed.difference(ids))
+        new = [i for i, _id in enumerate(ids) if _id not in indexed]
+        if stale:
+            self.store.delete(stale)
+        if new:
+            texts, metas, new_ids = [docs[i] for i in new], [metadatas[i] for i in new], [ids[i] for i in new]
+            if self.store:
+                self.store.add_texts(texts, metadatas=metas, ids=new_ids)
+            else:
+                self.store = self._write(texts, metas, ids=new_ids)
+        changes = {"added": len(new), "deleted": len(stale), "unchanged": len(ids) - len(new)}
+        index_file, _ = self._get_index_and_store_fname(index_ext=".faiss")
+        if stale or new or not index_file.exists():
+            self.persist()
+        else:  # mark the touched source as indexed, or every `FaissStore` fingerprints it again
+            os.utime(index_file)
+        logger.info(f"Index {self.raw_data_path}: {changes}")
+        return changes
 
     def add(self, texts: list[str], *args, **kwargs) -> list[str]:
-        """FIXME: Currently, the store is not updated after adding."""
-        return self.store.add_texts(texts)
+        """Add texts to the index and persist it. They are not in the Document file, so `update` removes them."""
+        ids = self.store.add_texts(texts, *args, **kwargs)
+        self.persist()
+        return ids
 
     def delete(self, *args, **kwargs):
         """Currently, langchain does not provide a delete interface."""
         raise NotImplementedError
+
+
+def fingerprints(docs: list[str], metadatas: list[dict]) -> list[str]:
+    """Content hash of each row, used as its docstore id; repeated rows are numbered to keep the ids unique."""
+    ids, seen = [], {}
+    for doc, metadata in zip(docs, metadatas):
+        data = json.dumps([doc, metadata], sort_keys=True, ensure_ascii=False, default=str)
+        _id = hashlib.sha256(data.encode("utf-8")).hexdigest()
+        seen[_id] = seen.get(_id, -1) + 1
+        ids.append(f"{_id}-{seen[_id]}" if seen[_id] else _id)
+    return ids
+
+
+def save_local(store: FAISS, folder_path: Path, index_name: str):
+    """`FAISS.save_local` to temporary files first, then move them into place, so that a crash never leaves a
+    truncated file behind."""
+    folder_path = Path(folder_path)
+    folder_path.mkdir(parents=True, exist_ok=True)
+    tmp_name = f".{index_name}.tmp-{os.getpid()}"
+    store.save_local(folder_path, tmp_name)
+    for ext in [".faiss", ".pkl"]:
+        os.replace(folder_path / f"{tmp_name}{ext}", folder_path / f"{index_name}{ext}")
@@ -12,16 +12,26 @@
     functionality is to be consolidated into the `Environment` class.
 """
 import asyncio
+from collections import defaultdict, deque
 from pathlib import Path
-from typing import Iterable, Set
-
-from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validator
+from typing import Any, Iterable, Set
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SerializeAsAny,
+    computed_field,
+    model_validator,
+)
 
 from metagpt.config import CONFIG
+from metagpt.const import MESSAGE_ROUTE_TO_ALL
 from metagpt.logs import logger
 from metagpt.roles.role import Role
 from metagpt.schema import Message
-from metagpt.utils.common import is_subscribed, read_json_file, write_json_file
+from metagpt.utils.common import read_json_file, write_json_file
 
 
 class Environment(BaseModel):
@@ -34,13 +44,31 @@ class Environment(BaseModel):
     desc: str = Field(default="")  # 环境描述
     roles: dict[str, SerializeAsAny[Role]] = Field(default_factory=dict, validate_default=True)
     members: dict[Role, Set] = Field(default_factory=dict, exclude=True)
-    history: str = ""  # For debug
+    max_history: int = Field(default=0, exclude=True)  # Number of messages kept in `history`, 0 means unlimited
+    max_concurrency: int = Field(default=0, exclude=True)  # Number of roles running at the same time, 0 means unlimited
+
+    _routes: dict[str, dict[Role, None]] = PrivateAttr(default_factory=lambda: defaultdict(dict))  # tag -> roles
+    _ready: dict[Role, None] = PrivateAttr(default_factory=dict)  # roles to run in the next round, in wake-up order
+    _history: deque = PrivateAttr(default_factory=deque)
+
+    def __init__(self, **data: Any):
+        history = data.pop("history", "")
+        super().__init__(**data)
+        self._history = deque(maxlen=self.max_history or None)
+        if history:
+            self._history.append(history)
 
     @model_validator(mode="after")
     def init_roles(self):
         self.add_roles(self.roles.values())
         return self
 
+    @computed_field
+    @property
+    def history(self) -> str:
+        """For debug"""
+        return "".join(self._history)
+
     def serialize(self, stg_path: Path):
         roles_path = stg_path.joinpath("roles.json")
         roles_info = []
@@ -85,6 +113,8 @@ class Environment(BaseModel):
         """
         self.roles[role.profile] = role
         role.set_env(self)
+        if self._is_pending(role):
+            self.wake_up(role)
 
     def add_roles(self, roles: Iterable[Role]):
         """增加一批在当前环境的角色
@@ -95,6 +125,8 @@ class Environment(BaseModel):
 
         for role in roles:  # setup system message with roles
             role.set_env(self)
+            if self._is_pending(role):
+                self.wake_up(role)
 
     def publish_message(self, message: Message, peekable: bool = True) -> bool:
         """
@@ -106,31 +138,53 @@ class Environment(BaseModel):
         in RFC 113.
         """
         logger.debug(f"publish_message: {message.dump()}")
-        found = False
         # According to the routing feature plan in Chapter 2.2.3.2 of RFC 113
-        for role, subscription in self.members.items():
-            if is_subscribed(message, subscription):
-                role.put_message(message)
-                found = True
-        if not found:
+        recipients = self._get_recipients(message)
+        for role in recipients:
+            role.put_message(message)
+        if not recipients:
             logger.warning(f"Message no recipients: {message.dump()}")
-        self.history += f"\n{message}"  # For debug
+        self._history.append(f"\n{message}")  # For debug
 
         return True
 
     async def run(self, k=1):
         """处理一次所有信息的运行
         Process all Role runs at once
+
+        Only the roles woken up by `wake_up` run in a round, in the order they were woken up. A role that has just run
+        is scheduled once more, so that it observes an empty buffer and becomes idle, as it would in a full round.
         """
         for _ in range(k):
-            futures = []
-            for role in self.roles.values():
-                future = role.run()
-                futures.append(future)
-
-            await asyncio.gather(*futures)
+            roles = [role for role in self._ready if self._is_pending(role)]
+            self._ready = {}
+            await self._run_roles(roles)
+            for role in roles:
+                if not role.is_idle:
+                    self.wake_up(role)
             logger.debug(f"is idle: {self.is_idle}")
 
+    async def _run_roles(self, roles: list[Role]):
+        if not self.max_concurrency:
+            await asyncio.gather(*[role.run() for role in roles])
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _run(role: Role):
+            async with semaphore:
+                await role.run()
+
+        await asyncio.gather(*[_run(role) for role in roles])
+
+    def wake_up(self, role: Role):
+        """Schedule the role to run in the next round. Called when a message is put into the role's buffer."""
+        self._ready[role] = None
+
+    @staticmethod
+    def _is_pending(role: Role) -> bool:
+        return not role.is_idle or bool(role.recovered and role.latest_observed_msg)
+
     def get_roles(self) -> dict[str, Role]:
         """获得环境内的所有角色
         Process all Role runs at once
@@ -160,7 +214,22 @@ class Environment(BaseModel):
 
     def set_subscription(self, obj, tags):
         """Set the labels for message to be consumed by the object"""
+        for tag in self.members.get(obj, set()):
+            self._routes[tag].pop(obj, None)
+            if not self._routes[tag]:
+                del self._routes[tag]
         self.members[obj] = tags
+        for tag in tags:
+            self._routes[tag][obj] = None
+
+    def _get_recipients(self, message: Message) -> list[Role]:
+        """Look up the subscribers of the message in the routing table, in the same way as `is_subscribed`."""
+        if MESSAGE_ROUTE_TO_ALL in message.send_to:
+            return list(self.members.keys())
+        recipients = {}
+        for tag in message.send_to:
+            recipients.update(self._routes.get(tag, {}))
+        return list(recipients.keys())
 
     @staticmethod
     def archive(auto_archive=True):
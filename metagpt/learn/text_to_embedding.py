@@ -8,7 +8,8 @@
 """
 
 from metagpt.config import CONFIG
-from metagpt.tools.openai_text_to_embedding import oas3_openai_text_to_embedding
+from metagpt.document_store.embedding_cache import EmbeddingCache, get_embedding_cache
+from metagpt.tools.openai_text_to_embedding import Embedding, ResultEmbedding, oas3_openai_text_to_embedding
 
 
 async def text_to_embedding(text, model="text-embedding-ada-002", openai_api_key="", **kwargs):
@@ -19,6 +20,16 @@ async def text_to_embedding(text, model="text-embedding-ada-002", openai_api_key
     :param openai_api_key: OpenAI API key, For more details, checkout: `https://platform.openai.com/account/api-keys`
     :return: A json object of :class:`ResultEmbedding` class if successful, otherwise `{}`.
     """
-    if CONFIG.OPENAI_API_KEY or openai_api_key:
-        return await oas3_openai_text_to_embedding(text, model=model, openai_api_key=openai_api_key)
-    raise EnvironmentError
+    if not (CONFIG.OPENAI_API_KEY or openai_api_key):
+        raise EnvironmentError
+    cache = get_embedding_cache() if isinstance(text, str) and text else None
+    key = EmbeddingCache.make_key(model, text) if cache else None
+    if cache:
+        vector = cache.get([key])[0]
+        if vector is not None:
+            data = [Embedding(object="embedding", embedding=vector.tolist(), index=0)]
+            return ResultEmbedding(object_="list", data=data, model=model)
+    result = await oas3_openai_text_to_embedding(text, model=model, openai_api_key=openai_api_key)
+    if cache and result and result.data:
+        cache.set([key], [result.data[0].embedding])
+    return result
@@ -7,8 +7,11 @@
 """
 
 import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from functools import partial
+from typing import Callable, Optional
 
 from loguru import logger as _logger
 
@@ -31,6 +34,9 @@ logger = define_log_level()
 
 def log_llm_stream(msg):
     _llm_stream_log(msg)
+    listener = _llm_stream_listener.get()
+    if listener:
+        listener(msg)
 
 
 def set_llm_stream_logfunc(func):
@@ -38,4 +44,15 @@ def set_llm_stream_logfunc(func):
     _llm_stream_log = func
 
 
+@contextmanager
+def llm_stream_listener(func: Callable[[str], None]):
+    """Pass the LLM stream of the current task to `func` too, an exception raised by `func` aborts the stream"""
+    token = _llm_stream_listener.set(func)
+    try:
+        yield
+    finally:
+        _llm_stream_listener.reset(token)
+
+
 _llm_stream_log = partial(print, end="")
+_llm_stream_listener: ContextVar[Optional[Callable[[str], None]]] = ContextVar("llm_stream_listener", default=None)
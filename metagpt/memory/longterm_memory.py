@@ -61,12 +61,9 @@ class LongTermMemory(Memory):
             # memory_storage hasn't initialized, use default `find_news` to get stm_news
             return stm_news
 
-        ltm_news: list[Message] = []
-        for mem in stm_news:
-            # filter out messages similar to those seen previously in ltm, only keep fresh news
-            mem_searched = self.memory_storage.search_dissimilar(mem)
-            if len(mem_searched) > 0:
-                ltm_news.append(mem)
+        # filter out messages similar to those seen previously in ltm, only keep fresh news
+        searched = self.memory_storage.search_dissimilar_batch(stm_news)
+        ltm_news: list[Message] = [mem for mem, mem_searched in zip(stm_news, searched) if len(mem_searched) > 0]
         return ltm_news[-k:]
 
     def delete(self, message: Message):
@@ -10,7 +10,7 @@ from collections import defaultdict
 from pathlib import Path
 from typing import DefaultDict, Iterable, Set
 
-from pydantic import BaseModel, Field, SerializeAsAny
+from pydantic import BaseModel, Field, PrivateAttr, SerializeAsAny, model_validator
 
 from metagpt.const import IGNORED_MESSAGE_ID
 from metagpt.schema import Message
@@ -23,12 +23,31 @@ from metagpt.utils.common import (
 
 
 class Memory(BaseModel):
-    """The most basic memory: super-memory"""
+    """The most basic memory: super-memory
+
+    `storage` keeps the messages in arrival order, `index` groups them by `cause_by`. Both are serialized. The private
+    indexes below are rebuilt from `storage` and make dedup and lookups independent of the memory size.
+    """
 
     storage: list[SerializeAsAny[Message]] = []
     index: DefaultDict[str, list[SerializeAsAny[Message]]] = Field(default_factory=lambda: defaultdict(list))
     ignore_id: bool = False
 
+    _keys: dict[str, Message] = PrivateAttr(default_factory=dict)  # message key -> message, in arrival order
+    _role_index: DefaultDict[str, dict[str, Message]] = PrivateAttr(default_factory=lambda: defaultdict(dict))
+    _sent_from_index: DefaultDict[str, dict[str, Message]] = PrivateAttr(default_factory=lambda: defaultdict(dict))
+    _send_to_index: DefaultDict[str, dict[str, Message]] = PrivateAttr(default_factory=lambda: defaultdict(dict))
+
+    @model_validator(mode="after")
+    def rebuild_indexes(self):
+        storage = self.storage
+        self.storage = []
+        self.index = defaultdict(list, self.index) if not storage else defaultdict(list)
+        self._reset_private_indexes()
+        for message in storage:
+            self._add(message)
+        return self
+
     def serialize(self, stg_path: Path):
         """stg_path = ./storage/team/environment/ or ./storage/team/environment/roles/{role_class}_{role_name}/"""
         memory_path = stg_path.joinpath("memory.json")
@@ -45,23 +64,67 @@ class Memory(BaseModel):
 
         return memory
 
-    def add(self, message: Message):
-        """Add a new message to storage, while updating the index"""
+    def _key(self, message: Message) -> str:
+        """Return the dedup key of a message. Messages sharing an id are the same message, unless ids are ignored."""
         if self.ignore_id:
-            message.id = IGNORED_MESSAGE_ID
-        if message in self.storage:
+            return message.model_dump_json(exclude={"id"}, warnings=False)
+        return message.id
+
+    def _reset_private_indexes(self):
+        self._keys = {}
+        self._role_index = defaultdict(dict)
+        self._sent_from_index = defaultdict(dict)
+        self._send_to_index = defaultdict(dict)
+
+    def _add(self, message: Message):
+        key = self._key(message)
+        if key in self._keys:
             return
+        self._keys[key] = message
         self.storage.append(message)
         if message.cause_by:
             self.index[message.cause_by].append(message)
+        self._role_index[message.role][key] = message
+        self._sent_from_index[message.sent_from][key] = message
+        for tag in message.send_to:
+            self._send_to_index[tag][key] = message
+
+    def _remove(self, key: str, message: Message):
+        """Remove a stored message from the indexes. Lists are scanned backwards since recent messages are the ones
+        usually removed."""
+        del self._keys[key]
+        if message.cause_by:
+            _remove_last(self.index.get(message.cause_by, []), message)
+        self._role_index[message.role].pop(key, None)
+        self._sent_from_index[message.sent_from].pop(key, None)
+        for tag in message.send_to:
+            self._send_to_index[tag].pop(key, None)
+
+    def add(self, message: Message):
+        """Add a new message to storage, while updating the index"""
+        if self.ignore_id:
+            message.id = IGNORED_MESSAGE_ID
+        self._add(message)
 
     def add_batch(self, messages: Iterable[Message]):
         for message in messages:
             self.add(message)
 
+    def exists(self, message: Message) -> bool:
+        """Return true if the message has been stored"""
+        return self._key(message) in self._keys
+
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        return list(self._role_index.get(role, {}).values())
+
+    def get_by_sent_from(self, sent_from) -> list[Message]:
+        """Return all messages sent from a specified object"""
+        return list(self._sent_from_index.get(any_to_str(sent_from), {}).values())
+
+    def get_by_send_to(self, send_to) -> list[Message]:
+        """Return all messages addressed to a specified tag"""
+        return list(self._send_to_index.get(any_to_str(send_to), {}).values())
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
@@ -71,8 +134,11 @@ class Memory(BaseModel):
         """delete the newest message from the storage"""
         if len(self.storage) > 0:
             newest_msg = self.storage.pop()
-            if newest_msg.cause_by and newest_msg in self.index[newest_msg.cause_by]:
-                self.index[newest_msg.cause_by].remove(newest_msg)
+            key = self._key(newest_msg)
+            if self._keys.get(key) is not newest_msg:  # the message was modified after being stored
+                key = next((k for k, v in self._keys.items() if v is newest_msg), None)
+            if key is not None:  # None if not indexed, such as appended to the storage directly
+                self._remove(key, newest_msg)
         else:
             newest_msg = None
         return newest_msg
@@ -81,14 +147,18 @@ class Memory(BaseModel):
         """Delete the specified message from storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        self.storage.remove(message)
-        if message.cause_by and message in self.index[message.cause_by]:
-            self.index[message.cause_by].remove(message)
+        key = self._key(message)
+        stored = self._keys.get(key)
+        if stored is None:
+            raise ValueError(f"Message not in memory: {message}")
+        _remove_last(self.storage, stored)
+        self._remove(key, stored)
 
     def clear(self):
         """Clear storage and index"""
         self.storage = []
         self.index = defaultdict(list)
+        self._reset_private_indexes()
 
     def count(self) -> int:
         """Return the number of messages in storage"""
@@ -104,13 +174,10 @@ class Memory(BaseModel):
 
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """find news (previously unseen messages) from the the most recent k memories, from all memories when k=0"""
-        already_observed = self.get(k)
-        news: list[Message] = []
-        for i in observed:
-            if i in already_observed:
-                continue
-            news.append(i)
-        return news
+        if k == 0 or k >= len(self.storage):
+            return [i for i in observed if not self.exists(i)]
+        already_observed = {self._key(i) for i in self.get(k)}
+        return [i for i in observed if self._key(i) not in already_observed]
 
     def get_by_action(self, action) -> list[Message]:
         """Return all messages triggered by a specified Action"""
@@ -126,3 +193,11 @@ class Memory(BaseModel):
                 continue
             rsp += self.index[action]
         return rsp
+
+
+def _remove_last(messages: list[Message], message: Message):
+    """Remove the last occurrence of `message` from `messages` by identity."""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i] is message:
+            del messages[i]
+            return
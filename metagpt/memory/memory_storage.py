@@ -2,37 +2,59 @@
 # -*- coding: utf-8 -*-
 """
 @Desc   : the implement of memory storage
+    Added messages are buffered and embedded in batches; the index is written to disk when `flush_size` messages are
+    buffered, `flush_interval` seconds have passed since the last write, or at shutdown.
 @Modified By: mashenquan, 2023/8/20. Remove global configuration `CONFIG`, enable configuration support for business isolation.
 """
 
+import atexit
+import time
+import weakref
 from pathlib import Path
 from typing import Optional
 
+import faiss
+import numpy as np
 from langchain.embeddings import OpenAIEmbeddings
 from langchain.vectorstores.faiss import FAISS
 from langchain_core.embeddings import Embeddings
 
 from metagpt.const import DATA_PATH, MEM_TTL
-from metagpt.document_store.faiss_store import FaissStore
+from metagpt.document_store.embedding_cache import CachedEmbeddings
+from metagpt.document_store.faiss_store import FaissStore, save_local
 from metagpt.logs import logger
 from metagpt.schema import Message
 from metagpt.utils.serialize import deserialize_message, serialize_message
 
+_STORAGES = weakref.WeakSet()  # storages to flush at shutdown
+
 
 class MemoryStorage(FaissStore):
     """
     The memory storage with Faiss as ANN search engine
     """
 
-    def __init__(self, mem_ttl: int = MEM_TTL, embedding: Embeddings = None):
+    def __init__(
+        self,
+        mem_ttl: int = MEM_TTL,
+        embedding: Embeddings = None,
+        flush_size: int = 32,
+        flush_interval: float = 60,
+    ):
         self.role_id: str = None
         self.role_mem_path: str = None
         self.mem_ttl: int = mem_ttl  # later use
         self.threshold: float = 0.1  # experience value. TODO The threshold to filter similar memories
+        self.flush_size: int = flush_size
+        self.flush_interval: float = flush_interval
         self._initialized: bool = False
+        self._buffer: list[Message] = []  # messages not embedded yet
+        self._dirty: bool = False  # the index has changes not written to disk
+        self._last_flush: float = time.time()
 
-        self.embedding = embedding or OpenAIEmbeddings()
+        self.embedding = embedding or CachedEmbeddings(OpenAIEmbeddings())
         self.store: FAISS = None  # Faiss engine
+        _STORAGES.add(self)
 
     @property
     def is_initialized(self) -> bool:
@@ -48,6 +70,9 @@ class MemoryStorage(FaissStore):
         return FAISS.load_local(self.role_mem_path, self.embedding, self.role_id)
 
     def recover_memory(self, role_id: str) -> list[Message]:
+        if self.role_id and self.role_id != role_id:
+            self.flush()
+        self._buffer, self._dirty = [], False
         self.role_id = role_id
         self.role_mem_path = Path(DATA_PATH / f"role_mem/{self.role_id}/")
         self.role_mem_path.mkdir(parents=True, exist_ok=True)
@@ -73,42 +98,68 @@ class MemoryStorage(FaissStore):
         return index_fpath, storage_fpath
 
     def persist(self):
-        self.store.save_local(self.role_mem_path, self.role_id)
+        """Write the index and the docstore to temporary files first, then move them into place, so that a crash
+        never leaves a truncated file behind."""
+        self._embed_buffer()
+        if not self.store:
+            return
+        save_local(self.store, self.role_mem_path, self.role_id)
+        self._dirty = False
+        self._last_flush = time.time()
         logger.debug(f"Agent {self.role_id} persist memory into local")
 
-    def add(self, message: Message) -> bool:
-        """add message into memory storage"""
-        docs = [message.content]
-        metadatas = [{"message_ser": serialize_message(message)}]
+    def flush(self):
+        """Embed the buffered messages and write the index to disk if it changed"""
+        if self._buffer or self._dirty:
+            self.persist()
+
+    def _embed_buffer(self):
+        """Embed the buffered messages in one call and append them to the index"""
+        if not self._buffer:
+            return
+        messages, self._buffer = self._buffer, []
+        docs = [i.content for i in messages]
+        metadatas = [{"message_ser": serialize_message(i)} for i in messages]
         if not self.store:
             # init Faiss
             self.store = self._write(docs, metadatas)
-            self._initialized = True
         else:
             self.store.add_texts(texts=docs, metadatas=metadatas)
-        self.persist()
+        self._dirty = True
+
+    def add(self, message: Message) -> bool:
+        """add message into memory storage"""
+        self._buffer.append(message)
+        self._initialized = True
+        if len(self._buffer) >= self.flush_size or time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
         logger.info(f"Agent {self.role_id}'s memory_storage add a message")
 
     def search_dissimilar(self, message: Message, k=4) -> list[Message]:
         """search for dissimilar messages"""
-        if not self.store:
-            return []
-
-        resp = self.store.similarity_search_with_score(query=message.content, k=k)
-        # filter the result which score is smaller than the threshold
-        filtered_resp = []
-        for item, score in resp:
-            # the smaller score means more similar relation
-            if score < self.threshold:
-                continue
+        return self.search_dissimilar_batch([message], k=k)[0]
+
+    def search_dissimilar_batch(self, messages: list[Message], k=4) -> list[list[Message]]:
+        """search for dissimilar messages of each message, with one embedding call and one index search"""
+        self._embed_buffer()
+        if not self.store or not messages:
+            return [[] for _ in messages]
+
+        vectors = np.array(self.embedding.embed_documents([i.content for i in messages]), dtype=np.float32)
+        if self.store._normalize_L2:
+            faiss.normalize_L2(vectors)
+        scores, indices = self.store.index.search(vectors, k)
+        # the smaller score means more similar relation, filter the result which score is smaller than the threshold
+        hits = (indices != -1) & (scores >= self.threshold)
+        results = []
+        for row, hit in zip(indices, hits):
             # convert search result into Memory
-            metadata = item.metadata
-            new_mem = deserialize_message(metadata.get("message_ser"))
-            filtered_resp.append(new_mem)
-        return filtered_resp
+            docs = [self.store.docstore.search(self.store.index_to_docstore_id[i]) for i in row[hit]]
+            results.append([deserialize_message(i.metadata.get("message_ser")) for i in docs])
+        return results
 
     def clean(self):
-        index_fpath, storage_fpath = self._get_index_and_store_fname()
+        index_fpath, storage_fpath = self._get_index_and_store_fname(index_ext=".faiss")
         if index_fpath and index_fpath.exists():
             index_fpath.unlink(missing_ok=True)
         if storage_fpath and storage_fpath.exists():
@@ -116,3 +167,13 @@ class MemoryStorage(FaissStore):
 
         self.store = None
         self._initialized = False
+        self._buffer, self._dirty = [], False
+
+
+@atexit.register
+def _flush_storages():
+    for storage in list(_STORAGES):
+        try:
+            storage.flush()
+        except Exception as e:
+            logger.warning(f"Agent {storage.role_id} persist memory failed: {e}")
@@ -11,7 +11,6 @@
 
 
 from openai import AsyncAzureOpenAI
-from openai._base_client import AsyncHttpxClientWrapper
 
 from metagpt.config import LLMProviderEnum
 from metagpt.provider.llm_provider_registry import register_provider
@@ -25,9 +24,9 @@ class AzureOpenAILLM(OpenAILLM):
     """
 
     def _init_client(self):
-        kwargs = self._make_client_kwargs()
         # https://learn.microsoft.com/zh-cn/azure/ai-services/openai/how-to/migration?tabs=python-new%2Cdalle-fix
-        self.aclient = AsyncAzureOpenAI(**kwargs)
+        self._client_cls = AsyncAzureOpenAI
+        self._aclient = None
         self.model = self.config.DEPLOYMENT_NAME  # Used in _calc_usage & _cons_kwargs
 
     def _make_client_kwargs(self) -> dict:
@@ -36,10 +35,4 @@ class AzureOpenAILLM(OpenAILLM):
             api_version=self.config.OPENAI_API_VERSION,
             azure_endpoint=self.config.OPENAI_BASE_URL,
         )
-
-        # to use proxy, openai v1 needs http_client
-        proxy_params = self._get_proxy_params()
-        if proxy_params:
-            kwargs["http_client"] = AsyncHttpxClientWrapper(**proxy_params)
-
         return kwargs
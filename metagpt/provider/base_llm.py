@@ -6,10 +6,17 @@
 @File    : base_llm.py
 @Desc    : mashenquan, 2023/8/22. + try catch
 """
+import asyncio
 import json
+import re
 from abc import ABC, abstractmethod
 from typing import Optional
 
+from metagpt.config import CONFIG
+from metagpt.logs import log_llm_stream
+from metagpt.provider.llm_cache import LLMCache, get_llm_cache
+from metagpt.provider.rate_limiter import LLM_RATE_LIMITERS
+
 
 class BaseLLM(ABC):
     """LLM API abstract class, requiring all inheritors to provide a series of standard capabilities"""
@@ -49,7 +56,7 @@ class BaseLLM(ABC):
         if format_msgs:
             message.extend(format_msgs)
         message.append(self._user_msg(msg))
-        rsp = await self.acompletion_text(message, stream=stream, timeout=timeout)
+        rsp = await self.acompletion_text_with_cache(message, stream=stream, timeout=timeout)
         return rsp
 
     def _extract_assistant_rsp(self, context):
@@ -61,10 +68,52 @@ class BaseLLM(ABC):
         for msg in msgs:
             umsg = self._user_msg(msg)
             context.append(umsg)
-            rsp_text = await self.acompletion_text(context, timeout=timeout)
+            rsp_text = await self.acompletion_text_with_cache(context, timeout=timeout)
             context.append(self._assistant_msg(rsp_text))
         return self._extract_assistant_rsp(context)
 
+    async def acompletion_text_with_cache(self, messages: list[dict], stream=False, timeout=3) -> str:
+        """`acompletion_text`, answered from the response cache when `LLM_CACHE` is enabled.
+        A cached reply is replayed piece by piece to the stream log when `stream` is true.
+        Requests sent to the provider wait for the rate limiter when `LLM_RPM` or `LLM_TPM` is set.
+        The SQLite lookups run in a worker thread so they do not block the event loop."""
+        cache = get_llm_cache()
+        if not cache:
+            return await self._acompletion_text_limited(messages, stream=stream, timeout=timeout)
+
+        key = LLMCache.make_key(**self._cache_key_params(messages), messages=messages)
+        rsp = await asyncio.to_thread(cache.get, key)
+        CONFIG.cost_manager.update_cache_stats(hit=rsp is not None)
+        if rsp is None:
+            rsp = await self._acompletion_text_limited(messages, stream=stream, timeout=timeout)
+            await asyncio.to_thread(cache.set, key, rsp)
+        elif stream:
+            for chunk in re.findall(r"\s*\S+|\s+", rsp):
+                log_llm_stream(chunk)
+            log_llm_stream("\n")
+        return rsp
+
+    async def _acompletion_text_limited(self, messages: list[dict], stream=False, timeout=3) -> str:
+        await self._acquire_rate_limit(messages)
+        return await self.acompletion_text(messages, stream=stream, timeout=timeout)
+
+    async def _acquire_rate_limit(self, messages: list[dict]):
+        """Wait for the rate limiter of the provider/model before sending `messages`,
+        a no-op unless `LLM_RPM` or `LLM_TPM` is set."""
+        await LLM_RATE_LIMITERS.acquire(type(self).__name__, getattr(self, "model", ""), messages)
+
+    def _cache_key_params(self, messages: list[dict]) -> dict:
+        """Request parameters, besides the messages, that change the reply: the ones the provider builds with
+        `_cons_kwargs` or `_const_kwargs`, without the messages, the stream flag and the timeout."""
+        params = {"provider": type(self).__name__, "model": getattr(self, "model", "")}
+        cons_kwargs = getattr(self, "_cons_kwargs", None) or getattr(self, "_const_kwargs", None)
+        if cons_kwargs:
+            kwargs = cons_kwargs(messages)
+            for i in ("messages", "contents", "stream", "timeout"):
+                kwargs.pop(i, None)
+            params.update(kwargs)
+        return params
+
     async def aask_code(self, msgs: list[str], timeout=3) -> str:
         """FIXME: No code segment filtering has been done here, and all results are actually displayed"""
         rsp_text = await self.aask_batch(msgs, timeout=timeout)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : client_pool.py
+@Desc    : Share API clients, and so their HTTP connection pools, between LLM provider instances with the same settings.
+    Provider instances stay per role, since they carry the role's `system_prompt`. Connections belong to the event loop
+    they were opened in, so clients are pooled per running loop, and providers get theirs when used, in the loop.
+"""
+import asyncio
+import weakref
+
+import httpx
+from openai._base_client import AsyncHttpxClientWrapper
+from openai._constants import DEFAULT_TIMEOUT
+
+from metagpt.config import CONFIG
+
+
+class LLMClientPool:
+    def __init__(self):
+        self._loop_clients = weakref.WeakKeyDictionary()  # event loop -> clients created in the loop
+
+    def get_client(self, client_cls, proxy_params: dict = None, **kwargs):
+        """Return the `client_cls(**kwargs)` instance shared in the running event loop, or a new one if no loop runs.
+
+        :param client_cls: An openai client class, such as `AsyncOpenAI` or `AsyncAzureOpenAI`.
+        :param proxy_params: The parameters of the httpx client, see `OpenAILLM._get_proxy_params`.
+        :param kwargs: The client parameters, `http_client` is replaced by the pooled one.
+        """
+        kwargs.pop("http_client", None)
+        proxy_params = proxy_params or {}
+        try:
+            clients = self._loop_clients.setdefault(asyncio.get_running_loop(), {})
+        except RuntimeError:  # not pooled, its connections would outlive the loop they will be opened in
+            return self._new_client(client_cls, proxy_params, kwargs)
+        key = (client_cls, tuple(sorted(kwargs.items())), tuple(sorted(proxy_params.items())))
+        client = clients.get(key)
+        if client is None or client.is_closed():
+            client = clients[key] = self._new_client(client_cls, proxy_params, kwargs)
+        return client
+
+    def _new_client(self, client_cls, proxy_params: dict, kwargs: dict):
+        http_client = AsyncHttpxClientWrapper(
+            **proxy_params, timeout=DEFAULT_TIMEOUT, limits=self._limits(), follow_redirects=True
+        )
+        return client_cls(**kwargs, http_client=http_client)
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=CONFIG.llm_max_connections,
+            max_keepalive_connections=CONFIG.llm_max_keepalive_connections,
+            keepalive_expiry=CONFIG.llm_keepalive_expiry,
+        )
+
+    def clear(self):
+        self._loop_clients = weakref.WeakKeyDictionary()
+
+
+# Pool instance
+LLM_CLIENT_POOL = LLMClientPool()
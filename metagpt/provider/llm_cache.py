@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : llm_cache.py
+@Desc    : Opt-in, SQLite-backed cache of LLM replies, keyed by a hash of the request. Enabled by `LLM_CACHE: true`.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from metagpt.config import CONFIG
+from metagpt.const import CACHE_PATH
+from metagpt.logs import logger
+
+
+class LLMCache:
+    """Persistent reply cache with a time-to-live and a least-recently-used size cap.
+    It is safe to call from several threads, e.g. with `asyncio.to_thread`.
+
+    :param path: The SQLite file.
+    :param ttl: Seconds before an entry expires, 0 means never.
+    :param max_entries: Number of entries kept, the least recently used ones are evicted first. 0 means unlimited.
+    """
+
+    def __init__(self, path: Path, ttl: float = 0, max_entries: int = 0):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(**kwargs) -> str:
+        """Content-addressed key of a request, e.g. `make_key(model=..., messages=..., temperature=..., max_tokens=...)`"""
+        data = json.dumps(kwargs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            now = time.time()
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the configured cache, or None if `LLM_CACHE` is disabled."""
+    global _llm_cache
+    if not CONFIG.llm_cache:
+        return None
+    path = Path(CONFIG.llm_cache_path or CACHE_PATH / "llm_cache.db").expanduser()
+    if _llm_cache is None or _llm_cache.path != path:
+        logger.info(f"LLM cache: {path}")
+        _llm_cache = LLMCache(path, ttl=CONFIG.llm_cache_ttl, max_entries=CONFIG.llm_cache_max_entries)
+    return _llm_cache
@@ -9,7 +9,7 @@ from metagpt.logs import logger
 from metagpt.provider.llm_provider_registry import register_provider
 from metagpt.provider.openai_api import OpenAILLM
 from metagpt.utils.cost_manager import CostManager, Costs
-from metagpt.utils.token_counter import count_message_tokens, count_string_tokens
+from metagpt.utils.token_counter import estimate_message_tokens, estimate_string_tokens
 
 
 class OpenLLMCostManager(CostManager):
@@ -57,8 +57,9 @@ class OpenLLM(OpenAILLM):
             return usage
 
         try:
-            usage.prompt_tokens = count_message_tokens(messages, "open-llm-model")
-            usage.completion_tokens = count_string_tokens(rsp, "open-llm-model")
+            # the tokenizer of the self-hosted model is unknown, the result is a reference only
+            usage.prompt_tokens = estimate_message_tokens(messages)
+            usage.completion_tokens = estimate_string_tokens(rsp)
         except Exception as e:
             logger.error(f"usage calculation failed!: {e}")
 
@@ -13,7 +13,6 @@ import json
 from typing import AsyncIterator, Union
 
 from openai import APIConnectionError, AsyncOpenAI, AsyncStream
-from openai._base_client import AsyncHttpxClientWrapper
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from tenacity import (
@@ -27,6 +26,7 @@ from tenacity import (
 from metagpt.config import CONFIG, Config, LLMProviderEnum
 from metagpt.logs import log_llm_stream, logger
 from metagpt.provider.base_llm import BaseLLM
+from metagpt.provider.client_pool import LLM_CLIENT_POOL
 from metagpt.provider.constant import GENERAL_FUNCTION_SCHEMA, GENERAL_TOOL_CHOICE
 from metagpt.provider.llm_provider_registry import register_provider
 from metagpt.schema import Message
@@ -35,6 +35,8 @@ from metagpt.utils.exceptions import handle_exception
 from metagpt.utils.token_counter import (
     count_message_tokens,
     count_string_tokens,
+    estimate_message_tokens,
+    estimate_string_tokens,
     get_max_completion_tokens,
 )
 
@@ -65,17 +67,25 @@ class OpenAILLM(BaseLLM):
 
     def _init_client(self):
         """https://github.com/openai/openai-python#async-usage"""
-        kwargs = self._make_client_kwargs()
-        self.aclient = AsyncOpenAI(**kwargs)
-
-    def _make_client_kwargs(self) -> dict:
-        kwargs = {"api_key": self.config.openai_api_key, "base_url": self.config.openai_base_url}
+        self._client_cls = AsyncOpenAI
+        self._aclient = None
+
+    @property
+    def aclient(self):
+        """The client shared by `LLM_CLIENT_POOL` in the running event loop, unless one was set."""
+        if self._aclient is not None:
+            return self._aclient
+        # the proxy settings go to the pooled http client
+        return LLM_CLIENT_POOL.get_client(
+            self._client_cls, proxy_params=self._get_proxy_params(), **self._make_client_kwargs()
+        )
 
-        # to use proxy, openai v1 needs http_client
-        if proxy_params := self._get_proxy_params():
-            kwargs["http_client"] = AsyncHttpxClientWrapper(**proxy_params)
+    @aclient.setter
+    def aclient(self, client):
+        self._aclient = client
 
-        return kwargs
+    def _make_client_kwargs(self) -> dict:
+        return {"api_key": self.config.openai_api_key, "base_url": self.config.openai_base_url}
 
     def _get_proxy_params(self) -> dict:
         params = {}
@@ -116,6 +126,7 @@ class OpenAILLM(BaseLLM):
         return rsp
 
     async def acompletion(self, messages: list[dict], timeout=3) -> ChatCompletion:
+        await self._acquire_rate_limit(messages)
         return await self._achat_completion(messages, timeout=timeout)
 
     @retry(
@@ -156,6 +167,7 @@ class OpenAILLM(BaseLLM):
         return self._cons_kwargs(messages=messages, timeout=timeout, **kwargs)
 
     async def _achat_completion_function(self, messages: list[dict], timeout=3, **chat_configs) -> ChatCompletion:
+        await self._acquire_rate_limit(messages)
         kwargs = self._func_configs(messages=messages, timeout=timeout, **chat_configs)
         rsp: ChatCompletion = await self.aclient.chat.completions.create(**kwargs)
         self._update_costs(rsp.usage)
@@ -212,6 +224,10 @@ class OpenAILLM(BaseLLM):
         try:
             usage.prompt_tokens = count_message_tokens(messages, self.model)
             usage.completion_tokens = count_string_tokens(rsp, self.model)
+        except NotImplementedError:
+            # not an OpenAI model, the tokenizer is unknown
+            usage.prompt_tokens = estimate_message_tokens(messages)
+            usage.completion_tokens = estimate_string_tokens(rsp)
         except Exception as e:
             logger.error(f"usage calculation failed: {e}")
 
@@ -233,4 +249,6 @@ class OpenAILLM(BaseLLM):
     @handle_exception
     async def amoderation(self, content: Union[str, list[str]]):
         """Moderate content."""
+        inputs = [content] if isinstance(content, str) else content
+        await self._acquire_rate_limit([self._user_msg(i) for i in inputs])
         return await self.aclient.moderations.create(input=content)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : rate_limiter.py
+@Desc    : Client-side requests-per-minute and tokens-per-minute governor for LLM providers, so that calls wait for
+    their turn instead of being rejected with 429 and retried with exponential back-off.
+    Enabled by `LLM_RPM` and/or `LLM_TPM`.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from metagpt.config import CONFIG
+from metagpt.logs import logger
+from metagpt.utils.token_counter import count_message_tokens, estimate_message_tokens
+
+
+class TokenBucket:
+    """A bucket of `per_minute` units refilled continuously. Reservations may overdraw the bucket, callers then wait
+    until the debt is paid back, so callers are served in the order they reserved."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        """Reserve `amount` units and return the seconds to wait before using them."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= min(amount, self.capacity)
+        return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount: float):
+        """Give back `amount` units of a reservation that will not be used."""
+        self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+
+class RateLimiter:
+    """The governor of one provider/model."""
+
+    def __init__(self, rpm: float = 0, tpm: float = 0):
+        self.rpm = TokenBucket(rpm) if rpm else None
+        self.tpm = TokenBucket(tpm) if tpm else None
+        self.waiting = 0  # queue depth
+        self.requests = 0
+        self.total_wait = 0.0
+
+    async def acquire(self, tokens: int = 0):
+        delays = [0]
+        if self.rpm:
+            delays.append(self.rpm.reserve(1))
+        if self.tpm:
+            delays.append(self.tpm.reserve(tokens))
+        delay = max(delays)
+        self.requests += 1
+        if delay <= 0:
+            return
+        self.waiting += 1
+        self.total_wait += delay
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # The request will not be sent: free its share so the callers queued behind it do not wait for it
+            if self.rpm:
+                self.rpm.refund(1)
+            if self.tpm:
+                self.tpm.refund(tokens)
+            self.requests -= 1
+            self.total_wait -= delay
+            raise
+        finally:
+            self.waiting -= 1
+
+    def stats(self) -> dict:
+        return {"waiting": self.waiting, "requests": self.requests, "total_wait": self.total_wait}
+
+
+class RateLimiterRegistry:
+    def __init__(self):
+        self.limiters: dict[tuple, RateLimiter] = {}
+
+    def get(self, provider: str, model: str) -> Optional[RateLimiter]:
+        """Return the governor of the provider/model, or None if `LLM_RPM` and `LLM_TPM` are not set."""
+        if not CONFIG.llm_rpm and not CONFIG.llm_tpm:
+            return None
+        key = (provider, model)
+        if key not in self.limiters:
+            self.limiters[key] = RateLimiter(rpm=CONFIG.llm_rpm, tpm=CONFIG.llm_tpm)
+        return self.limiters[key]
+
+    async def acquire(self, provider: str, model: str, messages: list[dict]):
+        """Wait until the request of `messages` fits in the limits of the provider/model."""
+        limiter = self.get(provider, model)
+        if not limiter:
+            return
+        tokens = estimate_tokens(messages, model) if limiter.tpm else 0
+        await limiter.acquire(tokens)
+        if limiter.waiting:
+            logger.debug(f"{provider}/{model} rate limiter: {limiter.stats()}")
+
+    def stats(self) -> dict:
+        return {f"{provider}/{model}": limiter.stats() for (provider, model), limiter in self.limiters.items()}
+
+    def clear(self):
+        self.limiters = {}
+
+
+def estimate_tokens(messages: list[dict], model: str) -> int:
+    """Prompt tokens of the request, approximated for models unknown to tiktoken."""
+    try:
+        return count_message_tokens(messages, model)
+    except NotImplementedError:
+        return estimate_message_tokens(messages)
+
+
+# Registry instance
+LLM_RATE_LIMITERS = RateLimiterRegistry()
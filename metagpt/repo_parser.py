@@ -4,24 +4,34 @@
 @Time    : 2023/11/17 17:58
 @Author  : alexanderwu
 @File    : repo_parser.py
+@Desc    : Symbols of a repository by `ast`, and class views by `pyreverse`. The symbols of each file are cached on disk
+    by path and content hash when `REPO_SYMBOLS_CACHE` is enabled, only new and changed files are parsed, by a
+    process pool when there are many of them.
 """
 from __future__ import annotations
 
 import ast
+import hashlib
 import json
+import os
 import re
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 from pydantic import BaseModel, Field
 
-from metagpt.const import AGGREGATION, COMPOSITION, GENERALIZATION
+from metagpt.config import CONFIG
+from metagpt.const import AGGREGATION, CACHE_PATH, COMPOSITION, GENERALIZATION
 from metagpt.logs import logger
 from metagpt.utils.common import any_to_str, aread
 from metagpt.utils.exceptions import handle_exception
 
+SYMBOLS_CACHE_VERSION = 1  # bump when `RepoFileInfo` or its extraction changes
+PARALLEL_PARSE_MIN_FILES = 64  # fewer files to parse are not worth starting a process pool
+
 
 class RepoFileInfo(BaseModel):
     file: str
@@ -55,6 +65,8 @@ class ClassRelationship(BaseModel):
 
 class RepoParser(BaseModel):
     base_directory: Path = Field(default=None)
+    cache_path: Optional[Path] = None  # the symbols cache file, by `REPO_SYMBOLS_CACHE_PATH` and the directory if None
+    max_workers: Optional[int] = None  # processes parsing the files, the number of CPUs if None
 
     @classmethod
     @handle_exception(exception_type=Exception, default_return=[])
@@ -81,19 +93,101 @@ class RepoParser(BaseModel):
         return file_info
 
     def generate_symbols(self) -> List[RepoFileInfo]:
-        files_classes = []
         directory = self.base_directory
 
         matching_files = []
         extensions = ["*.py", "*.js"]
         for ext in extensions:
             matching_files += directory.rglob(ext)
-        for path in matching_files:
-            tree = self._parse_file(path)
-            file_info = self.extract_class_and_function_info(tree, path)
-            files_classes.append(file_info)
 
-        return files_classes
+        cache = self._load_symbols_cache()
+        entries = {}
+        pending = []  # (key, signature, sha) of the files to parse
+        for path in matching_files:
+            key = str(path.relative_to(directory))
+            entry = cache.get(key)
+            try:
+                stat = path.stat()
+                signature = [stat.st_mtime_ns, stat.st_size]
+                if entry and entry["signature"] == signature:
+                    entries[key] = entry
+                    continue
+                sha = hashlib.sha256(path.read_bytes()).hexdigest()
+            except OSError:  # such as a broken link, parsed into empty symbols
+                signature, sha = None, ""
+            if entry and entry["sha"] == sha:  # touched but unchanged
+                entries[key] = {**entry, "signature": signature}
+                continue
+            pending.append((key, signature, sha))
+
+        for (key, signature, sha), info in zip(pending, self._parse_files([directory / i[0] for i in pending])):
+            entries[key] = {"signature": signature, "sha": sha, "info": info}
+        if entries != cache:
+            self._save_symbols_cache(entries)
+        return [_to_file_info(entries[str(i.relative_to(directory))]["info"]) for i in matching_files]
+
+    def _parse_files(self, paths: List[Path]) -> List[RepoFileInfo]:
+        """Return the `RepoFileInfo` of each file, parsed in a process pool if there are many files"""
+        max_workers = self.max_workers or os.cpu_count() or 1
+        if len(paths) < PARALLEL_PARSE_MIN_FILES or max_workers == 1:
+            return [_parse_file_info(self.base_directory, i) for i in paths]
+        logger.info(f"Parse {len(paths)} files with {max_workers} processes")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunksize = max(1, len(paths) // (max_workers * 4))
+            return list(executor.map(_parse_file_info, [self.base_directory] * len(paths), paths, chunksize=chunksize))
+
+    def _symbols_cache_pathname(self) -> Path | None:
+        if not CONFIG.repo_symbols_cache:
+            return None
+        if self.cache_path:
+            return Path(self.cache_path)
+        directory = str(self.base_directory.resolve())
+        name = f"{self.base_directory.name}-{hashlib.sha256(directory.encode('utf-8')).hexdigest()[:16]}.json"
+        return Path(CONFIG.repo_symbols_cache_path or CACHE_PATH / "repo_symbols").expanduser() / name
+
+    def _load_symbols_cache(self) -> Dict[str, dict]:
+        """Return the cached {file: {"signature": [mtime_ns, size], "sha": content hash, "info": RepoFileInfo dict}}"""
+        pathname = self._symbols_cache_pathname()
+        if not pathname or not pathname.exists():
+            return {}
+        try:
+            data = json.loads(pathname.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignore the symbols cache {pathname}: {e}")
+            return {}
+        if data.get("version") != SYMBOLS_CACHE_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _save_symbols_cache(self, entries: Dict[str, dict]):
+        pathname = self._symbols_cache_pathname()
+        if not pathname:
+            return
+        pathname.parent.mkdir(parents=True, exist_ok=True)
+        tmp = pathname.with_name(f"{pathname.name}.{os.getpid()}.tmp")
+        data = json.dumps({"version": SYMBOLS_CACHE_VERSION, "files": entries}, default=_to_json)
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, pathname)
+
+    def find_symbols(self, name: str = None, kind: str = None) -> List[Tuple[str, str, str]]:
+        """Find classes, functions and global variables from the symbols, only the changed files are parsed again.
+
+        :param name: The symbol name, all the symbols if None.
+        :param kind: "class", "function" or "global", all kinds if None.
+        :return: A list of (file, kind, name).
+        """
+        symbols = []
+        for file_info in self.generate_symbols():
+            names = {
+                "class": [i["name"] for i in file_info.classes],
+                "function": file_info.functions,
+                "global": file_info.globals,
+            }
+            for k, v in names.items():
+                if kind and kind != k:
+                    continue
+                symbols.extend((file_info.file, k, i) for i in v if not name or i == name)
+        return symbols
 
     def generate_json_structure(self, output_path):
         """Generate a JSON file documenting the repository structure."""
@@ -417,5 +511,26 @@ class RepoParser(BaseModel):
         return "." + full_key[0:ix]
 
 
+def _parse_file_info(base_directory: Path, path: Path) -> RepoFileInfo:
+    """Parse a file, in a worker process of `RepoParser._parse_files`"""
+    parser = RepoParser(base_directory=base_directory)
+    return parser.extract_class_and_function_info(RepoParser._parse_file(path), path)
+
+
+def _to_json(obj):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return str(obj)  # such as `...` in the tokens, cached as "Ellipsis"
+
+
+def _to_file_info(info: RepoFileInfo | dict) -> RepoFileInfo:
+    """Return a freshly parsed `RepoFileInfo` as is, or build it from its cached dict"""
+    if isinstance(info, RepoFileInfo):
+        return info
+    file_info = RepoFileInfo(**info)
+    file_info.page_info = [CodeBlockInfo(**i) for i in info["page_info"]]
+    return file_info
+
+
 def is_func(node):
     return isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
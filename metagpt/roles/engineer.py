@@ -19,7 +19,9 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import re
 from collections import defaultdict
 from pathlib import Path
 from typing import Set
@@ -64,7 +66,7 @@ class Engineer(Role):
         profile (str): Role profile, default is 'Engineer'.
         goal (str): Goal of the engineer.
         constraints (str): Constraints for the engineer.
-        n_borg (int): Number of borgs.
+        n_borg (int): Number of borgs, the files written at the same time. A file waits for the files it depends on.
         use_code_review (bool): Whether to use code review.
     """
 
@@ -95,10 +97,71 @@ class Engineer(Role):
         m = json.loads(task_msg.content)
         return m.get("Task list")
 
+    @staticmethod
+    def _parse_code_dependencies(todos: list[WriteCode]) -> list[set[int]]:
+        """Return the indexes of the earlier todos each todo depends on, according to the "Logic Analysis" of its
+        task doc. A file missing from the analysis depends on all the earlier files.
+
+        This is best effort: an earlier file is a dependency only if its name or module is mentioned in the analysis,
+        so a dependency the analysis doesn't name is written concurrently, and only its code before this round, if any,
+        is in the prompt.
+        """
+        filenames = [Path(i.context.filename).name for i in todos]
+        dependencies = []
+        for n, todo in enumerate(todos):
+            analysis = Engineer._parse_logic_analysis(todo, filenames[n])
+            if analysis is None:
+                dependencies.append(set(range(n)))
+                continue
+            mentioned = {i for i in range(n) if re.search(_module_pattern(filenames[i]), analysis)}
+            dependencies.append(mentioned)
+        return dependencies
+
+    @staticmethod
+    def _parse_logic_analysis(todo: WriteCode, filename: str) -> str | None:
+        """The part of the "Logic Analysis" about `filename`, a list of [filename, description] or a text"""
+        coding_context = CodingContext.loads(todo.context.content)
+        if not coding_context or not coding_context.task_doc or not coding_context.task_doc.content:
+            return None
+        try:
+            analysis = json.loads(coding_context.task_doc.content).get("Logic Analysis")
+        except (json.JSONDecodeError, AttributeError):
+            return None
+        if isinstance(analysis, list):
+            lines = [" ".join(map(str, i[1:])) for i in analysis if i and Path(str(i[0])).name == filename]
+        elif isinstance(analysis, str):
+            lines = [i for i in analysis.splitlines() if filename in i]
+        else:
+            lines = []
+        return "\n".join(lines) if lines else None
+
     async def _act_sp_with_cr(self, review=False) -> Set[str]:
         changed_files = set()
         src_file_repo = CONFIG.git_repo.new_file_repository(CONFIG.src_workspace)
-        for todo in self.code_todos:
+        if self.n_borg > 1:
+            dependencies = self._parse_code_dependencies(self.code_todos)
+            # The prompt holds the new code of the files it depends on, directly or not, and the code before this round
+            # of the other files written in it, whatever else is saved meanwhile. Files not written in this round are
+            # read as saved.
+            before = {}
+            for todo in self.code_todos:
+                coding_context = CodingContext.loads(todo.context.content)
+                code_doc = coding_context.code_doc if coding_context else None
+                before[todo.context.filename] = code_doc.content if code_doc and code_doc.content else None
+            closures = []
+            for n, (todo, depends_on) in enumerate(zip(self.code_todos, dependencies)):
+                closures.append(depends_on.union(*[closures[i] for i in depends_on]))
+                todo.code_overrides = {
+                    i.context.filename: before[i.context.filename]
+                    for m, i in enumerate(self.code_todos)
+                    if m != n and m not in closures[-1]
+                }
+        else:
+            dependencies = [set(range(i)) for i in range(len(self.code_todos))]
+        saved = [asyncio.Event() for _ in self.code_todos]
+        semaphore = asyncio.Semaphore(max(self.n_borg, 1))
+
+        async def write_code(todo: WriteCode, depends_on: set[int]) -> CodingContext:
             """
             # Select essential information from the historical data to reduce the length of the prompt (summarized from human experience):
             1. All from Architect
@@ -106,26 +169,43 @@ class Engineer(Role):
             3. Do we need other codes (currently needed)?
             TODO: The goal is not to need it. After clear task decomposition, based on the design idea, you should be able to write a single file without needing other codes. If you can't, it means you need a clearer definition. This is the key to writing longer code.
             """
-            coding_context = await todo.run()
-            # Code review
-            if review:
-                action = WriteCodeReview(context=coding_context, llm=self.llm)
-                self._init_action_system_message(action)
-                coding_context = await action.run()
-            await src_file_repo.save(
-                coding_context.filename,
-                dependencies={coding_context.design_doc.root_relative_path, coding_context.task_doc.root_relative_path},
-                content=coding_context.code_doc.content,
-            )
-            msg = Message(
-                content=coding_context.model_dump_json(),
-                instruct_content=coding_context,
-                role=self.profile,
-                cause_by=WriteCode,
-            )
-            self.rc.memory.add(msg)
+            for i in depends_on:  # the code of the files it depends on is part of the prompt
+                await saved[i].wait()
+            async with semaphore:
+                coding_context = await todo.run()
+                # Code review
+                if review:
+                    action = WriteCodeReview(context=coding_context, llm=self.llm, code_overrides=todo.code_overrides)
+                    self._init_action_system_message(action)
+                    coding_context = await action.run()
+                return coding_context
+
+        tasks = [asyncio.create_task(write_code(*i)) for i in zip(self.code_todos, dependencies)]
+        try:
+            # save in the order of the task list, whatever the order the files are written in
+            for task, event in zip(tasks, saved):
+                coding_context = await task
+                await src_file_repo.save(
+                    coding_context.filename,
+                    dependencies={
+                        coding_context.design_doc.root_relative_path,
+                        coding_context.task_doc.root_relative_path,
+                    },
+                    content=coding_context.code_doc.content,
+                )
+                event.set()
+                msg = Message(
+                    content=coding_context.model_dump_json(),
+                    instruct_content=coding_context,
+                    role=self.profile,
+                    cause_by=WriteCode,
+                )
+                self.rc.memory.add(msg)
 
-            changed_files.add(coding_context.code_doc.filename)
+                changed_files.add(coding_context.code_doc.filename)
+        finally:
+            for task in tasks:
+                task.cancel()
         if not changed_files:
             logger.info("Nothing has changed.")
         return changed_files
@@ -143,7 +223,9 @@ class Engineer(Role):
         return None
 
     async def _act_write_code(self):
-        changed_files = await self._act_sp_with_cr(review=self.use_code_review)
+        dependency_file = await CONFIG.git_repo.get_dependency()
+        async with dependency_file.batch():  # write the dependencies of all the files once
+            changed_files = await self._act_sp_with_cr(review=self.use_code_review)
         return Message(
             content="\n".join(changed_files),
             role=self.profile,
@@ -157,27 +239,29 @@ class Engineer(Role):
         code_summaries_pdf_file_repo = CONFIG.git_repo.new_file_repository(CODE_SUMMARIES_PDF_FILE_REPO)
         tasks = []
         src_relative_path = CONFIG.src_workspace.relative_to(CONFIG.git_repo.workdir)
-        for todo in self.summarize_todos:
-            summary = await todo.run()
-            summary_filename = Path(todo.context.design_filename).with_suffix(".md").name
-            dependencies = {todo.context.design_filename, todo.context.task_filename}
-            for filename in todo.context.codes_filenames:
-                rpath = src_relative_path / filename
-                dependencies.add(str(rpath))
-            await code_summaries_pdf_file_repo.save(
-                filename=summary_filename, content=summary, dependencies=dependencies
-            )
-            is_pass, reason = await self._is_pass(summary)
-            if not is_pass:
-                todo.context.reason = reason
-                tasks.append(todo.context.dict())
-                await code_summaries_file_repo.save(
-                    filename=Path(todo.context.design_filename).name,
-                    content=todo.context.model_dump_json(),
-                    dependencies=dependencies,
+        dependency_file = await CONFIG.git_repo.get_dependency()
+        async with dependency_file.batch():
+            for todo in self.summarize_todos:
+                summary = await todo.run()
+                summary_filename = Path(todo.context.design_filename).with_suffix(".md").name
+                dependencies = {todo.context.design_filename, todo.context.task_filename}
+                for filename in todo.context.codes_filenames:
+                    rpath = src_relative_path / filename
+                    dependencies.add(str(rpath))
+                await code_summaries_pdf_file_repo.save(
+                    filename=summary_filename, content=summary, dependencies=dependencies
                 )
-            else:
-                await code_summaries_file_repo.delete(filename=Path(todo.context.design_filename).name)
+                is_pass, reason = await self._is_pass(summary)
+                if not is_pass:
+                    todo.context.reason = reason
+                    tasks.append(todo.context.dict())
+                    await code_summaries_file_repo.save(
+                        filename=Path(todo.context.design_filename).name,
+                        content=todo.context.model_dump_json(),
+                        dependencies=dependencies,
+                    )
+                else:
+                    await code_summaries_file_repo.delete(filename=Path(todo.context.design_filename).name)
 
         logger.info(f"--max-auto-summarize-code={CONFIG.max_auto_summarize_code}")
         if not tasks or CONFIG.max_auto_summarize_code == 0:
@@ -305,10 +389,12 @@ class Engineer(Role):
         src_files = src_file_repo.all_files
         # Generate a SummarizeCode action for each pair of (system_design_doc, task_doc).
         summarizations = defaultdict(list)
-        for filename in src_files:
-            dependencies = await src_file_repo.get_dependency(filename=filename)
-            ctx = CodeSummarizeContext.loads(filenames=dependencies)
-            summarizations[ctx].append(filename)
+        dependency_file = await CONFIG.git_repo.get_dependency()
+        async with dependency_file.batch():  # load the dependencies once
+            for filename in src_files:
+                dependencies = await src_file_repo.get_dependency(filename=filename)
+                ctx = CodeSummarizeContext.loads(filenames=dependencies)
+                summarizations[ctx].append(filename)
         for ctx, filenames in summarizations.items():
             ctx.codes_filenames = filenames
             self.summarize_todos.append(SummarizeCode(context=ctx, llm=self.llm))
@@ -319,3 +405,9 @@ class Engineer(Role):
     def todo(self) -> str:
         """AgentStore uses this attribute to display to the user what actions the current role should take."""
         return self.next_todo_action
+
+
+def _module_pattern(filename: str) -> str:
+    """Match the filename or the module name, such as `game.py` or `game` in "from game import Game" """
+    stem = re.escape(Path(filename).stem)
+    return rf"(?i)(?<![A-Za-z0-9_]){stem}(?![A-Za-z0-9_])"
@@ -384,12 +384,11 @@ class Role(SerializationMixin, is_polymorphic_base=True):
         if not news:
             news = self.rc.msg_buffer.pop_all()
         # Store the read messages in your own memory to prevent duplicate processing.
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        if not ignore_memory:
+            news = [n for n in news if not self.rc.memory.exists(n)]
         self.rc.memory.add_batch(news)
         # Filter out messages of interest.
-        self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.name in n.send_to) and n not in old_messages
-        ]
+        self.rc.news = [n for n in news if n.cause_by in self.rc.watch or self.name in n.send_to]
         self.latest_observed_msg = self.rc.news[-1] if self.rc.news else None  # record the latest observed msg
 
         # Design Rules:
@@ -410,10 +409,12 @@ class Role(SerializationMixin, is_polymorphic_base=True):
         self.rc.env.publish_message(msg)
 
     def put_message(self, message):
-        """Place the message into the Role object's private message buffer."""
+        """Place the message into the Role object's private message buffer, and wake the role up in its environment."""
         if not message:
             return
         self.rc.msg_buffer.push(message)
+        if self.rc.env:
+            self.rc.env.wake_up(self)
 
     async def _react(self) -> Message:
         """Think first, then act, until the Role _think it is time to stop and requires no more todo.
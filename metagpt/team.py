@@ -27,6 +27,7 @@ from metagpt.utils.common import (
     serialize_decorator,
     write_json_file,
 )
+from metagpt.utils.workspace_pool import WORKSPACE_POOL
 
 
 class Team(BaseModel):
@@ -133,4 +134,6 @@ class Team(BaseModel):
 
             await self.env.run()
         self.env.archive(auto_archive)
+        if CONFIG.project_path:
+            WORKSPACE_POOL.release(CONFIG.project_path)  # the project may be deleted as stale from now on
         return self.env.history
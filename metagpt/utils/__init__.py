@@ -11,7 +11,9 @@ from metagpt.utils.singleton import Singleton
 from metagpt.utils.token_counter import (
     TOKEN_COSTS,
     count_message_tokens,
+    count_message_tokens_batch,
     count_string_tokens,
+    count_string_tokens_batch,
 )
 
 
@@ -20,5 +22,7 @@ __all__ = [
     "Singleton",
     "TOKEN_COSTS",
     "count_message_tokens",
+    "count_message_tokens_batch",
     "count_string_tokens",
+    "count_string_tokens_batch",
 ]
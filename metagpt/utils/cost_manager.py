@@ -29,6 +29,8 @@ class CostManager(BaseModel):
     total_budget: float = 0
     max_budget: float = 10.0
     total_cost: float = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
 
     def update_cost(self, prompt_tokens, completion_tokens, model):
         """
@@ -50,6 +52,13 @@ class CostManager(BaseModel):
             f"Current cost: ${cost:.3f}, prompt_tokens: {prompt_tokens}, completion_tokens: {completion_tokens}"
         )
 
+    def update_cache_stats(self, hit: bool):
+        """Count a lookup in the LLM response cache. A hit costs nothing."""
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
     def get_total_prompt_tokens(self):
         """
         Get the total number of prompt tokens.
@@ -5,12 +5,16 @@
 @Author  : mashenquan
 @File    : dependency_file.py
 @Desc: Implementation of the dependency file described in Section 2.2.3.2 of RFC 135.
+    The dependencies are cached in memory: the file is parsed again only if it has changed on disk, and written once
+    at the end of a `batch()`.
 """
 from __future__ import annotations
 
 import json
+import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Set
+from typing import Dict, Optional, Set, Tuple
 
 import aiofiles
 
@@ -31,46 +35,93 @@ class DependencyFile:
         """
         self._dependencies = {}
         self._filename = Path(workdir) / ".dependencies.json"
+        # (inode, mtime_ns, size) of the file when last loaded or saved
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._dirty = False
+        self._batch_depth = 0
+        self._dependents: Optional[Dict[str, Set[str]]] = None  # reverse index, built on demand
 
-    async def load(self):
-        """Load dependencies from the file asynchronously."""
-        if not self._filename.exists():
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = self._filename.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    async def load(self, force=False):
+        """Load dependencies from the file asynchronously, unless the file is unchanged since last loaded or saved.
+
+        :param force: Whether to load the file even if it is unchanged.
+        """
+        signature = self._stat()
+        if signature is None or (signature == self._signature and not force):
             return
         self._dependencies = json.loads(await aread(self._filename))
+        self._signature = signature
+        self._dirty = False
+        self._dependents = None
 
     @handle_exception
     async def save(self):
-        """Save dependencies to the file asynchronously."""
+        """Save dependencies to the file asynchronously; the file is replaced atomically."""
         data = json.dumps(self._dependencies)
-        async with aiofiles.open(str(self._filename), mode="w") as writer:
+        tmp = self._filename.with_name(f"{self._filename.name}.{os.getpid()}.tmp")
+        async with aiofiles.open(str(tmp), mode="w") as writer:
             await writer.write(data)
+        os.replace(tmp, self._filename)
+        self._signature = self._stat()
+        self._dirty = False
+
+    @asynccontextmanager
+    async def batch(self):
+        """Load the file once, and save it once on exit if changed; `update` and `get` inside the block work on the
+        cached dependencies. Batches can be nested, only the outermost one saves.
+
+        Example:
+            async with dependency_file.batch():
+                for filename, dependencies in files.items():
+                    await dependency_file.update(filename, dependencies)
+        """
+        if not self._batch_depth:
+            await self.load()
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                await self.save()
+
+    def _key(self, filename: Path | str) -> str:
+        root = self._filename.parent
+        try:
+            return str(Path(filename).relative_to(root))
+        except ValueError:
+            return str(filename)
 
     async def update(self, filename: Path | str, dependencies: Set[Path | str], persist=True):
         """Update dependencies for a file asynchronously.
 
         :param filename: The filename or path.
         :param dependencies: The set of dependencies.
-        :param persist: Whether to persist the changes immediately.
+        :param persist: Whether to persist the changes immediately; deferred to the end of the batch inside `batch()`.
         """
+        persist = persist and not self._batch_depth
         if persist:
             await self.load()
 
-        root = self._filename.parent
-        try:
-            key = Path(filename).relative_to(root)
-        except ValueError:
-            key = filename
-
+        key = self._key(filename)
         if dependencies:
-            relative_paths = []
-            for i in dependencies:
-                try:
-                    relative_paths.append(str(Path(i).relative_to(root)))
-                except ValueError:
-                    relative_paths.append(str(i))
-            self._dependencies[str(key)] = relative_paths
-        elif str(key) in self._dependencies:
-            del self._dependencies[str(key)]
+            relative_paths = [self._key(i) for i in dependencies]
+            if set(relative_paths) == set(self._dependencies.get(key, [])):
+                return
+            self._dependencies[key] = relative_paths
+        elif key in self._dependencies:
+            del self._dependencies[key]
+        else:
+            return
+        self._dirty = True
+        self._dependents = None
 
         if persist:
             await self.save()
@@ -79,22 +130,42 @@ class DependencyFile:
         """Get dependencies for a file asynchronously.
 
         :param filename: The filename or path.
-        :param persist: Whether to load dependencies from the file immediately.
+        :param persist: Whether to load dependencies from the file immediately, if changed on disk.
         :return: A set of dependencies.
         """
-        if persist:
+        if persist and not self._batch_depth:
             await self.load()
+        return set(self._dependencies.get(self._key(filename), {}))
 
-        root = self._filename.parent
-        try:
-            key = Path(filename).relative_to(root)
-        except ValueError:
-            key = filename
-        return set(self._dependencies.get(str(key), {}))
+    async def get_dependents(self, filename: Path | str, recursive=False, persist=True) -> Set[str]:
+        """Get the files depending on a file, to find the files affected by its change.
+
+        :param filename: The filename or path.
+        :param recursive: Whether to include the files depending on them, and so on.
+        :param persist: Whether to load dependencies from the file immediately, if changed on disk.
+        :return: A set of dependent files.
+        """
+        if persist and not self._batch_depth:
+            await self.load()
+        if self._dependents is None:
+            self._dependents = {}
+            for k, v in self._dependencies.items():
+                for i in v:
+                    self._dependents.setdefault(i, set()).add(k)
+
+        dependents = set()
+        pending = [self._key(filename)]
+        while pending:
+            for i in self._dependents.get(pending.pop(), set()) - dependents:
+                dependents.add(i)
+                if recursive:
+                    pending.append(i)
+        return dependents
 
     def delete_file(self):
         """Delete the dependency file."""
         self._filename.unlink(missing_ok=True)
+        self._signature = None
 
     @property
     def exists(self):
@@ -8,11 +8,12 @@
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Optional, Set
 
 import aiofiles
 
@@ -22,6 +23,8 @@ from metagpt.schema import Document
 from metagpt.utils.common import aread
 from metagpt.utils.json_to_markdown import json_to_markdown
 
+MAX_CONCURRENT_READS = 16  # files read at a time by `get_many`
+
 
 class FileRepository:
     """A class representing a FileRepository associated with a Git repository.
@@ -58,6 +61,9 @@ class FileRepository:
         content = content if content else ""  # avoid `argument must be str, not None` to make it continue
         async with aiofiles.open(str(pathname), mode="w") as writer:
             await writer.write(content)
+        stat = pathname.stat()
+        self._git_repo.cache_content(pathname, (stat.st_mtime_ns, stat.st_size), content)
+        self._git_repo.track_change(pathname)
         logger.info(f"save to: {str(pathname)}")
 
         if dependencies is not None:
@@ -100,22 +106,48 @@ class FileRepository:
         path_name = self.workdir / filename
         if not path_name.exists():
             return None
-        doc.content = await aread(path_name)
+        doc.content = await self._read(path_name)
         return doc
 
+    async def _read(self, pathname: Path) -> Optional[str]:
+        """Read a file, or return its content read or saved before if the file is unchanged since."""
+        try:
+            stat = pathname.stat()
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        content = self._git_repo.cached_content(pathname, signature)
+        if content is None:
+            content = await aread(pathname)
+            if content is not None:
+                self._git_repo.cache_content(pathname, signature, content)
+        return content
+
+    async def get_many(self, filenames: Iterable[Path | str]) -> List[Document | None]:
+        """Read files concurrently, `MAX_CONCURRENT_READS` at a time.
+
+        :param filenames: The filenames or paths within the repository.
+        :return: The Document of each file, None for the files not found.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+        async def _get(filename):
+            async with semaphore:
+                return await self.get(filename)
+
+        return await asyncio.gather(*[_get(i) for i in filenames])
+
     async def get_all(self) -> List[Document]:
         """Get the content of all files in the repository.
 
         :return: List of Document instances representing files.
         """
-        docs = []
+        filenames = []
         for root, dirs, files in os.walk(str(self.workdir)):
             for file in files:
                 file_path = Path(root) / file
-                relative_path = file_path.relative_to(self.workdir)
-                doc = await self.get(relative_path)
-                docs.append(doc)
-        return docs
+                filenames.append(file_path.relative_to(self.workdir))
+        return await self.get_many(filenames)
 
     @property
     def workdir(self):
@@ -280,6 +312,7 @@ class FileRepository:
         if not pathname.exists():
             return
         pathname.unlink(missing_ok=True)
+        self._git_repo.track_change(pathname, deleted=True)
 
         dependency_file = await self._git_repo.get_dependency()
         await dependency_file.update(filename=pathname, dependencies=None)
@@ -8,10 +8,12 @@
 """
 from __future__ import annotations
 
+import hashlib
+import os
 import shutil
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 
 from git.repo import Repo
 from git.repo.fun import is_git_dir
@@ -32,6 +34,10 @@ class ChangeType(Enum):
     UNTRACTED = "U"  # File is untracked (not added to version control)
 
 
+_CHANGE_TYPES = {i.value for i in ChangeType}
+CONTENT_CACHE_SIZE = 1024  # files whose content is kept by `cache_content`
+
+
 class GitRepository:
     """A class representing a Git repository.
 
@@ -40,6 +46,15 @@ class GitRepository:
 
     Attributes:
         _repository (Repo): The GitPython `Repo` object representing the Git repository.
+
+    The status is scanned with git once and then kept up to date: `FileRepository.save` and `delete` report their
+    changes, and the other changes are found by comparing the stat of the working tree files with the last one. A
+    change of the git index, such as a commit, or `invalidate()` makes the next access scan again. Ignored directories
+    are not scanned, so tracked files in them are only seen by git.
+
+    `get_files` lists the cached working tree, and scans the directory asked for again only if it has not been
+    scanned yet or changes were reported since the last scan; files created by other means are listed once the
+    status is read or the cache is invalidated.
     """
 
     def __init__(self, local_path=None, auto_init=True):
@@ -51,6 +66,7 @@ class GitRepository:
         self._repository = None
         self._dependency = None
         self._gitignore_rules = None
+        self.invalidate()
         if local_path:
             self.open(local_path=local_path, auto_init=auto_init)
 
@@ -61,6 +77,7 @@ class GitRepository:
         :param auto_init: If True, automatically initializes a new Git repository if the provided path is not a Git repository.
         """
         local_path = Path(local_path)
+        self.invalidate()
         if self.is_git_dir(local_path):
             self._repository = Repo(local_path)
             self._gitignore_rules = parse_gitignore(full_path=str(local_path / ".gitignore"))
@@ -108,6 +125,7 @@ class GitRepository:
         """Delete the entire repository directory."""
         if self.is_valid:
             shutil.rmtree(self._repository.working_dir)
+            self.invalidate()
 
     @property
     def changed_files(self) -> Dict[str, str]:
@@ -115,11 +133,169 @@ class GitRepository:
 
         :return: A dictionary where keys are file paths and values are change types.
         """
-        files = {i: ChangeType.UNTRACTED for i in self._repository.untracked_files}
-        changed_files = {f.a_path: ChangeType(f.change_type) for f in self._repository.index.diff(None)}
-        files.update(changed_files)
+        self._refresh()
+        return dict(self._changed_files)
+
+    def invalidate(self):
+        """Drop the cached status and file contents, the next access scans the working tree with git again."""
+        self._changed_files: Optional[Dict[str, ChangeType]] = None
+        self._index_shas: Optional[Dict[str, bytes]] = None
+        self._index_signature: Optional[Tuple[int, int, int]] = None
+        self._tree: Dict[str, Tuple[int, int]] = {}  # path: (mtime_ns, size) of the working tree files
+        self._scanned: Set[str] = set()  # the directories of `_tree` scanned, as prefixes such as "src/"
+        self._reported = False  # whether changes were reported by `track_change` since the last scan
+        self._ignored: Dict[str, bool] = {}
+        self._contents: Dict[str, Tuple[Tuple[int, int], str]] = {}  # path: ((mtime_ns, size), content)
+
+    def cached_content(self, pathname: Path | str, signature: Tuple[int, int]) -> Optional[str]:
+        """Return the content of a file read or saved before, if its (mtime_ns, size) is still `signature`."""
+        entry = self._contents.get(str(pathname))
+        return entry[1] if entry and entry[0] == signature else None
+
+    def cache_content(self, pathname: Path | str, signature: Tuple[int, int], content: str):
+        """Keep the content of a file with its (mtime_ns, size), for the `CONTENT_CACHE_SIZE` latest files."""
+        key = str(pathname)
+        self._contents.pop(key, None)
+        self._contents[key] = (signature, content)
+        while len(self._contents) > CONTENT_CACHE_SIZE:
+            del self._contents[next(iter(self._contents))]
+
+    def track_change(self, pathname: Path | str, deleted=False):
+        """Update the cached status with a file just saved or deleted.
+
+        :param pathname: The path of the file.
+        :param deleted: Whether the file was deleted.
+        """
+        if not self.is_valid:
+            return
+        try:
+            key = Path(pathname).relative_to(self.workdir).as_posix()
+        except ValueError:
+            return
+        if self._in_ignored_dir(key):  # not scanned, nor reported by git
+            return
+        self._reported = True
+        if deleted or not (self.workdir / key).is_file():
+            self._tree.pop(key, None)
+            deleted = True
+        else:
+            stat = (self.workdir / key).stat()
+            self._tree[key] = (stat.st_mtime_ns, stat.st_size)
+        if key == ".gitignore":
+            self._reload_gitignore()
+            self._changed_files = None  # classified with the old rules, scan again with git
+        if self._changed_files is not None and self._stat_index() == self._index_signature:
+            self._classify(key, exists=not deleted)
+
+    def _refresh(self, status=True, relative_path: str = ""):
+        """Bring the cached working tree and status up to date.
+
+        :param status: Whether to scan the status with git if it is not cached.
+        :param relative_path: The directory to scan, the whole working tree if empty.
+        """
+        prefix = f"{relative_path}/" if relative_path else ""
+        tree = self._scan_tree(relative_path)
+        if self._stat_index() != self._index_signature:  # committed, staged or changed by another process
+            self._changed_files = None
+            self._index_shas = None
+        old_tree = {k: v for k, v in self._tree.items() if k.startswith(prefix)}
+        changes = {k for k in tree.keys() | old_tree.keys() if tree.get(k) != old_tree.get(k)}
+        for key in old_tree.keys() - tree.keys():
+            del self._tree[key]
+        self._tree.update(tree)
+        self._scanned.add(prefix)
+        self._reported = False
+        if ".gitignore" in changes and (".gitignore" in old_tree or not self._gitignore_rules):  # not just first seen
+            # scanned and classified with the old rules: scan again, and the status with git
+            self._reload_gitignore()
+            self._changed_files = None
+            return self._refresh(status=status, relative_path=relative_path)
+        if self._changed_files is not None:
+            for key in changes:
+                self._classify(key, exists=key in tree)
+        elif status:
+            self._changed_files = self._git_status()
+            self._index_signature = self._stat_index()  # `git status` may refresh the index
+
+    def _git_status(self) -> Dict[str, ChangeType]:
+        """The untracked files and the files changed in the working tree compared with the index"""
+        files = {}
+        entries = iter(self._repository.git.status(porcelain=True, untracked_files="all", z=True).split("\0"))
+        for entry in entries:
+            if not entry:
+                continue
+            xy, path = entry[:2], entry[3:]
+            if xy[0] in "RC":  # followed by the source path of the rename or copy
+                next(entries, None)
+            if xy == "??":
+                files[path] = ChangeType.UNTRACTED
+            elif xy[1] != " ":
+                files[path] = ChangeType(xy[1]) if xy[1] in _CHANGE_TYPES else ChangeType.MODIFIED
         return files
 
+    def _classify(self, key: str, exists: bool):
+        """Update the change type of a file the way `git status` would"""
+        if self._index_shas is None:
+            self._index_shas = {path: entry.binsha for (path, _), entry in self._repository.index.entries.items()}
+        sha = self._index_shas.get(key)
+        if sha is None:
+            if exists and not self._is_ignored(key):
+                self._changed_files[key] = ChangeType.UNTRACTED
+            else:
+                self._changed_files.pop(key, None)
+        elif not exists:
+            self._changed_files[key] = ChangeType.DELETED
+        elif _blob_sha(self.workdir / key) == sha:
+            self._changed_files.pop(key, None)
+        elif self._changed_files.get(key, ChangeType.DELETED) is ChangeType.DELETED:
+            self._changed_files[key] = ChangeType.MODIFIED
+
+    def _scan_tree(self, relative_path: str = "") -> Dict[str, Tuple[int, int]]:
+        """Return the (mtime_ns, size) of the files in a directory of the working tree, the .git directory and the
+        ignored directories excluded"""
+        tree = {}
+        prefix = f"{relative_path}/" if relative_path else ""
+        pending = [(str(self.workdir / relative_path), prefix)]
+        while pending:
+            directory, prefix = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                key = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if key != ".git" and not self._is_ignored(key):
+                        pending.append((entry.path, key + "/"))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    tree[key] = (stat.st_mtime_ns, stat.st_size)
+        return tree
+
+    def _stat_index(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = (Path(self._repository.git_dir) / "index").stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _is_ignored(self, key: str) -> bool:
+        if key not in self._ignored:
+            self._ignored[key] = bool(self._gitignore_rules and self._gitignore_rules(str(self.workdir / key)))
+        return self._ignored[key]
+
+    def _in_ignored_dir(self, key: str) -> bool:
+        parts = key.split("/")[:-1]
+        return any(self._is_ignored("/".join(parts[: i + 1])) for i in range(len(parts)))
+
+    def _reload_gitignore(self):
+        gitignore_filename = self.workdir / ".gitignore"
+        self._gitignore_rules = (
+            parse_gitignore(full_path=str(gitignore_filename)) if gitignore_filename.exists() else None
+        )
+        self._ignored = {}
+        self._scanned = set()  # the ignored directories, pruned from the scans, may have changed
+
     @staticmethod
     def is_git_dir(local_path):
         """Check if the specified directory is a Git repository.
@@ -165,6 +341,7 @@ class GitRepository:
         logger.info(f"Archive: {list(self.changed_files.keys())}")
         self.add_change(self.changed_files)
         self.commit(comments)
+        self._contents = {}  # cached for a round
 
     def new_file_repository(self, relative_path: Path | str = ".") -> FileRepository:
         """Create a new instance of FileRepository associated with this Git repository.
@@ -205,6 +382,8 @@ class GitRepository:
             logger.warning(f"Move {str(self.workdir)} to {str(new_path)} error: {e}")
         logger.info(f"Rename directory {str(self.workdir)} to {str(new_path)}")
         self._repository = Repo(new_path)
+        self._dependency = None
+        self.invalidate()
         self._gitignore_rules = parse_gitignore(full_path=str(new_path / ".gitignore"))
 
     def get_files(self, relative_path: Path | str, root_relative_path: Path | str = None, filter_ignored=True) -> List:
@@ -227,6 +406,15 @@ class GitRepository:
         except ValueError:
             relative_path = Path(relative_path)
 
+        if not root_relative_path and filter_ignored and self.is_valid:  # from the cached working tree
+            prefix = "" if relative_path == Path(".") else relative_path.as_posix() + "/"
+            if self._reported or not any(prefix.startswith(i) for i in self._scanned):
+                self._refresh(status=False, relative_path=prefix.rstrip("/"))
+            files = [i for i in self._tree if i.startswith(prefix)]
+            if filter_ignored:
+                files = [i for i in files if not self._is_ignored(i)]
+            return [i[len(prefix) :] for i in files]
+
         if not root_relative_path:
             root_relative_path = Path(self.workdir) / relative_path
         files = []
@@ -270,3 +458,9 @@ class GitRepository:
                 continue
             files.append(filename)
         return files
+
+
+def _blob_sha(pathname: Path) -> bytes:
+    """The sha of the file content as a git blob"""
+    data = pathname.read_bytes()
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).digest()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : stream_output_parser.py
+@Desc    : Parse the output of an ActionNode while the LLM is still generating it. The fields of the output mapping
+    are emitted as soon as they are complete, and a broken structure raises `StreamParseError` at once, so that the
+    generation is aborted and retried instead of being parsed after the model finishes.
+"""
+from typing import Any, Callable, Optional
+
+from metagpt.config import CONFIG
+from metagpt.utils.common import OutputParser
+from metagpt.utils.custom_decoder import CustomDecoder
+
+
+class StreamParseError(ValueError):
+    """The streamed output does not match the output mapping"""
+
+
+class StreamOutputParser:
+    """Incremental parser of `[CONTENT]{json}[/CONTENT]` or `## field` markdown outputs.
+
+    Feed it with the chunks of the stream; `on_field(key, value)` is called once per field. The values are advisory,
+    the complete output is still parsed by `llm_output_postprocess` or `OutputParser.parse_data_with_mapping`.
+    """
+
+    def __init__(
+        self,
+        mapping: dict,
+        schema: str = "json",
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        tag: str = "CONTENT",
+    ):
+        self.mapping = mapping
+        self.schema = schema
+        self.on_field = on_field
+        self.tag = tag
+        self.text = ""
+        self.fields = {}
+
+        self._pos = -1  # scanned position, -1 before the left tag
+        self._closed = False
+        self._broken = False  # a field could not be decoded or text precedes the json, left to the final parse
+        # json scanner
+        self._depth = 0
+        self._quote = ""
+        self._escape = False
+        self._skip_to = ""
+        self._member_start = 0
+
+    def feed(self, chunk: str):
+        self.text += chunk
+        if self._closed:
+            return
+        if self.schema == "json":
+            self._scan_json()
+        else:
+            self._scan_markdown()
+
+    def finish(self, data: dict):
+        """Emit the fields of the complete output that were not emitted while streaming"""
+        for key, value in data.items():
+            if key not in self.fields:
+                self._emit(key, value)
+
+    def _emit(self, key: str, value: Any):
+        self.fields[key] = value
+        if self.on_field:
+            self.on_field(key, value)
+
+    def _scan_json(self):
+        text = self.text
+        if self._pos < 0:
+            idx = text.find(f"[{self.tag}]")
+            if idx < 0:
+                return
+            self._pos = idx + len(self.tag) + 2
+
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._skip_to:
+                if c == self._skip_to:
+                    self._skip_to = ""
+            elif self._quote:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == self._quote:
+                    self._quote = ""
+            elif self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                    self._member_start = i + 1
+                elif c == "`":  # code fence such as ```json
+                    self._skip_to = "\n"
+                elif c == "[":  # a repeated tag
+                    self._skip_to = "]"
+                elif not c.isspace():  # such as "Here is the JSON:", which the final parse accepts
+                    self._broken = True
+            elif c in "\"'":
+                self._quote = c
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end_member(i)
+                    self._close()
+                    return
+            elif c == "," and self._depth == 1:
+                self._end_member(i)
+                self._member_start = i + 1
+        self._pos = len(text)
+
+    def _end_member(self, end: int):
+        member = self.text[self._member_start : end].strip()
+        if not member:
+            return
+        try:
+            data = CustomDecoder(strict=False).decode("{" + member + "}")
+        except Exception as e:
+            if not CONFIG.repair_llm_output and not self._broken:
+                raise StreamParseError(f"Invalid json field {member[:50]!r}: {e}")
+            self._broken = True
+            return
+        for key, value in data.items():
+            self._emit(key, value)
+
+    def _close(self):
+        self._closed = True
+        if self._broken:
+            return
+        missing = {k.lower() for k in self.mapping} - {k.lower() for k in self.fields}
+        if missing:
+            raise StreamParseError(f"Missing fields: {missing}")
+
+    def _scan_markdown(self):
+        text = self.text
+        end = text.find(f"[/{self.tag}]")
+        if end >= 0:
+            text = text[:end] + "##"  # the last block is complete
+        self._pos = max(self._pos, text.find("##"))
+        if self._pos < 0:
+            return
+
+        while True:
+            nxt = text.find("##", self._pos + 2)
+            if nxt < 0:
+                break
+            try:
+                block = OutputParser.parse_data_with_mapping(text[self._pos : nxt], self.mapping)
+            except ValueError:  # a title without content
+                block = {}
+            for key, value in block.items():
+                if key in self.mapping and key not in self.fields:
+                    self._emit(key, value)
+            self._pos = nxt
+        if end >= 0:
+            self._closed = True
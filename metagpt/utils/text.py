@@ -1,6 +1,14 @@
-from typing import Generator, Sequence
+import io
+from collections import deque
+from typing import Generator, Iterable, Sequence, Union
 
-from metagpt.utils.token_counter import TOKEN_MAX, count_string_tokens
+from metagpt.utils.token_counter import (
+    TOKEN_MAX,
+    count_string_tokens,
+    get_encoding,
+)
+
+PIECE_SIZE = 8192  # characters tokenized at a time by `reduce_message_length`
 
 
 def reduce_message_length(
@@ -25,55 +33,84 @@ def reduce_message_length(
     """
     max_token = TOKEN_MAX.get(model_name, 2048) - count_string_tokens(system_text, model_name) - reserved
     for msg in msgs:
-        if count_string_tokens(msg, model_name) < max_token:
+        if not _exceeds_tokens(msg, model_name, max_token):
             return msg
 
     raise RuntimeError("fail to reduce message length")
 
 
+def _exceeds_tokens(text: str, model_name: str, limit: int) -> bool:
+    """Whether `text` has at least `limit` tokens. The text is tokenized piece by piece and a long text is rejected as
+    soon as its pieces certainly exceed the limit, so the cost is bounded by the limit instead of the text length."""
+    encoding = get_encoding(model_name)
+    tokens = 0
+    for n, piece in enumerate(_split_pieces(text, PIECE_SIZE), start=1):
+        tokens += len(encoding.encode(piece))
+        # tokens merged across a piece boundary save no more than 2 tokens per boundary
+        if tokens - 2 * n >= limit:
+            return True
+        if len(piece) == len(text):
+            return tokens >= limit
+    return count_string_tokens(text, model_name) >= limit
+
+
 def generate_prompt_chunk(
-    text: str,
+    text: Union[str, Iterable[str]],
     prompt_template: str,
     model_name: str,
     system_text: str,
     reserved: int = 0,
+    overlap: int = 0,
 ) -> Generator[str, None, None]:
     """Split the text into chunks of a maximum token size.
 
     Args:
-        text: The text to split.
+        text: The text to split, or an iterable of its lines with their line endings, such as an opened file.
         prompt_template: The template for the prompt, containing a single `{}` placeholder. For example, "### Reference\n{}".
         model_name: The name of the encoding to use. (e.g., "gpt-3.5-turbo")
         system_text: The system prompts.
         reserved: The number of reserved tokens.
+        overlap: The maximum number of tokens of the trailing lines of a chunk repeated at the start of the next one.
 
     Yields:
         The chunk of text.
     """
-    paragraphs = text.splitlines(keepends=True)
+    encoding = get_encoding(model_name)
+    lines = iter(io.StringIO(text)) if isinstance(text, str) else iter(text)
+    paragraphs = deque()  # (paragraph, token) split from a too long paragraph
     current_token = 0
-    current_lines = []
+    current_lines = deque()  # (paragraph, token) of the current chunk
 
     reserved = reserved + count_string_tokens(prompt_template + system_text, model_name)
     # 100 is a magic number to ensure the maximum context length is not exceeded
     max_token = TOKEN_MAX.get(model_name, 2048) - reserved - 100
 
-    while paragraphs:
-        paragraph = paragraphs.pop(0)
-        token = count_string_tokens(paragraph, model_name)
+    while True:
+        if paragraphs:
+            paragraph, token = paragraphs.popleft()
+        else:
+            paragraph = next(lines, None)
+            if paragraph is None:
+                break
+            token = len(encoding.encode(paragraph))
         if current_token + token <= max_token:
-            current_lines.append(paragraph)
+            current_lines.append((paragraph, token))
             current_token += token
         elif token > max_token:
-            paragraphs = split_paragraph(paragraph) + paragraphs
-            continue
+            parts = [(i, len(encoding.encode(i))) for i in split_paragraph(paragraph) if i]
+            paragraphs.extendleft(reversed(parts))
         else:
-            yield prompt_template.format("".join(current_lines))
-            current_lines = [paragraph]
-            current_token = token
+            yield prompt_template.format("".join(i for i, _ in current_lines))
+            kept, current_token = deque(), 0
+            while current_lines and current_token + current_lines[-1][1] <= min(overlap, max_token - token):
+                kept.appendleft(current_lines.pop())
+                current_token += kept[0][1]
+            current_lines = kept
+            current_lines.append((paragraph, token))
+            current_token += token
 
     if current_lines:
-        yield prompt_template.format("".join(current_lines))
+        yield prompt_template.format("".join(i for i, _ in current_lines))
 
 
 def split_paragraph(paragraph: str, sep: str = ".,", count: int = 2) -> list[str]:
@@ -93,7 +130,7 @@ def split_paragraph(paragraph: str, sep: str = ".,", count: int = 2) -> list[str
             continue
         ret = ["".join(j) for j in _split_by_count(sentences, count)]
         return ret
-    return _split_by_count(paragraph, count)
+    return list(_split_by_count(paragraph, count))
 
 
 def decode_unicode_escape(text: str) -> str:
@@ -127,3 +164,13 @@ def _split_text_with_ends(text: str, sep: str = "."):
             parts = []
     if parts:
         yield "".join(parts)
+
+
+def _split_pieces(text: str, size: int):
+    """Split the text at the first line ending after every `size` characters"""
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start + size)
+        end = len(text) if end == -1 else end + 1
+        yield text[start:end]
+        start = end
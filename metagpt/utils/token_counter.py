@@ -9,8 +9,12 @@ ref2: https://github.com/Significant-Gravitas/Auto-GPT/blob/master/autogpt/llm/t
 ref3: https://github.com/hwchase17/langchain/blob/master/langchain/chat_models/openai.py
 ref4: https://ai.google.dev/models/gemini
 """
+import functools
+
 import tiktoken
 
+from metagpt.logs import logger
+
 TOKEN_COSTS = {
     "gpt-3.5-turbo": {"prompt": 0.0015, "completion": 0.002},
     "gpt-3.5-turbo-0301": {"prompt": 0.0015, "completion": 0.002},
@@ -54,13 +58,19 @@ TOKEN_MAX = {
 }
 
 
-def count_message_tokens(messages, model="gpt-3.5-turbo-0613"):
-    """Return the number of tokens used by a list of messages."""
+@functools.lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """Return the tiktoken encoding of the model, cl100k_base for models unknown to tiktoken."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
-        print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+        logger.warning(f"model {model} not found. Using cl100k_base encoding.")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@functools.lru_cache(maxsize=None)
+def _message_format(model: str) -> tuple[str, int, int]:
+    """Return the model whose format is used, tokens per message and tokens per name."""
     if model in {
         "gpt-3.5-turbo-0613",
         "gpt-3.5-turbo-16k-0613",
@@ -74,39 +84,56 @@ def count_message_tokens(messages, model="gpt-3.5-turbo-0613"):
         "gpt-4-32k-0613",
         "gpt-4-1106-preview",
     }:
-        tokens_per_message = 3  # # every reply is primed with <|start|>assistant<|message|>
-        tokens_per_name = 1
+        return model, 3, 1  # every reply is primed with <|start|>assistant<|message|>
     elif model == "gpt-3.5-turbo-0301":
-        tokens_per_message = 4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
-        tokens_per_name = -1  # if there's a name, the role is omitted
+        # every message follows <|start|>{role/name}\n{content}<|end|>\n, if there's a name, the role is omitted
+        return model, 4, -1
     elif "gpt-3.5-turbo" == model:
-        print("Warning: gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0613.")
-        return count_message_tokens(messages, model="gpt-3.5-turbo-0613")
+        logger.warning("gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0613.")
+        return _message_format("gpt-3.5-turbo-0613")
     elif "gpt-4" == model:
-        print("Warning: gpt-4 may update over time. Returning num tokens assuming gpt-4-0613.")
-        return count_message_tokens(messages, model="gpt-4-0613")
+        logger.warning("gpt-4 may update over time. Returning num tokens assuming gpt-4-0613.")
+        return _message_format("gpt-4-0613")
     elif "open-llm-model" == model:
         """
         For self-hosted open_llm api, they include lots of different models. The message tokens calculation is
         inaccurate. It's a reference result.
         """
-        tokens_per_message = 0  # ignore conversation message template prefix
-        tokens_per_name = 0
+        return model, 0, 0  # ignore conversation message template prefix
+    raise NotImplementedError(
+        f"num_tokens_from_messages() is not implemented for model {model}. "
+        f"See https://github.com/openai/openai-python/blob/main/chatml.md "
+        f"for information on how messages are converted to tokens."
+    )
+
+
+def count_message_tokens(messages, model="gpt-3.5-turbo-0613"):
+    """Return the number of tokens used by a list of messages."""
+    return count_message_tokens_batch([messages], model=model, num_threads=1)[0]
+
+
+def count_message_tokens_batch(conversations: list[list[dict]], model="gpt-3.5-turbo-0613", num_threads=8) -> list[int]:
+    """Return the number of tokens used by each list of messages, encoding all the values in one batch."""
+    model, tokens_per_message, tokens_per_name = _message_format(model)
+    encoding = get_encoding(model)
+    values = [value for messages in conversations for message in messages for value in message.values()]
+    if num_threads > 1 and len(values) > 1:
+        lengths = iter([len(i) for i in encoding.encode_batch(values, num_threads=num_threads)])
     else:
-        raise NotImplementedError(
-            f"num_tokens_from_messages() is not implemented for model {model}. "
-            f"See https://github.com/openai/openai-python/blob/main/chatml.md "
-            f"for information on how messages are converted to tokens."
-        )
-    num_tokens = 0
-    for message in messages:
-        num_tokens += tokens_per_message
-        for key, value in message.items():
-            num_tokens += len(encoding.encode(value))
-            if key == "name":
-                num_tokens += tokens_per_name
-    num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
-    return num_tokens
+        lengths = (len(encoding.encode(value)) for value in values)
+
+    counts = []
+    for messages in conversations:
+        num_tokens = 0
+        for message in messages:
+            num_tokens += tokens_per_message
+            for key in message:
+                num_tokens += next(lengths)
+                if key == "name":
+                    num_tokens += tokens_per_name
+        num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
+        counts.append(num_tokens)
+    return counts
 
 
 def count_string_tokens(string: str, model_name: str) -> int:
@@ -120,12 +147,27 @@ def count_string_tokens(string: str, model_name: str) -> int:
     Returns:
         int: The number of tokens in the text string.
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model_name)
-    except KeyError:
-        print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(string))
+    return len(get_encoding(model_name).encode(string))
+
+
+def count_string_tokens_batch(strings: list[str], model_name: str, num_threads=8) -> list[int]:
+    """Returns the number of tokens in each text string, encoded in one batch across `num_threads` threads."""
+    return [len(i) for i in get_encoding(model_name).encode_batch(strings, num_threads=num_threads)]
+
+
+def estimate_string_tokens(string: str) -> int:
+    """Approximate the number of tokens without a tokenizer, for models whose tokenizer is not known.
+    About 4 characters per token for ASCII text and a token per character for the others, such as CJK."""
+    ascii_chars = len(string.encode("ascii", errors="ignore"))
+    return (ascii_chars + 3) // 4 + len(string) - ascii_chars
+
+
+def estimate_message_tokens(messages: list[dict]) -> int:
+    """Approximate the number of tokens used by a list of messages, see `estimate_string_tokens`."""
+    num_tokens = 3
+    for message in messages:
+        num_tokens += 3 + sum(estimate_string_tokens(value) for value in message.values())
+    return num_tokens
 
 
 def get_max_completion_tokens(messages: list[dict], model: str, default: int) -> int:
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : workspace_pool.py
+@Desc    : A pool of ready-made, empty project workspaces with the git repository already initialized, and a janitor
+    deleting discarded and stale workspaces in the background, to keep both off the project-start path.
+    A new project claims a pooled workspace by an atomic rename; `WORKSPACE_POOL_SIZE` sets the pool size.
+    Claimed workspaces are held until released and are never deleted as stale meanwhile.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from metagpt.config import CONFIG
+from metagpt.logs import logger
+from metagpt.utils.git_repository import GitRepository
+
+POOL_DIRNAME = ".pool"
+TRASH_PREFIX = ".trash-"
+SWEEP_INTERVAL = 60  # seconds between two scans for stale workspaces
+
+
+class WorkspacePool:
+    """Pooled workspaces live in `{root}/.pool/ready-*`; they are built in `{root}/.pool/tmp-*` and published by a
+    rename so that a claimed workspace is always complete. Discarded workspaces are renamed to `{parent}/.trash-*`
+    at once and deleted by the janitor."""
+
+    def __init__(self, root: Optional[Path] = None, size: Optional[int] = None):
+        self._root = Path(root) if root else None
+        self._size = size
+        self._tasks = set()
+        self._refilling = False
+        self._last_sweep = 0.0
+        self._held = set()  # resolved paths of the workspaces in use by this process
+
+    @property
+    def root(self) -> Path:
+        return self._root or Path(CONFIG.workspace_path)
+
+    @property
+    def size(self) -> int:
+        return self._size if self._size is not None else CONFIG.workspace_pool_size
+
+    @property
+    def pool_path(self) -> Path:
+        return self.root / POOL_DIRNAME
+
+    def ready(self) -> list[Path]:
+        if not self.pool_path.exists():
+            return []
+        return sorted(self.pool_path.glob("ready-*"))
+
+    def hold(self, path: Path):
+        """Mark `path` as in use, so that it is never deleted as stale until released"""
+        self._held.add(Path(path).resolve())
+
+    def release(self, path: Path):
+        self._held.discard(Path(path).resolve())
+
+    def claim(self, path: Path) -> bool:
+        """Move a pooled workspace to `path`, which must not exist, and hold it. Return False if none could be claimed,
+        the caller then initializes the workspace itself."""
+        path = Path(path)
+        self.hold(path)
+        if CONFIG.workspace_ttl or CONFIG.workspace_quota:
+            self._schedule(self.clean())
+        if not self.size:
+            return False
+        claimed = False
+        for workspace in self.ready():
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(workspace, path)
+                claimed = True
+                break
+            except FileNotFoundError:  # claimed by another process
+                continue
+            except OSError as e:  # such as `path` on another file system
+                logger.debug(f"Claim workspace {workspace} to {path} failed: {e}")
+                break
+        self.schedule_refill()
+        return claimed
+
+    def refill(self):
+        """Build workspaces until the pool is full"""
+        self.pool_path.mkdir(parents=True, exist_ok=True)
+        for _ in range(self.size - len(self.ready())):
+            tmp = self.pool_path / f"tmp-{uuid.uuid4().hex}"
+            GitRepository(local_path=tmp, auto_init=True)
+            os.rename(tmp, self.pool_path / f"ready-{uuid.uuid4().hex}")
+
+    def schedule_refill(self):
+        if self._refilling or len(self.ready()) >= self.size:
+            return
+
+        async def _refill():
+            try:
+                await asyncio.to_thread(self.refill)
+            except Exception as e:
+                logger.warning(f"Refill workspace pool failed: {e}")
+            finally:
+                self._refilling = False
+
+        self._refilling = self._schedule(_refill())
+
+    def discard(self, path: Path):
+        """Remove `path` at once by renaming it; the janitor deletes it in the background"""
+        path = Path(path)
+        self.release(path)
+        trash = path.parent / f"{TRASH_PREFIX}{path.name}-{uuid.uuid4().hex}"
+        try:
+            os.rename(path, trash)
+        except OSError:
+            shutil.rmtree(path)
+            return
+        if not self._schedule(self.clean()):
+            shutil.rmtree(trash, ignore_errors=True)
+
+    async def clean(self):
+        """Delete the discarded workspaces, and the stale ones if `WORKSPACE_TTL` or `WORKSPACE_QUOTA` is set"""
+        await asyncio.to_thread(self._clean)
+
+    def _clean(self):
+        dirs = [self.root] + ([Path(CONFIG.project_path).parent] if CONFIG.project_path else [])
+        for trash in {i for d in set(dirs) if d.exists() for i in d.glob(f"{TRASH_PREFIX}*")}:
+            shutil.rmtree(trash, ignore_errors=True)
+
+        ttl, quota = CONFIG.workspace_ttl, CONFIG.workspace_quota
+        if not (ttl or quota) or time.time() - self._last_sweep < SWEEP_INTERVAL:
+            return
+        self._last_sweep = time.time()
+        for workspace in self.stale_workspaces(ttl=ttl, quota=quota * 1024 * 1024):
+            logger.info(f"Delete stale workspace {workspace}")
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    def stale_workspaces(self, ttl: float = 0, quota: int = 0) -> list[Path]:
+        """Return the projects not modified for `ttl` seconds, then the least recently modified projects until the total
+        size of the others fits in `quota` bytes. Only git repositories directly under the root are projects; the
+        current project and the held ones are never stale, but count toward the quota."""
+        keep = set(self._held)
+        if CONFIG.project_path:
+            keep.add(Path(CONFIG.project_path).resolve())
+        projects = {
+            i: _scan(i) for i in self.root.iterdir() if not i.name.startswith(".") and (i / ".git").is_dir()
+        }  # path -> (size, last modified)
+        total = sum(size for size, _ in projects.values())
+        now = time.time()
+        stale = []
+        for i, (size, mtime) in sorted(projects.items(), key=lambda x: x[1][1]):
+            if i.resolve() in keep:
+                continue
+            if (ttl and now - mtime > ttl) or (quota and total > quota):
+                stale.append(i)
+                total -= size
+        return stale
+
+    def _schedule(self, coro) -> bool:
+        try:
+            task = asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:  # no running event loop
+            coro.close()
+            return False
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def wait(self):
+        """Wait for the background refill and cleanup"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+
+def _scan(path: Path) -> tuple[int, float]:
+    """Return the total size of the files under `path` and the newest of their modification times; the mtime of a
+    directory itself only changes when entries are added or removed."""
+    size, mtime = 0, path.stat().st_mtime
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.stat(os.path.join(root, name), follow_symlinks=False)
+            except OSError:  # deleted meanwhile
+                continue
+            size += st.st_size
+            mtime = max(mtime, st.st_mtime)
+    return size, mtime
+
+
+WORKSPACE_POOL = WorkspacePool()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : bench_environment.py
+@Desc    : Measure `Environment.publish_message` cost for teams of growing size. Messages addressed to a single role
+    should cost the same whatever the number of roles in the environment.
+
+    python -m tests.benchmark.bench_environment [messages]
+"""
+import sys
+import time
+
+from metagpt.environment import Environment
+from metagpt.logs import logger
+from metagpt.roles import Role
+from metagpt.schema import Message
+
+
+def bench(n_roles: int, n_messages: int) -> float:
+    env = Environment()
+    env.add_roles([Role(name=f"Role{i}", profile=f"Profile{i}") for i in range(n_roles)])
+    messages = [Message(content=f"message {i}", send_to=f"Role{i % n_roles}") for i in range(n_messages)]
+    start = time.perf_counter()
+    for msg in messages:
+        env.publish_message(msg)
+    cost = time.perf_counter() - start
+    assert len(env.history) > 0
+    return cost
+
+
+def main(n_messages: int = 10_000):
+    logger.remove()  # keep the debug log of `publish_message` out of the measurement
+    for n_roles in (10, 100, 500):
+        cost = bench(n_roles, n_messages)
+        print(f"roles: {n_roles:4d}, messages: {n_messages}, avg publish: {cost / n_messages * 1e6:.2f}us")
+
+
+if __name__ == "__main__":
+    main(*[int(i) for i in sys.argv[1:]])
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : bench_memory.py
+@Desc    : Push 100k messages through a `Role` and report the observe cost per batch. With the indexed `Memory` the
+    cost of the last batch should stay close to the cost of the first one.
+
+    python -m tests.benchmark.bench_memory [total] [batch]
+"""
+import asyncio
+import sys
+import time
+
+from metagpt.actions import UserRequirement
+from metagpt.logs import logger
+from metagpt.roles import Role
+from metagpt.schema import Message
+
+
+async def main(total: int = 100_000, batch: int = 1_000):
+    role = Role(name="Bench", profile="Benchmark")
+    costs = []
+    seen = None
+    for i in range(0, total, batch):
+        for j in range(i, i + batch):
+            role.put_message(Message(content=f"message {j}", role="user", cause_by=UserRequirement))
+        if seen:
+            role.put_message(seen)  # an already observed message must be deduplicated
+        start = time.perf_counter()
+        observed = await role._observe()
+        costs.append(time.perf_counter() - start)
+        assert observed == batch
+        seen = role.rc.news[0]
+
+    assert role.rc.memory.count() == total
+    logger.info(f"messages: {total}, batch: {batch}")
+    logger.info(f"first batch: {costs[0] * 1000:.2f}ms, last batch: {costs[-1] * 1000:.2f}ms")
+    logger.info(f"total observe: {sum(costs):.2f}s, avg per message: {sum(costs) / total * 1e6:.2f}us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*[int(i) for i in sys.argv[1:]]))
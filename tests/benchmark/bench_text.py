@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : bench_text.py
+@Desc    : Chunk a multi-megabyte web page, as WebBrowseAndSummarize does, and reduce a long prompt, with the list based
+    chunker tokenizing a line at a time and the full tokenization of every candidate, as before, and with
+    metagpt/utils/text.py.
+
+    python -m tests.benchmark.bench_text [megabytes] [model]
+"""
+import sys
+import time
+
+import tiktoken
+
+from metagpt.logs import logger
+from metagpt.utils.text import (
+    generate_prompt_chunk,
+    reduce_message_length,
+    split_paragraph,
+)
+from metagpt.utils.token_counter import TOKEN_MAX
+
+
+def count_string_tokens_uncached(string: str, model_name: str) -> int:
+    return len(tiktoken.encoding_for_model(model_name).encode(string))
+
+
+def generate_prompt_chunk_list(text, prompt_template, model_name, system_text, reserved=0):
+    paragraphs = text.splitlines(keepends=True)
+    current_token = 0
+    current_lines = []
+    reserved = reserved + count_string_tokens_uncached(prompt_template + system_text, model_name)
+    max_token = TOKEN_MAX.get(model_name, 2048) - reserved - 100
+    while paragraphs:
+        paragraph = paragraphs.pop(0)
+        token = count_string_tokens_uncached(paragraph, model_name)
+        if current_token + token <= max_token:
+            current_lines.append(paragraph)
+            current_token += token
+        elif token > max_token:
+            paragraphs = split_paragraph(paragraph) + paragraphs
+            continue
+        else:
+            yield prompt_template.format("".join(current_lines))
+            current_lines = [paragraph]
+            current_token = token
+    if current_lines:
+        yield prompt_template.format("".join(current_lines))
+
+
+def reduce_message_length_full(msgs, model_name, system_text, reserved=0):
+    max_token = TOKEN_MAX.get(model_name, 2048) - count_string_tokens_uncached(system_text, model_name) - reserved
+    for msg in msgs:
+        if count_string_tokens_uncached(msg, model_name) < max_token:
+            return msg
+    raise RuntimeError("fail to reduce message length")
+
+
+def timeit(name: str, func):
+    start = time.perf_counter()
+    result = func()
+    logger.info(f"{name}: {time.perf_counter() - start:.3f}s")
+    return result
+
+
+def main(megabytes: int = 4, model: str = "gpt-3.5-turbo-16k"):
+    # web pages are mostly short lines: menus, links, table cells
+    lines = [
+        "Home\n",
+        "Products | Pricing | Docs\n",
+        "MetaGPT takes a one line requirement as input and outputs APIs.\n",
+    ]
+    block = "".join(lines)
+    page = block * (megabytes * 1024 * 1024 // len(block))
+    args = ("### Reference\n{}", model, "You are an AI researcher.", 1500)
+
+    expected = timeit("chunk list", lambda: list(generate_prompt_chunk_list(page, *args)))
+    assert timeit("chunk stream", lambda: list(generate_prompt_chunk(page, *args))) == expected
+    logger.info(f"{len(page) / 1024 / 1024:.1f}MB page, {len(expected)} chunks")
+
+    def candidates():
+        for i in range(16):
+            yield page[: len(page) >> i]
+
+    expected = timeit("reduce full", lambda: reduce_message_length_full(candidates(), model, "System", 1500))
+    assert timeit("reduce incremental", lambda: reduce_message_length(candidates(), model, "System", 1500)) == expected
+
+
+if __name__ == "__main__":
+    main(*[int(i) if i.isdigit() else i for i in sys.argv[1:]])
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : bench_token_counter.py
+@Desc    : Count the tokens of many conversations with the tiktoken lookup of every call, as before the encoder
+    cache, with the cached encoder and with the batch counter.
+
+    python -m tests.benchmark.bench_token_counter [conversations] [model]
+"""
+import sys
+import time
+
+import tiktoken
+
+from metagpt.logs import logger
+from metagpt.utils.token_counter import (
+    count_message_tokens,
+    count_message_tokens_batch,
+    estimate_message_tokens,
+)
+
+
+def count_message_tokens_uncached(messages, model):
+    encoding = tiktoken.encoding_for_model(model)
+    num_tokens = 3
+    for message in messages:
+        num_tokens += 3 + sum(len(encoding.encode(value)) for value in message.values())
+    return num_tokens
+
+
+def timeit(name: str, func, n: int):
+    start = time.perf_counter()
+    counts = func()
+    cost = time.perf_counter() - start
+    logger.info(f"{name}: {cost:.3f}s, {cost / n * 1e6:.1f}us per conversation")
+    return counts
+
+
+def main(n: int = 2_000, model: str = "gpt-4-1106-preview"):
+    conversations = [
+        [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": f"Write the PRD of project {i}. " * 50},
+            {"role": "assistant", "content": f"## Original Requirements\n{i} 需求 " * 80},
+        ]
+        for i in range(n)
+    ]
+    count_message_tokens(conversations[0], model)  # load the encoding
+
+    expected = timeit("uncached", lambda: [count_message_tokens_uncached(i, model) for i in conversations], n)
+    assert timeit("cached", lambda: [count_message_tokens(i, model) for i in conversations], n) == expected
+    assert timeit("batch", lambda: count_message_tokens_batch(conversations, model), n) == expected
+    estimated = timeit("estimate", lambda: [estimate_message_tokens(i) for i in conversations], n)
+    logger.info(f"estimate / exact: {sum(estimated) / sum(expected):.2f}")
+
+
+if __name__ == "__main__":
+    main(*[int(i) if i.isdigit() else i for i in sys.argv[1:]])
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : bench_workspace_pool.py
+@Desc    : Start projects at a fixed request rate and report the project-start latency (replacing an old project
+    directory and getting a git repository) without the workspace pool, as before, and with it.
+
+    python -m tests.benchmark.bench_workspace_pool [projects] [requests_per_second] [pool_size]
+"""
+import asyncio
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from metagpt.logs import logger
+from metagpt.utils.git_repository import GitRepository
+from metagpt.utils.workspace_pool import WorkspacePool
+
+
+def start_project_without_pool(path: Path):
+    if path.exists():
+        shutil.rmtree(path)
+    GitRepository(local_path=path, auto_init=True)
+
+
+def start_project_with_pool(pool: WorkspacePool, path: Path):
+    if path.exists():
+        pool.discard(path)
+    if not pool.claim(path):
+        GitRepository(local_path=path, auto_init=True)
+
+
+def make_old_project(path: Path):
+    GitRepository(local_path=path, auto_init=True)
+    for i in range(50):
+        (path / f"file_{i}.py").write_text("print('hello')\n" * 100)
+
+
+async def run(name: str, start, root: Path, projects: int, rate: float):
+    for i in range(projects):
+        make_old_project(root / f"project_{i}")
+    latencies = []
+    begin = time.perf_counter()
+    for i in range(projects):
+        await asyncio.sleep(max(0.0, begin + i / rate - time.perf_counter()))  # requests arrive at a fixed rate
+        t = time.perf_counter()
+        start(root / f"project_{i}")
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+    logger.info(
+        f"{name}: p50 {statistics.median(latencies) * 1000:.2f}ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms, "
+        f"max {latencies[-1] * 1000:.2f}ms"
+    )
+
+
+async def main(projects: int = 100, rate: float = 20, pool_size: int = 10):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "no_pool"
+        root.mkdir()
+        await run("without pool", start_project_without_pool, root, projects, rate)
+
+        root = Path(tmp) / "pool"
+        pool = WorkspacePool(root=root, size=pool_size)
+        pool.refill()
+        await run("with pool", lambda path: start_project_with_pool(pool, path), root, projects, rate)
+        await pool.wait()
+        logger.info(f"pool misses are initialized in place; ready workspaces left: {len(pool.ready())}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*[float(i) if "." in i else int(i) for i in sys.argv[1:]]))
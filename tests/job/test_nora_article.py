@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_nora_article.py
+"""
+import asyncio
+
+import pytest
+
+from job import nora_article
+from job.nora_article import TutorialAssistant, WriteContent
+
+TITLES = {
+    "title": "MongoDB教程",
+    "directory": [{"简介": ["什么是MongoDB"]}, {"安装": ["Linux", "Windows"]}, {"CRUD": ["插入", "查询"]}],
+}
+
+
+KEYS = [list(i.keys())[0] for i in TITLES["directory"]]
+
+
+class FakeWriteContent:
+    """默认越靠后的章节越早写完，可指定每章的耗时以及某一章失败"""
+
+    def __init__(self, delays=None, fail=None):
+        self.delays = delays or {key: 0.01 * (len(KEYS) - i) for i, key in enumerate(KEYS)}
+        self.fail = fail
+        self.streams = []
+        self.finished = []
+        self.cancelled = []
+
+    async def __call__(self, action, topic, *args, stream=True, **kwargs):
+        key = list(action.directory.keys())[0]
+        self.streams.append(stream)
+        try:
+            await asyncio.sleep(self.delays[key])
+        except asyncio.CancelledError:
+            self.cancelled.append(key)
+            raise
+        if key == self.fail:
+            raise RuntimeError(f"failed to write {key}")
+        self.finished.append(key)
+        return f"## {key}\n{topic}"
+
+
+@pytest.fixture
+def fake_write(mocker):
+    def _fake_write(delays=None, fail=None):
+        fake = FakeWriteContent(delays, fail)
+
+        async def run(action, topic, *args, **kwargs):
+            return await fake(action, topic, *args, **kwargs)
+
+        mocker.patch.object(WriteContent, "run", run)
+        return fake
+
+    mocker.patch.object(nora_article.WriteDirectory, "run", mocker.AsyncMock(return_value=TITLES))
+    mocker.patch.object(nora_article.File, "write", mocker.AsyncMock())
+    return _fake_write
+
+
+async def run_role(parallel):
+    role = TutorialAssistant(parallel=parallel)
+    items = [item async for item in role.run("mongodb")]
+    return role, items
+
+
+@pytest.mark.asyncio
+async def test_tutorial_assistant_parallel(fake_write):
+    fake = fake_write()
+    role, items = await run_role(parallel=True)
+    # 章节乱序完成，但按目录顺序输出，且不流式打印
+    assert fake.finished == ["CRUD", "安装", "简介"]
+    assert fake.streams == [False] * 3
+
+    fake = fake_write()
+    sequential_role, sequential_items = await run_role(parallel=False)
+    assert fake.finished == ["简介", "安装", "CRUD"]
+    assert items == sequential_items
+    assert role.total_content == sequential_role.total_content
+    assert role.total_content.startswith("# MongoDB教程\n\n\n## 简介")
+
+
+@pytest.mark.asyncio
+async def test_tutorial_assistant_parallel_stop(fake_write):
+    fake = fake_write(delays={"简介": 0, "安装": 10, "CRUD": 10})
+    role = TutorialAssistant()
+    role.topic = "mongodb"
+    role._init_actions([WriteContent(directory=i) for i in TITLES["directory"]])
+    role._set_state(0)
+
+    chapters = role._act_parallel()
+    assert (await chapters.__anext__()).startswith("## 简介")
+    await chapters.aclose()
+    # 调用方提前停止时，未输出的章节被取消
+    assert fake.finished == ["简介"]
+    assert sorted(fake.cancelled) == sorted(["安装", "CRUD"])
+
+
+@pytest.mark.asyncio
+async def test_tutorial_assistant_parallel_error(fake_write):
+    fake = fake_write(delays={"简介": 0, "安装": 0.01, "CRUD": 10}, fail="安装")
+    role = TutorialAssistant()
+    items = []
+    with pytest.raises(RuntimeError):
+        async for item in role.run("mongodb"):
+            items.append(item)
+    # 某一章失败时，已写完的章节照常输出，其余章节被取消
+    assert items == ["", "## 简介\nmongodb"]
+    assert fake.cancelled == ["CRUD"]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_nora_travel.py
+"""
+import asyncio
+
+import pytest
+
+from job import nora_travel
+from job.nora_travel import GetTransInfo
+from metagpt.schema import Message
+
+DATES = ["2024-02-01", "2024-02-02", "2024-02-03", "2024-02-04"]
+
+
+def tickets(date, count):
+    return {"data": {"count": count, "list": [f"G{i}-{date}" for i in range(count)]}}
+
+
+class FakeTicketService:
+    """越晚的日期越早返回，count/errors按日期指定"""
+
+    def __init__(self, counts, errors=()):
+        self.counts = counts
+        self.errors = errors
+        self.finished = []
+
+    async def aget_tickets(self, arrival_city, departure_city, departure_date):
+        await asyncio.sleep(0.01 * (len(DATES) - DATES.index(departure_date)))
+        self.finished.append(departure_date)
+        if departure_date in self.errors:
+            raise RuntimeError(f"upstream error {departure_date}")
+        return tickets(departure_date, self.counts.get(departure_date, 0))
+
+
+@pytest.fixture
+def service(mocker):
+    def _service(counts, errors=()):
+        fake = FakeTicketService(counts, errors)
+        mocker.patch.object(nora_travel, "TrainTicketService", return_value=fake)
+        return fake
+
+    return _service
+
+
+@pytest.mark.asyncio
+async def test_request_resp_ticket_api_earliest_date(service):
+    fake = service({"2024-02-02": 1, "2024-02-03": 2, "2024-02-04": 3})
+    rsp = await GetTransInfo().request_resp_ticket_api("广州", "上海", DATES)
+    # 后面的日期先返回，但仍取最早有票的日期
+    assert fake.finished == list(reversed(DATES))
+    assert rsp == str(tickets("2024-02-02", 1)["data"]["list"])
+
+
+@pytest.mark.asyncio
+async def test_request_resp_ticket_api_error(service):
+    service({"2024-02-01": 1, "2024-02-03": 2}, errors={"2024-02-01"})
+    rsp = await GetTransInfo().request_resp_ticket_api("广州", "上海", DATES)
+    # 失败的日期被跳过，不影响其他日期
+    assert rsp == str(tickets("2024-02-03", 2)["data"]["list"])
+
+    service({}, errors=set(DATES))
+    assert await GetTransInfo().request_resp_ticket_api("广州", "上海", DATES) == ""
+
+
+@pytest.mark.asyncio
+async def test_get_trans_info_run(service, mocker):
+    service({"2024-02-03": 2}, errors={"2024-02-01"})
+    mocker.patch.object(nora_travel, "generate_dates", return_value=DATES)
+    mocker.patch.object(nora_travel.AmapWeather, "aget_weather", mocker.AsyncMock(return_value="晴"))
+    mocker.patch.object(nora_travel.AmapPOISearch, "asearch", mocker.AsyncMock(return_value=None))
+    aask = mocker.patch.object(GetTransInfo, "_aask", mocker.AsyncMock(return_value="summary"))
+
+    content = {
+        "source_city": "广州",
+        "dest_city": "上海",
+        "has_weather": 1,
+        "keywords": ["美食"],
+    }
+    rsp = await GetTransInfo().run([Message(content="我想去上海"), Message(content=str(content))])
+
+    assert rsp.content == "summary"
+    prompt = aask.call_args.args[0]
+    assert str(tickets("2024-02-03", 2)["data"]["list"]) in prompt
+    assert "晴" in prompt
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_amap.py
+"""
+import asyncio
+
+import pytest
+
+from job.utils.amap import AmapCache
+
+OK = {"status": "1", "lives": [{"city": "北京", "weather": "晴"}]}
+ERROR = {"status": "0", "info": "DAILY_QUERY_OVER_LIMIT", "infocode": "10044"}
+
+
+class Upstream:
+    def __init__(self, *results, delay=0):
+        self.results = list(results)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.results.pop(0)
+
+
+@pytest.fixture
+def cache():
+    cache = AmapCache()
+    cache._redis = False  # 只测进程内缓存
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_amap_cache_hit(cache):
+    fetch = Upstream(OK)
+    assert await cache.get_or_fetch("weather", {"key": "a", "city": "北京"}, fetch) == OK
+    # 缓存键忽略key
+    assert await cache.get_or_fetch("weather", {"key": "b", "city": "北京"}, fetch) == OK
+    assert fetch.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_amap_cache_error_not_cached(cache):
+    fetch = Upstream(ERROR, None, OK)
+    assert await cache.get_or_fetch("weather", {"city": "北京"}, fetch) == ERROR
+    assert await cache.get_or_fetch("weather", {"city": "北京"}, fetch) is None
+    assert await cache.get_or_fetch("weather", {"city": "北京"}, fetch) == OK
+    assert await cache.get_or_fetch("weather", {"city": "北京"}, fetch) == OK
+    assert fetch.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_amap_cache_tickets(cache):
+    tickets = {"success": True, "data": {"count": 0, "list": []}}
+    fetch = Upstream(tickets)
+    assert await cache.get_or_fetch("tickets", {"city": "北京"}, fetch) == tickets
+    assert await cache.get_or_fetch("tickets", {"city": "北京"}, fetch) == tickets
+    assert fetch.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_amap_cache_concurrent(cache):
+    fetch = Upstream(OK, delay=0.05)
+    results = await asyncio.gather(*[cache.get_or_fetch("poi", {"keywords": "酒店"}, fetch) for _ in range(5)])
+    assert results == [OK] * 5
+    assert fetch.calls == 1
+    assert not cache._pending
+
+    # 失败的请求同样合并，但不缓存
+    fetch = Upstream(ERROR, OK, delay=0.05)
+    results = await asyncio.gather(*[cache.get_or_fetch("poi", {"keywords": "网吧"}, fetch) for _ in range(5)])
+    assert results == [ERROR] * 5
+    assert fetch.calls == 1
+    assert await cache.get_or_fetch("poi", {"keywords": "网吧"}, fetch) == OK
+    assert fetch.calls == 2
@@ -5,6 +5,7 @@
 @Author  : alexanderwu
 @File    : test_action_node.py
 """
+import asyncio
 from typing import List, Tuple
 
 import pytest
@@ -12,6 +13,7 @@ from pydantic import ValidationError
 
 from metagpt.actions import Action
 from metagpt.actions.action_node import ActionNode
+from metagpt.config import CONFIG
 from metagpt.environment import Environment
 from metagpt.llm import LLM
 from metagpt.roles import Role
@@ -166,6 +168,78 @@ def test_create_model_class_with_mapping():
     assert value == ["game.py", "app.py", "static/css/styles.css", "static/js/script.js", "templates/index.html"]
 
 
+def test_create_model_class_cached():
+    t = ActionNode.create_model_class("test_class_2", WRITE_TASKS_OUTPUT_MAPPING)
+    assert t is ActionNode.create_model_class("test_class_2", dict(WRITE_TASKS_OUTPUT_MAPPING))
+    assert t is not ActionNode.create_model_class("test_class_2", WRITE_TASKS_OUTPUT_MAPPING_MISSING)
+    assert t is not ActionNode.create_model_class("test_class_3", WRITE_TASKS_OUTPUT_MAPPING)
+    assert ActionNode.get_model_json_schema(t) is ActionNode.get_model_json_schema(t)
+
+
+def test_compile_cached(mocker):
+    node = ActionNode.from_children("Tasks", [ActionNode("Task list", List[str], "tasks", ["main.py"])])
+    spy = mocker.spy(node, "compile_example")
+    prompt = node.compile(context="ctx1")
+    assert node.compile(context="ctx1") == prompt
+    assert "ctx2" in node.compile(context="ctx2")
+    assert spy.call_count == 1
+
+    node.add_child(ActionNode("Anything UNCLEAR", str, "unclear", ""))
+    assert "Anything UNCLEAR" in node.compile(context="ctx1")
+    assert "Anything UNCLEAR" not in node.compile(context="ctx1", exclude=["Anything UNCLEAR"])
+    assert spy.call_count == 3
+
+
+class MockFillLLM:
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.prompts = {}
+
+    async def aask(self, prompt, system_msgs=None, timeout=3):
+        key = [i for i in ["A", "B", "C"] if f"- {i}: " in prompt][0]
+        self.prompts[key] = prompt
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return f'[CONTENT]\n{{"{key}": "{key} value"}}\n[/CONTENT]'
+
+
+@pytest.mark.asyncio
+async def test_fill_complex():
+    node = ActionNode.from_children(
+        "ABC",
+        [
+            ActionNode("A", str, "a", "a"),
+            ActionNode("B", str, "b", "b", depends_on=["A"]),
+            ActionNode("C", str, "c", "c"),
+        ],
+    )
+    llm = MockFillLLM()
+    await node.fill(context="ctx", llm=llm, strgy="complex")
+    assert node.instruct_content.model_dump() == {"A": "A value", "B": "B value", "C": "C value"}
+    assert llm.max_running == 2  # A and C at the same time, then B
+    assert "## A\nA value" in llm.prompts["B"]
+    assert "## A" not in llm.prompts["C"]
+
+    await node.fill(context="ctx", llm=llm, strgy="complex", exclude=["A"])
+    assert node.instruct_content.model_dump() == {"B": "B value", "C": "C value"}
+
+    max_concurrency = CONFIG.action_node_max_concurrency
+    try:
+        CONFIG.action_node_max_concurrency = 1
+        llm = MockFillLLM()
+        await node.fill(context="ctx", llm=llm, strgy="complex")
+        assert llm.max_running == 1
+    finally:
+        CONFIG.action_node_max_concurrency = max_concurrency
+
+    node.children["A"].depends_on = ["B"]
+    with pytest.raises(ValueError):
+        await node.fill(context="ctx", llm=llm, strgy="complex")
+
+
 if __name__ == "__main__":
     test_create_model_class()
     test_create_model_class_with_mapping()
@@ -6,9 +6,12 @@
 @File    : test_research.py
 """
 
+import asyncio
+
 import pytest
 
 from metagpt.actions import research
+from metagpt.utils.parse_html import WebPage
 
 
 @pytest.mark.asyncio
@@ -80,6 +83,47 @@ async def test_web_browse_and_summarize(mocker):
     assert resp[url] is None
 
 
+@pytest.mark.asyncio
+async def test_web_browse_and_summarize_concurrently(mocker):
+    running = max_running = 0
+    cancelled = []
+
+    async def mock_llm_ask(self, prompt, *args, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        try:
+            await asyncio.sleep(0 if prompt == "irrelevant" else 0.05)
+        except asyncio.CancelledError:
+            cancelled.append(prompt)
+            raise
+        finally:
+            running -= 1
+        if prompt == "irrelevant":
+            return "Not relevant."
+        return "summary" if prompt.startswith("### Requirements") else f"summary of {prompt}"
+
+    async def browse_func(*urls):
+        return [
+            WebPage(inner_text="a|b|c|d", html="", url=urls[0]),
+            WebPage(inner_text="irrelevant|e|f", html="", url=urls[1]),
+        ]
+
+    mocker.patch("metagpt.provider.base_llm.BaseLLM.aask", mock_llm_ask)
+    mocker.patch("metagpt.actions.research.generate_prompt_chunk", lambda content, *args: content.split("|"))
+    urls = ["https://example.com/a", "https://example.com/b"]
+
+    action = research.WebBrowseAndSummarize(browse_func=browse_func, max_concurrency=3)
+    resp = await action.run(*urls, query="query")
+    assert resp == {urls[0]: "summary", urls[1]: "summary"}
+    assert max_running == 3
+
+    action = research.WebBrowseAndSummarize(browse_func=browse_func, max_concurrency=0, skip_irrelevant_pages=True)
+    resp = await action.run(*urls, query="query")
+    assert resp == {urls[0]: "summary", urls[1]: None}
+    assert sorted(cancelled) == ["e", "f"]
+
+
 @pytest.mark.asyncio
 async def test_conduct_research(mocker):
     data = None
@@ -91,5 +91,23 @@ async def test_write_code_deps():
     assert rsp.code_doc.content
 
 
+@pytest.mark.asyncio
+async def test_get_codes(mocker):
+    task_doc = Document(content='{"Task list": ["models.py", "game.py", "utils.py", "main.py"]}')
+    git_repo = CONFIG.git_repo
+    CONFIG.git_repo = mocker.Mock()
+    get_many = mocker.AsyncMock(side_effect=lambda filenames: [Document(filename=i, content=i) for i in filenames])
+    # utils.py is not rewritten in this round, game.py is and was not saved before it
+    CONFIG.git_repo.new_file_repository.return_value.get_many = get_many
+    try:
+        codes = await WriteCode.get_codes(task_doc, exclude="main.py")
+        assert codes == "----- models.py\nmodels.py\n----- game.py\ngame.py\n----- utils.py\nutils.py"
+        codes = await WriteCode.get_codes(task_doc, exclude="main.py", overrides={"models.py": "old", "game.py": None})
+        assert codes == "----- models.py\nold\n----- utils.py\nutils.py"
+        assert get_many.call_args == mocker.call(["utils.py"])
+    finally:
+        CONFIG.git_repo = git_repo
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
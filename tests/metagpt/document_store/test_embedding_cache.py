@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_embedding_cache.py
+@Desc    : Unit tests of metagpt/document_store/embedding_cache.py
+"""
+from typing import List
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from metagpt.document_store.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class MockEmbeddings(Embeddings):
+    model = "mock-embedding"
+
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.texts.append(list(texts))
+        return [self.embed_query(i) for i in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return [float(len(text)), 0.5, -1.0]
+
+
+def test_embedding_cache(tmp_path):
+    cache = EmbeddingCache(tmp_path)
+    keys = [EmbeddingCache.make_key("model", str(i)) for i in range(3)]
+    cache.set(keys[:2], [[1.0, 2.0], [3.0, 4.0]])
+    cache.set(keys[2:], [[5.0, 6.0, 7.0]])
+
+    vectors = cache.get(keys + ["missing"])
+    assert [i.tolist() for i in vectors[:3]] == [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0, 7.0]]
+    assert vectors[3] is None
+    assert cache.stats() == {"hits": 3, "misses": 1, "hit_rate": 0.75}
+    cache.close()
+
+    cache = EmbeddingCache(tmp_path)
+    assert cache.count() == 3
+    assert cache.get(keys[1:2])[0].tolist() == [3.0, 4.0]
+    cache.clear()
+    assert cache.count() == 0
+    assert cache.get(keys[:1]) == [None]
+
+
+def test_embedding_cache_interrupted_write(tmp_path):
+    cache = EmbeddingCache(tmp_path)
+    keys = [EmbeddingCache.make_key("model", str(i)) for i in range(3)]
+    cache.set(keys[:2], [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+    with open(tmp_path / "vectors-3.f32", "ab") as writer:
+        writer.write(b"\0\0")  # the tail of an interrupted append
+    assert [i.tolist() for i in cache.get(keys[:2])] == [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]
+    assert EmbeddingCache(tmp_path).get(keys[:1])[0].tolist() == [1.0, 2.0, 3.0]
+
+    cache.set(keys[2:], [[7.0, 8.0, 9.0]])  # appended after the whole rows
+    assert (tmp_path / "vectors-3.f32").stat().st_size == 3 * 3 * 4
+    assert [i.tolist() for i in EmbeddingCache(tmp_path).get(keys)] == [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
+
+
+def test_embedding_cache_shared(tmp_path):
+    cache1, cache2 = EmbeddingCache(tmp_path), EmbeddingCache(tmp_path)
+    key1, key2 = EmbeddingCache.make_key("model", "1"), EmbeddingCache.make_key("model", "2")
+    cache1.set([key1], [[1.0, 1.0]])
+    cache2.set([key2], [[2.0, 2.0]])  # rows counted from the file, not from what this instance appended
+    assert [i.tolist() for i in cache1.get([key1, key2])] == [[1.0, 1.0], [2.0, 2.0]]
+    assert [i.tolist() for i in cache2.get([key1, key2])] == [[1.0, 1.0], [2.0, 2.0]]
+
+
+def test_embedding_cache_eviction(tmp_path, mocker):
+    mocker.patch("metagpt.document_store.embedding_cache.COMPACT_MIN_ROWS", 4)
+    cache = EmbeddingCache(tmp_path, max_entries=2)
+    reader = EmbeddingCache(tmp_path)
+    keys = [EmbeddingCache.make_key("model", str(i)) for i in range(6)]
+    for i, key in enumerate(keys):
+        cache.set([key], [[float(i), 0.0]])
+        assert reader.get([key])[0].tolist() == [float(i), 0.0]
+    assert cache.count() == 2
+    assert cache.get(keys[:4]) == [None] * 4
+    assert [i.tolist() for i in reader.get(keys[4:])] == [[4.0, 0.0], [5.0, 0.0]]
+    # rewritten once most rows were evicted, instead of growing forever
+    files = list(tmp_path.glob("vectors-*.f32"))
+    assert len(files) == 1 and files[0].stat().st_size == 3 * 2 * 4
+
+    cache.set(keys[4:5], [[4.5, 0.0]])  # replaced
+    assert reader.get(keys[4:])[0].tolist() == [4.5, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_cached_embeddings(tmp_path):
+    embedding = MockEmbeddings()
+    cached = CachedEmbeddings(embedding, cache=EmbeddingCache(tmp_path))
+
+    assert cached.embed_documents(["a", "bb", "a"]) == [[1.0, 0.5, -1.0], [2.0, 0.5, -1.0], [1.0, 0.5, -1.0]]
+    assert cached.embed_documents(["bb", "ccc"]) == [[2.0, 0.5, -1.0], [3.0, 0.5, -1.0]]
+    assert await cached.aembed_documents(["a", "ccc"]) == [[1.0, 0.5, -1.0], [3.0, 0.5, -1.0]]
+    assert embedding.texts == [["a", "bb"], ["ccc"]]  # only the misses, deduplicated
+
+    assert cached.embed_query("a") == [1.0, 0.5, -1.0]
+    assert await cached.aembed_query("a") == [1.0, 0.5, -1.0]
+    assert cached.cache.stats()["hits"] == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-s"])
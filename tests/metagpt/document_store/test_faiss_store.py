@@ -6,7 +6,13 @@
 @File    : test_faiss_store.py
 """
 
+import json
+import os
+import time
+from typing import List
+
 import pytest
+from langchain_core.embeddings import Embeddings
 
 from metagpt.const import EXAMPLE_PATH
 from metagpt.document_store import FaissStore
@@ -38,3 +44,60 @@ async def test_write():
     _faiss_store = store.write()
     assert _faiss_store.docstore
     assert _faiss_store.index
+
+
+class MockEmbeddings(Embeddings):
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.texts.extend(texts)
+        return [self.embed_query(i) for i in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return [float(len(text)), float(sum(map(ord, text)) % 101), 1.0]
+
+
+def test_update(tmp_path):
+    rows = [{"source": f"question {i}", "output": f"answer {i}"} for i in range(5)]
+    data_path = tmp_path / "qa.json"
+    data_path.write_text(json.dumps(rows))
+    embedding = MockEmbeddings()
+    store = FaissStore(data_path, embedding=embedding)
+    assert embedding.texts == [f"answer {i}" for i in range(5)]
+
+    rows[1]["output"] = "answer 1 changed"
+    del rows[3]
+    rows.append({"source": "question 5", "output": "answer 5"})
+    data_path.write_text(json.dumps(rows))
+    embedding.texts = []
+    assert store.update() == {"added": 2, "deleted": 2, "unchanged": 3}
+    assert embedding.texts == ["answer 1 changed", "answer 5"]
+    assert sorted(i.page_content for i in store.store.docstore._dict.values()) == sorted(i["output"] for i in rows)
+    assert store.update() == {"added": 0, "deleted": 0, "unchanged": 5}
+
+    embedding.texts = []
+    store = FaissStore(data_path, embedding=embedding)
+    assert embedding.texts == []
+    assert store.search("answer 5", k=1) == "answer 5"
+    assert not list(tmp_path.glob(".*tmp*"))
+
+
+def test_update_touched(tmp_path, mocker):
+    data_path = tmp_path / "qa.json"
+    data_path.write_text(json.dumps([{"source": "question", "output": "answer"}]))
+    embedding = MockEmbeddings()
+    FaissStore(data_path, cache_dir=tmp_path / "cache", embedding=embedding)
+    assert (tmp_path / "cache" / "qa.faiss").exists()
+    assert not (tmp_path / "qa.faiss").exists()
+
+    now = time.time()
+    os.utime(tmp_path / "cache" / "qa.faiss", (now - 20, now - 20))
+    os.utime(data_path, (now - 10, now - 10))  # touched after indexed, rows unchanged
+    update = mocker.spy(FaissStore, "update")
+    store = FaissStore(data_path, cache_dir=tmp_path / "cache", embedding=embedding)
+    assert update.call_count == 1
+    assert store.search("answer", k=1) == "answer"
+    FaissStore(data_path, cache_dir=tmp_path / "cache", embedding=embedding)
+    assert update.call_count == 1
+    assert embedding.texts == ["answer"]
@@ -10,7 +10,9 @@
 import pytest
 
 from metagpt.config import CONFIG
+from metagpt.document_store.embedding_cache import get_embedding_cache
 from metagpt.learn.text_to_embedding import text_to_embedding
+from metagpt.tools.openai_text_to_embedding import Embedding, ResultEmbedding
 
 
 @pytest.mark.asyncio
@@ -22,5 +24,21 @@ async def test_text_to_embedding():
     assert len(v.data) > 0
 
 
+@pytest.mark.asyncio
+async def test_text_to_embedding_cached(tmp_path, mocker):
+    result = ResultEmbedding(data=[Embedding(object="embedding", embedding=[0.1, 0.2], index=0)], model="m")
+    mock = mocker.patch("metagpt.learn.text_to_embedding.oas3_openai_text_to_embedding", return_value=result)
+    embedding_cache, embedding_cache_path = CONFIG.embedding_cache, CONFIG.embedding_cache_path
+    CONFIG.embedding_cache, CONFIG.embedding_cache_path = True, tmp_path
+    try:
+        assert get_embedding_cache().path == tmp_path
+        v1 = await text_to_embedding(text="Panda emoji", model="m", openai_api_key="sk-xxx")
+        v2 = await text_to_embedding(text="Panda emoji", model="m", openai_api_key="sk-xxx")
+    finally:
+        CONFIG.embedding_cache, CONFIG.embedding_cache_path = embedding_cache, embedding_cache_path
+    assert mock.call_count == 1
+    assert v1.data[0].embedding == pytest.approx(v2.data[0].embedding)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -55,3 +55,51 @@ def test_memory():
     memory.clear()
     assert memory.count() == 0
     assert len(memory.index) == 0
+
+
+def test_memory_indexes():
+    memory = Memory()
+
+    message1 = Message(content="test message1", role="user1", sent_from="Alice", send_to={"Bob"})
+    message2 = Message(content="test message2", role="user2", sent_from="Bob", send_to={"Alice"})
+    memory.add_batch([message1, message2, message1])
+    assert memory.count() == 2
+    assert memory.exists(message1)
+
+    assert memory.get_by_sent_from("Alice") == [message1]
+    assert memory.get_by_send_to("Alice") == [message2]
+    assert memory.get_by_role("user2") == [message2]
+
+    message3 = Message(content="test message3", role="user1")
+    assert memory.find_news([message1, message3]) == [message3]
+    assert memory.find_news([message1, message3], k=1) == [message1, message3]
+
+    memory.delete(message1)
+    assert not memory.exists(message1)
+    assert memory.get_by_role("user1") == []
+    assert memory.get_by_sent_from("Alice") == []
+    assert len(memory.get_by_action(UserRequirement)) == 1
+
+    memory.add(message1)
+    assert memory.get() == [message2, message1]
+    assert memory.delete_newest() == message1
+    assert memory.get_by_send_to("Bob") == []
+
+    unindexed = Message(content="unindexed", role="user1")
+    memory.storage.append(unindexed)
+    assert memory.delete_newest() is unindexed
+    assert memory.get() == [message2]
+
+
+def test_memory_ignore_id():
+    memory = Memory(ignore_id=True)
+
+    memory.add(Message(content="test message", role="user1"))
+    memory.add(Message(content="test message", role="user1"))
+    assert memory.count() == 1
+    memory.add(Message(content="test message", role="user2"))
+    assert memory.count() == 2
+
+    new_memory = Memory(**memory.model_dump())
+    assert new_memory.count() == 2
+    assert new_memory.exists(Message(content="test message", role="user2"))
@@ -9,12 +9,15 @@ import shutil
 from pathlib import Path
 from typing import List
 
+from langchain_core.embeddings import Embeddings
+
 from metagpt.actions import UserRequirement, WritePRD
 from metagpt.actions.action_node import ActionNode
 from metagpt.config import CONFIG
 from metagpt.const import DATA_PATH
 from metagpt.memory.memory_storage import MemoryStorage
 from metagpt.schema import Message
+from metagpt.utils.serialize import serialize_message
 
 os.environ.setdefault("OPENAI_API_KEY", CONFIG.openai_api_key)
 
@@ -79,3 +82,73 @@ def test_actionout_message():
 
     memory_storage.clean()
     assert memory_storage.is_initialized is False
+
+
+class MockEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        return [self.embed_query(i) for i in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+
+def test_write_behind():
+    role_id = "UTUser3(Engineer)"
+    shutil.rmtree(Path(DATA_PATH / f"role_mem/{role_id}/"), ignore_errors=True)
+
+    embedding = MockEmbeddings()
+    memory_storage = MemoryStorage(embedding=embedding, flush_size=3, flush_interval=3600)
+    memory_storage.recover_memory(role_id)
+    index_fpath, storage_fpath = memory_storage._get_index_and_store_fname(index_ext=".faiss")
+
+    memory_storage.add(Message(content="message 0"))
+    memory_storage.add(Message(content="message 1"))
+    assert memory_storage.is_initialized is True
+    assert embedding.calls == 0
+    assert not index_fpath.exists()
+
+    memory_storage.add(Message(content="message 2"))
+    assert embedding.calls == 1
+    assert index_fpath.exists() and storage_fpath.exists()
+
+    memory_storage.add(Message(content="message 3"))
+    assert memory_storage.search_dissimilar(Message(content="another message"))
+    assert embedding.calls == 3  # the buffered message and the query
+
+    memory_storage.flush()
+    assert not list(memory_storage.role_mem_path.glob(".*tmp*"))
+    recovered = MemoryStorage(embedding=embedding).recover_memory(role_id)
+    assert [i.content for i in recovered] == [f"message {i}" for i in range(4)]
+
+    memory_storage.clean()
+    assert memory_storage.is_initialized is False
+    assert not index_fpath.exists()
+
+
+def test_search_dissimilar_batch():
+    role_id = "UTUser4(QaEngineer)"
+    shutil.rmtree(Path(DATA_PATH / f"role_mem/{role_id}/"), ignore_errors=True)
+
+    embedding = MockEmbeddings()
+    memory_storage = MemoryStorage(embedding=embedding)
+    memory_storage.recover_memory(role_id)
+    for i in range(10):
+        memory_storage.add(Message(content="message " * i))
+    news = [Message(content="message " * i) for i in [0, 3, 7, 20]]
+
+    results = memory_storage.search_dissimilar_batch(news, k=4)
+    for message, searched in zip(news, results):
+        expected = [
+            doc.metadata["message_ser"]
+            for doc, score in memory_storage.store.similarity_search_with_score(query=message.content, k=4)
+            if score >= memory_storage.threshold
+        ]
+        assert [serialize_message(i) for i in searched] == expected
+    assert len(results[-1]) == 4
+    assert memory_storage.search_dissimilar_batch([]) == []
+
+    memory_storage.clean()
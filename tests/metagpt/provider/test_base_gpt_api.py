@@ -6,8 +6,11 @@
 @File    : test_base_llm.py
 """
 
+import asyncio
+
 import pytest
 
+from metagpt.config import CONFIG
 from metagpt.provider.base_llm import BaseLLM
 from metagpt.schema import Message
 
@@ -104,3 +107,45 @@ async def test_async_base_llm():
 
     resp = await base_llm.aask_code([prompt_msg])
     assert resp == resp_content
+
+
+@pytest.mark.asyncio
+async def test_acompletion_text_with_cache(tmp_path, mocker):
+    llm_cache, llm_cache_path = CONFIG.llm_cache, CONFIG.llm_cache_path
+    CONFIG.llm_cache, CONFIG.llm_cache_path = True, str(tmp_path / "llm_cache.db")
+    acompletion_text = mocker.spy(MockBaseLLM, "acompletion_text")
+    stream_log = mocker.patch("metagpt.provider.base_llm.log_llm_stream")
+    to_thread = mocker.spy(asyncio, "to_thread")
+    hits = CONFIG.cost_manager.cache_hits
+
+    try:
+        base_llm = MockBaseLLM()
+        messages = [{"role": "user", "content": prompt_msg}]
+        assert await base_llm.acompletion_text_with_cache(messages) == resp_content
+        assert await base_llm.acompletion_text_with_cache(messages, stream=True) == resp_content
+        assert acompletion_text.call_count == 1
+        assert CONFIG.cost_manager.cache_hits == hits + 1
+        assert "".join(call.args[0] for call in stream_log.call_args_list) == resp_content + "\n"
+        # the SQLite lookups run off the event loop
+        assert [call.args[0].__name__ for call in to_thread.call_args_list] == ["get", "set", "get"]
+
+        assert await base_llm.acompletion_text_with_cache([{"role": "user", "content": "hi"}]) == resp_content
+        assert acompletion_text.call_count == 2
+    finally:
+        CONFIG.llm_cache, CONFIG.llm_cache_path = llm_cache, llm_cache_path
+
+
+def test_cache_key_params():
+    class MockConsKwargsLLM(MockBaseLLM):
+        model = "mock-model"
+        temperature = 0.3
+
+        def _cons_kwargs(self, messages: list[dict], timeout=3, **extra_kwargs) -> dict:
+            return {"messages": messages, "temperature": self.temperature, "max_tokens": 100, "timeout": timeout}
+
+    base_llm = MockConsKwargsLLM()
+    messages = [{"role": "user", "content": prompt_msg}]
+    params = base_llm._cache_key_params(messages)
+    assert params == {"provider": "MockConsKwargsLLM", "model": "mock-model", "temperature": 0.3, "max_tokens": 100}
+    base_llm.temperature = 0.7
+    assert base_llm._cache_key_params(messages) != params
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of LLMClientPool
+
+import asyncio
+
+import pytest
+from openai import AsyncOpenAI
+
+from metagpt.provider.client_pool import LLM_CLIENT_POOL, LLMClientPool
+from metagpt.provider.openai_api import OpenAILLM
+
+
+@pytest.mark.asyncio
+async def test_get_client():
+    pool = LLMClientPool()
+    client = pool.get_client(AsyncOpenAI, api_key="sk-xxx", base_url="http://127.0.0.1/v1")
+    assert pool.get_client(AsyncOpenAI, api_key="sk-xxx", base_url="http://127.0.0.1/v1") is client
+    assert pool.get_client(AsyncOpenAI, api_key="sk-yyy", base_url="http://127.0.0.1/v1") is not client
+    assert (
+        pool.get_client(
+            AsyncOpenAI,
+            proxy_params={"proxies": "http://127.0.0.1:8118"},
+            api_key="sk-xxx",
+            base_url="http://127.0.0.1/v1",
+        )
+        is not client
+    )
+
+    pool.clear()
+    assert pool.get_client(AsyncOpenAI, api_key="sk-xxx", base_url="http://127.0.0.1/v1") is not client
+
+
+@pytest.mark.asyncio
+async def test_get_client_per_loop():
+    LLM_CLIENT_POOL.clear()
+    llm1 = OpenAILLM()
+    llm2 = OpenAILLM()
+    llm1.system_prompt = "You are Alice."
+    assert llm1.aclient is llm2.aclient
+    assert llm2.system_prompt != llm1.system_prompt
+
+
+def test_get_client_outside_loop():
+    pool = LLMClientPool()
+    client = pool.get_client(AsyncOpenAI, api_key="sk-xxx", base_url="http://127.0.0.1/v1")
+    assert pool.get_client(AsyncOpenAI, api_key="sk-xxx", base_url="http://127.0.0.1/v1") is not client
+
+    llm = OpenAILLM()  # built before the event loops, as roles usually are
+
+    async def get_client():
+        return llm.aclient
+
+    client1 = asyncio.run(get_client())
+    client2 = asyncio.run(get_client())
+    assert client1 is not client2
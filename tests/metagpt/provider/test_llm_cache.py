@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of LLMCache
+
+import time
+
+from metagpt.config import CONFIG
+from metagpt.provider.llm_cache import LLMCache, get_llm_cache
+
+
+def test_llm_cache(tmp_path):
+    cache = LLMCache(tmp_path / "llm_cache.db")
+    key = LLMCache.make_key(model="gpt-4", messages=[{"role": "user", "content": "hi"}], temperature=0.3)
+    assert key == LLMCache.make_key(temperature=0.3, messages=[{"role": "user", "content": "hi"}], model="gpt-4")
+    assert key != LLMCache.make_key(model="gpt-4", messages=[{"role": "user", "content": "hi"}], temperature=0)
+
+    assert cache.get(key) is None
+    cache.set(key, "hello")
+    assert cache.get(key) == "hello"
+    cache.close()
+
+    cache = LLMCache(tmp_path / "llm_cache.db")
+    assert cache.get(key) == "hello"
+    cache.clear()
+    assert cache.count() == 0
+
+
+def test_llm_cache_ttl(tmp_path, mocker):
+    cache = LLMCache(tmp_path / "llm_cache.db", ttl=60)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    mocker.patch("metagpt.provider.llm_cache.time.time", return_value=time.time() + 61)
+    assert cache.get("key") is None
+    assert cache.count() == 0
+
+
+def test_llm_cache_lru(tmp_path, mocker):
+    now = time.time()
+    clock = mocker.patch("metagpt.provider.llm_cache.time.time", return_value=now)
+    cache = LLMCache(tmp_path / "llm_cache.db", max_entries=2)
+    cache.set("key1", "value1")
+    clock.return_value = now + 1
+    cache.set("key2", "value2")
+    clock.return_value = now + 2
+    assert cache.get("key1") == "value1"
+    clock.return_value = now + 3
+    cache.set("key3", "value3")
+    assert cache.count() == 2
+    assert cache.get("key2") is None
+    assert cache.get("key1") == "value1"
+
+
+def test_get_llm_cache_default_path(tmp_path, mocker):
+    mocker.patch("metagpt.provider.llm_cache.CACHE_PATH", tmp_path)
+    mocker.patch("metagpt.provider.llm_cache._llm_cache", None)
+    llm_cache, llm_cache_path = CONFIG.llm_cache, CONFIG.llm_cache_path
+    CONFIG.llm_cache, CONFIG.llm_cache_path = True, None
+    try:
+        cache = get_llm_cache()
+        assert cache.path == tmp_path / "llm_cache.db"
+        cache.close()
+    finally:
+        CONFIG.llm_cache, CONFIG.llm_cache_path = llm_cache, llm_cache_path
@@ -39,6 +39,22 @@ async def test_aask_code_Message():
     assert len(rsp["code"]) > 0
 
 
+@pytest.mark.asyncio
+async def test_rate_limit(mocker):
+    acquire = mocker.patch("metagpt.provider.base_llm.LLM_RATE_LIMITERS.acquire", mocker.AsyncMock())
+    llm = OpenAILLM()
+    llm.aclient = Mock()
+    llm.aclient.chat.completions.create = mocker.AsyncMock(return_value=Mock(usage=None))
+    llm.aclient.moderations.create = mocker.AsyncMock()
+    messages = [{"role": "user", "content": "hi"}]
+
+    await llm.acompletion(messages)
+    await llm._achat_completion_function(messages)
+    await llm.amoderation("hi")
+    await llm.amoderation(["hi"])
+    assert acquire.call_args_list == [mocker.call("OpenAILLM", llm.model, messages)] * 4
+
+
 class TestOpenAI:
     @pytest.fixture
     def config(self):
@@ -104,10 +120,12 @@ class TestOpenAI:
         instance = OpenAILLM()
         instance.config = config_proxy
         kwargs = instance._make_client_kwargs()
-        assert "http_client" in kwargs
+        assert "http_client" not in kwargs  # the proxy is set on the pooled http client
+        assert instance._get_proxy_params()["proxies"] == "http://proxy.com"
 
     def test_make_client_kwargs_with_proxy_azure(self, config_azure_proxy):
         instance = OpenAILLM()
         instance.config = config_azure_proxy
         kwargs = instance._make_client_kwargs()
-        assert "http_client" in kwargs
+        assert "http_client" not in kwargs
+        assert instance._get_proxy_params()["proxies"] == "http://proxy.com"
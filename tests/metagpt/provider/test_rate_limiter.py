@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of RateLimiter
+
+import asyncio
+import time
+
+import pytest
+
+from metagpt.config import CONFIG
+from metagpt.provider.rate_limiter import (
+    LLM_RATE_LIMITERS,
+    RateLimiter,
+    TokenBucket,
+    estimate_tokens,
+)
+from metagpt.utils.token_counter import estimate_message_tokens
+
+
+def test_token_bucket():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.1)
+    assert bucket.reserve(1) == pytest.approx(2, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_rpm():
+    limiter = RateLimiter(rpm=600)  # a request every 0.1 second once the burst is spent
+    limiter.rpm.tokens = 0
+    start = time.monotonic()
+    await asyncio.gather(*[limiter.acquire() for _ in range(3)])
+    assert time.monotonic() - start == pytest.approx(0.3, abs=0.1)
+    assert limiter.stats()["requests"] == 3
+    assert limiter.stats()["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_tpm():
+    limiter = RateLimiter(tpm=6000)
+    await limiter.acquire(tokens=6000)
+    assert limiter.total_wait == 0
+    await limiter.acquire(tokens=10)
+    assert limiter.total_wait == pytest.approx(0.1, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_cancel():
+    limiter = RateLimiter(rpm=60, tpm=6000)
+    limiter.rpm.tokens, limiter.tpm.tokens = 0, 0
+    task = asyncio.create_task(limiter.acquire(tokens=100))
+    await asyncio.sleep(0.01)
+    assert limiter.waiting == 1
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # the cancelled reservation is given back
+    assert limiter.stats() == {"waiting": 0, "requests": 0, "total_wait": pytest.approx(0)}
+    assert limiter.rpm.reserve(0) == 0
+    assert limiter.tpm.reserve(0) == 0
+
+
+def test_estimate_tokens():
+    messages = [{"role": "user", "content": "hello world"}]
+    assert estimate_tokens(messages, "gpt-4") > 0
+    assert estimate_tokens(messages, "unknown-model") == estimate_message_tokens(messages)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_registry():
+    rpm, tpm = CONFIG.llm_rpm, CONFIG.llm_tpm
+    try:
+        CONFIG.llm_rpm, CONFIG.llm_tpm = 0, 0
+        assert LLM_RATE_LIMITERS.get("OpenAILLM", "gpt-4") is None
+
+        CONFIG.llm_rpm, CONFIG.llm_tpm = 60, 100000
+        limiter = LLM_RATE_LIMITERS.get("OpenAILLM", "gpt-4")
+        assert limiter is LLM_RATE_LIMITERS.get("OpenAILLM", "gpt-4")
+        assert limiter is not LLM_RATE_LIMITERS.get("OpenAILLM", "gpt-3.5-turbo")
+
+        await LLM_RATE_LIMITERS.acquire("OpenAILLM", "gpt-4", [{"role": "user", "content": "hi"}])
+        assert LLM_RATE_LIMITERS.stats()["OpenAILLM/gpt-4"]["requests"] == 1
+    finally:
+        CONFIG.llm_rpm, CONFIG.llm_tpm = rpm, tpm
+        LLM_RATE_LIMITERS.clear()
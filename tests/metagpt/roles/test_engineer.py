@@ -7,6 +7,7 @@
 @Modified By: mashenquan, 2023-11-1. In accordance with Chapter 2.2.1 and 2.2.2 of RFC 116, utilize the new message
         distribution feature for message handling.
 """
+import asyncio
 import json
 from pathlib import Path
 
@@ -22,7 +23,7 @@ from metagpt.const import (
 )
 from metagpt.logs import logger
 from metagpt.roles.engineer import Engineer
-from metagpt.schema import CodingContext, Message
+from metagpt.schema import CodingContext, Document, Message
 from metagpt.utils.common import CodeParser, any_to_name, any_to_str, aread, awrite
 from metagpt.utils.file_repository import FileRepository
 from metagpt.utils.git_repository import ChangeType
@@ -159,5 +160,83 @@ async def test_new_coding_context():
     assert role.code_todos
 
 
+def _new_code_todos(logic_analysis, filenames):
+    task_doc = Document(
+        root_path=TASK_FILE_REPO,
+        filename="1.json",
+        content=json.dumps({"Logic Analysis": logic_analysis, "Task list": filenames}),
+    )
+    design_doc = Document(root_path=SYSTEM_DESIGN_FILE_REPO, filename="1.json", content="{}")
+    todos = []
+    for filename in filenames:
+        context = CodingContext(filename=filename, design_doc=design_doc, task_doc=task_doc)
+        todos.append(WriteCode(context=Document(filename=filename, content=context.model_dump_json())))
+    return todos
+
+
+def test_parse_code_dependencies():
+    filenames = ["models.py", "game.py", "ui.py", "main.py", "README.md"]
+    logic_analysis = [
+        ["models.py", "Contains Tile class"],
+        ["game.py", "Contains Game class, from models import Tile"],
+        ["ui.py", "Contains UI class, renders the tiles"],
+        ["main.py", "Contains main function, from game import Game and from ui import UI"],
+    ]
+    todos = _new_code_todos(logic_analysis, filenames)
+    assert Engineer._parse_code_dependencies(todos) == [set(), {0}, set(), {1, 2}, {0, 1, 2, 3}]
+
+    logic_analysis = "- game.py需要在models.py之后定义\n- main.py调用Game"
+    todos = _new_code_todos(logic_analysis, filenames)
+    assert Engineer._parse_code_dependencies(todos) == [set(), {0}, {0, 1}, {1}, {0, 1, 2, 3}]
+
+
+@pytest.mark.asyncio
+async def test_act_sp_with_cr_concurrently(mocker):
+    filenames = ["models.py", "game.py", "ui.py", "main.py"]
+    logic_analysis = [
+        ["models.py", "Contains Tile class"],
+        ["game.py", "Contains Game class, from models import Tile"],
+        ["ui.py", "Contains UI class"],
+        ["main.py", "Contains main function, from game import Game"],
+    ]
+    written, saved, code_overrides = [], [], {}
+
+    async def mock_write_code_run(self, *args, **kwargs):
+        await asyncio.sleep({"models.py": 0.05, "ui.py": 0.01}.get(self.context.filename, 0))
+        written.append(self.context.filename)
+        code_overrides[self.context.filename] = self.code_overrides
+        coding_context = CodingContext.loads(self.context.content)
+        coding_context.code_doc = Document(filename=coding_context.filename, content="code")
+        return coding_context
+
+    async def mock_save(filename, *args, **kwargs):
+        saved.append(filename)
+
+    mocker.patch.object(WriteCode, "run", mock_write_code_run)
+    git_repo = CONFIG.git_repo
+    CONFIG.git_repo = mocker.Mock()
+    CONFIG.git_repo.new_file_repository.return_value.save = mock_save
+    try:
+        engineer = Engineer(n_borg=3)
+        engineer.code_todos = _new_code_todos(logic_analysis, filenames)
+        coding_context = CodingContext.loads(engineer.code_todos[2].context.content)
+        coding_context.code_doc = Document(filename="ui.py", content="old ui")  # rewritten in this round
+        engineer.code_todos[2].context.content = coding_context.model_dump_json()
+        changed_files = await engineer._act_sp_with_cr()
+    finally:
+        CONFIG.git_repo = git_repo
+    assert written == ["ui.py", "models.py", "game.py", "main.py"]
+    assert saved == filenames
+    # the other files of this round as before it, whatever happens to be saved already
+    assert code_overrides == {
+        "models.py": {"game.py": None, "ui.py": "old ui", "main.py": None},
+        "game.py": {"ui.py": "old ui", "main.py": None},
+        "ui.py": {"models.py": None, "game.py": None, "main.py": None},
+        "main.py": {"ui.py": "old ui"},
+    }
+    assert changed_files == set(filenames)
+    assert [i.instruct_content.filename for i in engineer.rc.memory.get()] == filenames
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
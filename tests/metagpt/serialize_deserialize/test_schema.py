@@ -25,7 +25,7 @@ def test_message_serdeser():
     new_message = Message(**ser_data)
     assert new_message.cause_by == any_to_str(WriteCode)
     assert new_message.cause_by in [any_to_str(WriteCode)]
-    assert new_message.instruct_content != ic_obj(**out_data)  # TODO find why `!=`
+    assert new_message.instruct_content == ic_obj(**out_data)
     assert new_message.instruct_content.model_dump() == ic_obj(**out_data).model_dump()
 
     message = Message(content="test_ic", instruct_content=MockICMessage())
@@ -8,6 +8,7 @@
 
 """
 
+import asyncio
 from pathlib import Path
 
 import pytest
@@ -44,6 +45,78 @@ def test_get_roles(env: Environment):
     assert roles == {role1.profile: role1, role2.profile: role2}
 
 
+def test_publish_message_routing(env: Environment):
+    role1 = Role(name="Alice", profile="product manager")
+    role2 = Role(name="Bob", profile="engineer")
+    env.add_roles([role1, role2])
+
+    env.publish_message(Message(content="to Bob", send_to="Bob"))
+    assert role1.rc.msg_buffer.empty()
+    assert role2.rc.msg_buffer.pop().content == "to Bob"
+
+    env.publish_message(Message(content="to all"))
+    assert role1.rc.msg_buffer.pop().content == "to all"
+    assert role2.rc.msg_buffer.pop().content == "to all"
+
+    role2.subscribe({"Bobby"})
+    env.publish_message(Message(content="to Bob", send_to="Bob"))
+    env.publish_message(Message(content="to Bobby", send_to={"Bobby", "Alice"}))
+    assert role1.rc.msg_buffer.pop().content == "to Bobby"
+    assert role2.rc.msg_buffer.pop().content == "to Bobby"
+    assert role2.rc.msg_buffer.empty()
+
+
+def test_history(env: Environment):
+    env.publish_message(Message(content="message1"))
+    env.publish_message(Message(content="message2"))
+    assert env.history == "\nuser: message1\nuser: message2"
+
+    bounded_env = Environment(max_history=1)
+    bounded_env.publish_message(Message(content="message1"))
+    bounded_env.publish_message(Message(content="message2"))
+    assert bounded_env.history == "\nuser: message2"
+
+
+@pytest.mark.asyncio
+async def test_run_only_wakes_roles_with_messages(env: Environment, mocker):
+    role1 = Role(name="Alice", profile="product manager")
+    role2 = Role(name="Bob", profile="engineer")
+    env.add_roles([role1, role2])
+    run1 = mocker.patch.object(Role, "run", autospec=True, side_effect=lambda role: role.rc.msg_buffer.pop_all())
+
+    await env.run()
+    assert run1.call_count == 0
+
+    env.publish_message(Message(content="to Bob", send_to="Bob"))
+    env.publish_message(Message(content="to Alice", send_to="Alice"))
+    await env.run()
+    assert [call.args[0] for call in run1.call_args_list] == [role2, role1]
+
+    await env.run(k=3)
+    assert run1.call_count == 2
+    assert env.is_idle
+
+
+@pytest.mark.asyncio
+async def test_run_max_concurrency(mocker):
+    env = Environment(max_concurrency=1)
+    roles = [Role(name=f"Role{i}", profile=f"Profile{i}") for i in range(3)]
+    env.add_roles(roles)
+    running = []
+
+    async def run(role):
+        running.append(role)
+        assert len(running) == 1
+        await asyncio.sleep(0)
+        role.rc.msg_buffer.pop_all()
+        running.remove(role)
+
+    mocker.patch.object(Role, "run", autospec=True, side_effect=run)
+    env.publish_message(Message(content="to all"))
+    await env.run()
+    assert all(role.rc.msg_buffer.empty() for role in roles)
+
+
 @pytest.mark.asyncio
 async def test_publish_and_process_message(env: Environment, new_filename):
     if CONFIG.git_repo:
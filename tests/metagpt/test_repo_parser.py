@@ -1,9 +1,11 @@
 from pathlib import Path
 from pprint import pformat
 
+from metagpt import repo_parser
+from metagpt.config import CONFIG
 from metagpt.const import METAGPT_ROOT
 from metagpt.logs import logger
-from metagpt.repo_parser import RepoParser
+from metagpt.repo_parser import CodeBlockInfo, RepoParser
 
 
 def test_repo_parser():
@@ -23,3 +25,52 @@ def test_error():
     """_parse_file should return empty list when file not existed"""
     rsp = RepoParser._parse_file(Path("test_not_existed_file.py"))
     assert rsp == []
+
+
+def test_generate_symbols_cache(tmp_path, mocker):
+    src = tmp_path / "src"
+    (src / "pkg").mkdir(parents=True)
+    (src / "main.py").write_text("from pkg.game import Game\n\nSCORE = 0\n\n\ndef main():\n    Game().run()\n")
+    (src / "pkg" / "game.py").write_text("class Game:\n    def run(self):\n        ...\n")
+    parser = RepoParser(base_directory=src, cache_path=tmp_path / "symbols.json")
+    parse = mocker.spy(repo_parser, "_parse_file_info")
+
+    symbols = parser.generate_symbols()
+    assert parse.call_count == 2
+    assert parser.generate_symbols() == symbols
+    assert parse.call_count == 2
+    assert isinstance(symbols[0].page_info[0], CodeBlockInfo)
+
+    (src / "pkg" / "game.py").write_text(
+        "class Game:\n    def run(self):\n        ...\n\n    def stop(self):\n        ...\n"
+    )
+    assert RepoParser(base_directory=src, cache_path=tmp_path / "symbols.json").find_symbols(kind="class") == [
+        (str(Path("pkg/game.py")), "class", "Game")
+    ]
+    assert parse.call_count == 3
+    assert parser.find_symbols(name="main") == [("main.py", "function", "main")]
+    assert parser.find_symbols(kind="global") == [("main.py", "global", "SCORE")]
+
+
+def test_generate_symbols_parallel(tmp_path, mocker):
+    mocker.patch.object(repo_parser, "PARALLEL_PARSE_MIN_FILES", 1)
+    directory = METAGPT_ROOT / "metagpt" / "strategy"
+    expected = RepoParser(base_directory=directory, cache_path=tmp_path / "1.json", max_workers=1).generate_symbols()
+    parser = RepoParser(base_directory=directory, cache_path=tmp_path / "2.json", max_workers=2)
+    assert parser.generate_symbols() == expected
+
+
+def test_generate_symbols_not_serialized(tmp_path):
+    (tmp_path / "main.py").write_text("...\n")
+    repo_symbols_cache = CONFIG.repo_symbols_cache
+    try:
+        CONFIG.repo_symbols_cache = False
+        symbols = RepoParser(base_directory=tmp_path).generate_symbols()
+        assert symbols[0].page_info[0].tokens == ["ast.Constant", ...]
+
+        CONFIG.repo_symbols_cache = True
+        parser = RepoParser(base_directory=tmp_path, cache_path=tmp_path / "symbols.json")
+        assert parser.generate_symbols() == symbols  # only the cache holds it as a string
+        assert parser.generate_symbols()[0].page_info[0].tokens == ["ast.Constant", "Ellipsis"]
+    finally:
+        CONFIG.repo_symbols_cache = repo_symbols_cache
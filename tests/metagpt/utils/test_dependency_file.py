@@ -61,5 +61,33 @@ async def test_dependency_file():
     assert not file.exists
 
 
+@pytest.mark.asyncio
+async def test_dependency_file_batch(tmp_path, mocker):
+    file = DependencyFile(workdir=tmp_path)
+    save = mocker.spy(file, "save")
+    async with file.batch():
+        await file.update(filename=tmp_path / "a.py", dependencies={"docs/a.md"})
+        await file.update(filename="b.py", dependencies={"docs/a.md", tmp_path / "a.py"})
+        async with file.batch():
+            await file.update(filename="c.py", dependencies={"b.py"})
+        assert not file.exists
+        assert await file.get("b.py") == {"docs/a.md", "a.py"}
+    assert save.call_count == 1
+
+    async with file.batch():
+        await file.update(filename="c.py", dependencies={"b.py"})  # unchanged
+    assert save.call_count == 1
+
+    assert await file.get_dependents("docs/a.md") == {"a.py", "b.py"}
+    assert await file.get_dependents(tmp_path / "a.py", recursive=True) == {"b.py", "c.py"}
+
+    # changed by another instance
+    other = DependencyFile(workdir=tmp_path)
+    await other.update(filename="c.py", dependencies=None)
+    assert await file.get("c.py") == set()
+    assert await file.get_dependents("b.py") == set()
+    assert await DependencyFile(workdir=tmp_path).get("a.py") == {"docs/a.md"}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
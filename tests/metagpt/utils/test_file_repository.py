@@ -11,6 +11,7 @@ from pathlib import Path
 
 import pytest
 
+from metagpt.utils import file_repository
 from metagpt.utils.git_repository import ChangeType, GitRepository
 from tests.metagpt.utils.test_git_repository import mock_file
 
@@ -53,5 +54,29 @@ async def test_file_repo():
     git_repo.delete_repository()
 
 
+@pytest.mark.asyncio
+async def test_get_many(tmp_path, mocker):
+    git_repo = GitRepository(local_path=tmp_path / "get_many_git", auto_init=True)
+    file_repo = git_repo.new_file_repository("src")
+    for i in range(20):
+        await file_repo.save(f"{i}.py", str(i))
+    aread = mocker.spy(file_repository, "aread")
+
+    filenames = [f"{i}.py" for i in range(20)] + ["missing.py"]
+    docs = await file_repo.get_many(filenames)
+    assert [i.content for i in docs[:-1]] == [str(i) for i in range(20)]
+    assert docs[-1] is None
+    assert aread.call_count == 0  # saved contents
+
+    await mock_file(file_repo.workdir / "1.py", "changed")  # not through the file repository
+    git_repo.archive()
+    docs = await file_repo.get_many(filenames[:2])
+    assert [i.content for i in docs] == ["0", "changed"]
+    assert aread.call_count == 2
+    await file_repo.get_many(filenames[:2])
+    assert aread.call_count == 2
+    assert len(await file_repo.get_all()) == 20
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
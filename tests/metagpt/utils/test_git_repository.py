@@ -13,7 +13,7 @@ from pathlib import Path
 import aiofiles
 import pytest
 
-from metagpt.utils.git_repository import GitRepository
+from metagpt.utils.git_repository import ChangeType, GitRepository
 
 
 async def mock_file(filename, content=""):
@@ -70,6 +70,88 @@ async def test_git():
     assert not local_path.exists()
 
 
+@pytest.mark.asyncio
+async def test_changed_files_cache(tmp_path, mocker):
+    repo, subdir = await mock_repo(tmp_path / "git5")
+    repo.add_change(repo.changed_files)
+    repo.commit("commit1")
+    git_status = mocker.spy(repo, "_git_status")
+
+    file_repo = repo.new_file_repository("subdir")
+    await file_repo.save("c.txt", "C")
+    await file_repo.save("d.txt", "D")
+    await file_repo.save("a.pyc", "")
+    await mock_file(repo.workdir / "a.txt", "A")  # not through a file repository
+    (repo.workdir / "b.txt").unlink()
+    expected = {
+        "a.txt": ChangeType.MODIFIED,
+        "b.txt": ChangeType.DELETED,
+        "subdir/c.txt": ChangeType.MODIFIED,
+        "subdir/d.txt": ChangeType.UNTRACTED,
+    }
+    assert repo.changed_files == expected
+    assert file_repo.changed_files == {"c.txt": ChangeType.MODIFIED, "d.txt": ChangeType.UNTRACTED}
+    assert set(file_repo.all_files) == {"c.txt", "d.txt"}
+
+    await file_repo.save("c.txt", "")  # back to the committed content
+    await file_repo.delete("d.txt")
+    expected = {"a.txt": ChangeType.MODIFIED, "b.txt": ChangeType.DELETED}
+    assert repo.changed_files == expected
+    assert git_status.call_count == 1
+    assert GitRepository(local_path=repo.workdir, auto_init=False).changed_files == expected
+
+    repo.archive()
+    assert not repo.changed_files
+
+
+@pytest.mark.asyncio
+async def test_get_files_cache(tmp_path, mocker):
+    repo, subdir = await mock_repo(tmp_path / "git6")
+    await mock_file(repo.workdir / ".gitignore", "node_modules/\n")
+    (repo.workdir / "node_modules" / "pkg").mkdir(parents=True)
+    await mock_file(repo.workdir / "node_modules" / "pkg" / "index.js")
+    (repo.workdir / "docs").mkdir()
+    await mock_file(repo.workdir / "docs" / "a.md")
+
+    repo = GitRepository(local_path=repo.workdir, auto_init=False)
+    scan_tree = mocker.spy(repo, "_scan_tree")
+    assert repo.get_files("subdir") == ["c.txt"]
+    assert scan_tree.call_args_list == [mocker.call("subdir")]  # only the directory asked for
+    assert repo.get_files("subdir") == ["c.txt"]
+    assert scan_tree.call_count == 1  # nothing reported since
+
+    await repo.new_file_repository("subdir").save("d.txt", "D")
+    assert sorted(repo.get_files("subdir")) == ["c.txt", "d.txt"]
+    assert scan_tree.call_count == 2
+
+    assert ".gitignore" in repo.changed_files  # a whole scan, without the ignored directories
+    assert scan_tree.call_args == mocker.call("")
+    assert not [i for i in repo._tree if i.startswith("node_modules/")]
+    assert sorted(repo.get_files(".")) == [".gitignore", "a.txt", "b.txt", "docs/a.md", "subdir/c.txt", "subdir/d.txt"]
+    assert repo.get_files("docs") == ["a.md"]
+    assert scan_tree.call_count == 3
+    assert "node_modules/pkg/index.js" in repo.get_files(".", filter_ignored=False)
+
+
+@pytest.mark.asyncio
+async def test_changed_files_gitignore(tmp_path):
+    repo, _ = await mock_repo(tmp_path / "git7")
+    repo.add_change(repo.changed_files)
+    repo.commit("commit1")
+    (repo.workdir / "build").mkdir()
+    await mock_file(repo.workdir / "build" / "out.bin")
+    assert repo.changed_files == {"build/out.bin": ChangeType.UNTRACTED}
+
+    await mock_file(repo.workdir / ".gitignore", "__pycache__\n*.pyc\nbuild/\n")  # not through a file repository
+    assert repo.changed_files == {".gitignore": ChangeType.MODIFIED}
+    assert sorted(repo.get_files(".")) == [".gitignore", "a.txt", "b.txt", "subdir/c.txt"]
+
+    await repo.new_file_repository().save(".gitignore", "__pycache__\n*.pyc")  # as committed
+    assert repo.changed_files == {"build/out.bin": ChangeType.UNTRACTED}
+    repo.archive()
+    assert "build/out.bin" in repo.get_files(".")
+
+
 @pytest.mark.asyncio
 async def test_git1():
     local_path = Path(__file__).parent / "git1"
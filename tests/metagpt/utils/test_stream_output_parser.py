@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_stream_output_parser.py
+"""
+from typing import List
+
+import pytest
+
+from metagpt.actions.action_node import ActionNode
+from metagpt.config import CONFIG
+from metagpt.logs import log_llm_stream
+from metagpt.utils.stream_output_parser import StreamOutputParser, StreamParseError
+
+MAPPING = {"Language": (str, ...), "Task list": (List[str], ...)}
+
+
+def feed(parser: StreamOutputParser, text: str, size: int = 3):
+    for i in range(0, len(text), size):
+        parser.feed(text[i : i + size])
+
+
+def test_stream_json():
+    emitted = []
+    parser = StreamOutputParser(MAPPING, schema="json", on_field=lambda k, v: emitted.append((k, v)))
+    text = 'ok\n[CONTENT]\n```json\n{\n"Language": "en, {\\"x\\"}",\n"Task list": ["a.py", "b.py"]\n}\n```\n[/CONTENT]'
+    feed(parser, text[: text.index('"Task list"')])
+    assert emitted == [("Language", 'en, {"x"}')]
+    feed(parser, text[text.index('"Task list"') :])
+    assert emitted == [("Language", 'en, {"x"}'), ("Task list", ["a.py", "b.py"])]
+
+    parser.finish({"Language": "en", "Task list": [], "Other": 1})
+    assert emitted[-1] == ("Other", 1)
+
+
+def test_stream_json_broken():
+    # text before the json is left to the final parse
+    parser = StreamOutputParser(MAPPING, schema="json")
+    feed(parser, '[CONTENT]\nHere is the JSON: "\n{"Language": "en", "Task list": []}\n[/CONTENT]')
+    assert parser.fields == {"Language": "en", "Task list": []}
+    parser = StreamOutputParser(MAPPING, schema="json")
+    feed(parser, "[CONTENT]\nLanguage: en\n[/CONTENT]")
+    assert parser.fields == {}
+
+    parser = StreamOutputParser(MAPPING, schema="json")
+    with pytest.raises(StreamParseError):
+        feed(parser, '[CONTENT]\n{"Language": "en"}\n[/CONTENT]')
+
+    repair_llm_output = CONFIG.repair_llm_output
+    try:
+        CONFIG.repair_llm_output = False
+        parser = StreamOutputParser(MAPPING, schema="json")
+        with pytest.raises(StreamParseError):
+            feed(parser, '[CONTENT]\n{"Language": en,')
+
+        CONFIG.repair_llm_output = True
+        parser = StreamOutputParser(MAPPING, schema="json")
+        feed(parser, '[CONTENT]\n{"Language": en,\n"Task list": []}')
+        assert parser.fields == {"Task list": []}
+    finally:
+        CONFIG.repair_llm_output = repair_llm_output
+
+
+def test_stream_markdown():
+    emitted = []
+    parser = StreamOutputParser(MAPPING, schema="markdown", on_field=lambda k, v: emitted.append((k, v)))
+    feed(parser, '[CONTENT]\n## Language\nen\n\n## Task list\n```python\n["a.py"]\n```\n')
+    assert emitted == [("Language", "en")]
+    feed(parser, "[/CONTENT]")
+    assert emitted == [("Language", "en"), ("Task list", ["a.py"])]
+
+
+class MockStreamLLM:
+    def __init__(self, rsp: str):
+        self.rsp = rsp
+
+    async def aask(self, prompt, system_msgs=None, timeout=3):
+        for i in range(0, len(self.rsp), 5):
+            log_llm_stream(self.rsp[i : i + 5])
+        return self.rsp
+
+
+@pytest.mark.asyncio
+async def test_fill_on_field():
+    node = ActionNode.from_children(
+        "Tasks", [ActionNode("Language", str, "", "en"), ActionNode("Task list", List[str], "", ["a.py"])]
+    )
+    llm = MockStreamLLM('[CONTENT]\n{"Language": "en", "Task list": ["a.py"]}\n[/CONTENT]')
+    emitted = []
+    await node.fill(context="", llm=llm, on_field=lambda k, v: emitted.append(k))
+    assert emitted == ["Language", "Task list"]
+    assert node.instruct_content.model_dump() == {"Language": "en", "Task list": ["a.py"]}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-s"])
@@ -35,6 +35,11 @@ def test_reduce_message_length(msgs, model_name, system_text, reserved, expected
     assert len(reduce_message_length(msgs, model_name, system_text, reserved)) / (len("Hello,")) / 1000 == expected
 
 
+def test_reduce_message_length_lines():
+    msgs = ("Hello,\n" * 1000 * i for i in range(20, 0, -1))
+    assert reduce_message_length(msgs, "gpt-4", "System", 2000) == "Hello,\n" * 1000 * 2
+
+
 @pytest.mark.parametrize(
     "text, prompt_template, model_name, system_text, reserved, expected",
     [
@@ -49,6 +54,21 @@ def test_generate_prompt_chunk(text, prompt_template, model_name, system_text, r
     assert len(ret) == expected
 
 
+def test_generate_prompt_chunk_lines_and_overlap():
+    lines = [f"Line {i}: {_paragraphs(3)}\n" for i in range(2000)]
+    args = ("Prompt: {}", "gpt-3.5-turbo", "System", 1500)
+    chunks = list(generate_prompt_chunk("".join(lines), *args))
+    assert len(chunks) > 1
+    assert list(generate_prompt_chunk(iter(lines), *args)) == chunks
+
+    overlapped = list(generate_prompt_chunk(iter(lines), *args, overlap=300))
+    assert len(overlapped) > len(chunks)
+    for prev, chunk in zip(overlapped, overlapped[1:]):
+        prev, chunk = prev.removeprefix("Prompt: ").splitlines(), chunk.removeprefix("Prompt: ").splitlines()
+        assert chunk[0] in prev and prev[-1] in chunk
+    assert overlapped[-1].endswith(lines[-1])
+
+
 @pytest.mark.parametrize(
     "paragraph, sep, count, expected",
     [
@@ -7,7 +7,14 @@
 """
 import pytest
 
-from metagpt.utils.token_counter import count_message_tokens, count_string_tokens
+from metagpt.utils.token_counter import (
+    count_message_tokens,
+    count_message_tokens_batch,
+    count_string_tokens,
+    count_string_tokens_batch,
+    estimate_message_tokens,
+    estimate_string_tokens,
+)
 
 
 def test_count_message_tokens():
@@ -69,5 +76,32 @@ def test_count_string_tokens_gpt_4():
     assert count_string_tokens(string, model_name="gpt-4-0314") == 4
 
 
+def test_count_message_tokens_batch():
+    conversations = [
+        [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi there!"}],
+        [{"role": "user", "content": "Hello", "name": "John"}, {"role": "assistant", "content": "Hi there!"}],
+        [],
+    ]
+    assert count_message_tokens_batch(conversations) == [15, 17, 3]
+    assert count_message_tokens_batch(conversations, num_threads=1) == [15, 17, 3]
+    with pytest.raises(NotImplementedError):
+        count_message_tokens_batch(conversations, model="invalid_model")
+
+
+def test_count_string_tokens_batch():
+    strings = ["Hello, world!", "", "Hello, world!" * 100]
+    assert count_string_tokens_batch(strings, model_name="gpt-4-0314") == [
+        count_string_tokens(i, model_name="gpt-4-0314") for i in strings
+    ]
+
+
+def test_estimate_tokens():
+    assert estimate_string_tokens("") == 0
+    assert estimate_string_tokens("Hello, world!") == 4
+    assert estimate_string_tokens("你好") == 2
+    assert estimate_message_tokens([]) == 3
+    assert estimate_message_tokens([{"role": "user", "content": "Hello, world!"}]) == 3 + 3 + 1 + 4
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_workspace_pool.py
+@Desc: Unit test for workspace_pool.py
+"""
+import os
+import time
+
+import pytest
+
+from metagpt.config import CONFIG
+from metagpt.utils.git_repository import GitRepository
+from metagpt.utils.workspace_pool import WorkspacePool
+
+
+@pytest.mark.asyncio
+async def test_claim(tmp_path):
+    pool = WorkspacePool(root=tmp_path, size=2)
+    assert not pool.claim(tmp_path / "project0")  # empty pool, refilled in the background
+    await pool.wait()
+    assert len(pool.ready()) == 2
+
+    assert pool.claim(tmp_path / "project1")
+    repo = GitRepository(local_path=tmp_path / "project1", auto_init=False)
+    assert repo.is_valid
+    assert (tmp_path / "project1" / ".gitignore").exists()
+    await pool.wait()
+    assert len(pool.ready()) == 2
+
+    assert not WorkspacePool(root=tmp_path, size=0).claim(tmp_path / "project2")
+
+
+@pytest.mark.asyncio
+async def test_discard(tmp_path):
+    pool = WorkspacePool(root=tmp_path, size=0)
+    (tmp_path / "project" / "docs").mkdir(parents=True)
+    pool.discard(tmp_path / "project")
+    assert not (tmp_path / "project").exists()
+    await pool.wait()
+    assert not list(tmp_path.iterdir())
+
+    (tmp_path / "project").mkdir()
+    pool.discard(tmp_path / "project")  # without a running event loop it is deleted at once
+    await pool.wait()
+    assert not list(tmp_path.iterdir())
+
+
+def _touch(path, mtime):
+    for i in [path, *path.rglob("*")]:
+        os.utime(i, (mtime, mtime))
+
+
+def test_stale_workspaces(tmp_path):
+    pool = WorkspacePool(root=tmp_path, size=0)
+    for i, name in enumerate(["old", "middle", "new"]):
+        GitRepository(local_path=tmp_path / name, auto_init=True)
+        _touch(tmp_path / name, time.time() - (3 - i) * 3600)
+    (tmp_path / "storage").mkdir()  # not a project
+
+    project_path = CONFIG.project_path
+    try:
+        CONFIG.project_path = None
+        assert pool.stale_workspaces(ttl=2.5 * 3600) == [tmp_path / "old"]
+        assert pool.stale_workspaces(ttl=1.5 * 3600) == [tmp_path / "old", tmp_path / "middle"]
+        assert pool.stale_workspaces(quota=1) == [tmp_path / "old", tmp_path / "middle", tmp_path / "new"]
+        assert pool.stale_workspaces(quota=1024 * 1024) == []
+
+        CONFIG.project_path = tmp_path / "old"
+        assert pool.stale_workspaces(ttl=1.5 * 3600) == [tmp_path / "middle"]
+    finally:
+        CONFIG.project_path = project_path
+
+
+def test_stale_workspaces_modified(tmp_path):
+    pool = WorkspacePool(root=tmp_path, size=0)
+    GitRepository(local_path=tmp_path / "project", auto_init=True)
+    _touch(tmp_path / "project", time.time() - 3600)
+    assert pool.stale_workspaces(ttl=1800) == [tmp_path / "project"]
+
+    # a file written deep inside the project doesn't change the mtime of the project directory
+    (tmp_path / "project" / ".gitignore").write_text("\n")
+    assert pool.stale_workspaces(ttl=1800) == []
+
+
+@pytest.mark.asyncio
+async def test_stale_workspaces_held(tmp_path):
+    pool = WorkspacePool(root=tmp_path, size=0)
+    project_path, quota, ttl = CONFIG.project_path, CONFIG.workspace_quota, CONFIG.workspace_ttl
+    try:
+        CONFIG.project_path = tmp_path / "current"
+        CONFIG.workspace_quota, CONFIG.workspace_ttl = 0, 0
+        for i, name in enumerate(["active", "idle", "current"]):
+            assert not pool.claim(tmp_path / name)
+            GitRepository(local_path=tmp_path / name, auto_init=True)
+            (tmp_path / name / "data").write_bytes(b"0" * 1024 * 1024)
+            _touch(tmp_path / name, time.time() - (3 - i) * 3600)
+        await pool.wait()
+        pool.release(tmp_path / "idle")
+
+        # the quota can't be met, but the projects in use are kept
+        assert pool.stale_workspaces(ttl=1800, quota=1) == [tmp_path / "idle"]
+        CONFIG.workspace_quota, CONFIG.workspace_ttl = 1, 0
+        pool._clean()
+        assert sorted(i.name for i in tmp_path.iterdir()) == ["active", "current"]
+
+        pool.discard(tmp_path / "active")  # no longer held
+        GitRepository(local_path=tmp_path / "active", auto_init=True)
+        assert pool.stale_workspaces(quota=1) == [tmp_path / "active"]
+    finally:
+        CONFIG.project_path, CONFIG.workspace_quota, CONFIG.workspace_ttl = project_path, quota, ttl
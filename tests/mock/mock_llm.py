@@ -47,7 +47,7 @@ class MockLLM(OpenAILLM):
         if format_msgs:
             message.extend(format_msgs)
         message.append(self._user_msg(msg))
-        rsp = await self.acompletion_text(message, stream=stream, timeout=timeout)
+        rsp = await self.acompletion_text_with_cache(message, stream=stream, timeout=timeout)
         return rsp
 
     async def original_aask_batch(self, msgs: list, timeout=3) -> str:
@@ -56,7 +56,7 @@ class MockLLM(OpenAILLM):
         for msg in msgs:
             umsg = self._user_msg(msg)
             context.append(umsg)
-            rsp_text = await self.acompletion_text(context, timeout=timeout)
+            rsp_text = await self.acompletion_text_with_cache(context, timeout=timeout)
             context.append(self._assistant_msg(rsp_text))
         return self._extract_assistant_rsp(context)
 